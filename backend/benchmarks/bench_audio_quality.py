@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Audio Quality Analysis Benchmark for TradesMate
+Times the pre-transcription quality check (stdlib WAV decode + vectorized
+frame statistics) on synthetic 5-minute recordings at common phone and
+desktop sample rates. The check runs on every upload before Whisper is
+called, so it should stay well under 50 ms for mono speech recordings;
+5 minutes of 48 kHz stereo is over the 25 MB upload limit and is shown
+for scale only.
+
+Run from the backend directory:
+    python benchmarks/bench_audio_quality.py [minutes]
+"""
+
+import io
+import sys
+import time
+import wave
+from pathlib import Path
+
+import numpy as np
+
+# Add the backend directory to Python path so `src` imports as a package
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+MINUTES = float(sys.argv[1]) if len(sys.argv) > 1 else 5
+REPEATS = 5
+BUDGET_MS = 50
+
+# (label, sample rate, channels)
+FORMATS = [
+    ('16 kHz mono', 16000, 1),
+    ('44.1 kHz mono', 44100, 1),
+    ('48 kHz stereo', 48000, 2),
+]
+
+
+def recording(sample_rate, channels, seconds):
+    """Speech-like tone bursts with pauses over a low noise floor, as a WAV upload"""
+    rng = np.random.default_rng(0)
+    t = np.arange(int(seconds * sample_rate), dtype=np.float32) / sample_rate
+    bursts = (np.sin(2 * np.pi * 0.7 * t) > -0.2).astype(np.float32)
+    signal = 6000 * bursts * np.sin(2 * np.pi * 220 * t) + rng.normal(0, 30, t.size).astype(np.float32)
+    samples = np.repeat(signal.astype('<i2').reshape(-1, 1), channels, axis=1)
+
+    buffer = io.BytesIO()
+    with wave.open(buffer, 'wb') as writer:
+        writer.setnchannels(channels)
+        writer.setsampwidth(2)
+        writer.setframerate(sample_rate)
+        writer.writeframes(samples.tobytes())
+    buffer.seek(0)
+    return buffer
+
+
+def main():
+    from src.services.audio import analyze_signal, decode_audio
+
+    print(f"{MINUTES:g}-minute WAV, best of {REPEATS}\n")
+    print(f"{'format':<15}{'size MB':>9}{'decode ms':>11}{'analyze ms':>12}{'total ms':>10}")
+    worst = 0.0  # mono formats only
+    for label, sample_rate, channels in FORMATS:
+        stream = recording(sample_rate, channels, MINUTES * 60)
+        size = len(stream.getbuffer())
+        decode_times, analyze_times = [], []
+        for _ in range(REPEATS):
+            start = time.perf_counter()
+            audio = decode_audio(stream, 'recording.wav')
+            decoded = time.perf_counter()
+            metrics = analyze_signal(audio)
+            decode_times.append(decoded - start)
+            analyze_times.append(time.perf_counter() - decoded)
+        total = (min(decode_times) + min(analyze_times)) * 1000
+        if channels == 1:
+            worst = max(worst, total)
+        print(f"{label:<15}{size / 1048576:>9.1f}{min(decode_times) * 1000:>11.1f}"
+              f"{min(analyze_times) * 1000:>12.1f}{total:>10.1f}")
+
+    print(f"\nLast metrics: {metrics}")
+    print(f"Slowest mono format: {worst:.1f} ms (budget {BUDGET_MS} ms)")
+    return 0 if worst < BUDGET_MS else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
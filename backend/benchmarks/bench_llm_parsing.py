@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+LLM Response Parsing Benchmark for TradesMate
+Replays a corpus of GPT-4 quote responses through the previous parser
+(greedy regex + json.loads + hand-patched fields) and the balanced-brace
+extractor + QuoteSchema, reporting parse-failure rate (each failure is a
+wasted GPT-4 call) and parse time.
+
+The corpus is benchmarks/data/quote_responses.jsonl: one
+{"id", "shape", "expect", "response"} object per line, where expect is
+"ok" when the response contains a usable quote. Append captured production
+responses in the same format to keep the numbers honest.
+
+Run from the backend directory:
+    python benchmarks/bench_llm_parsing.py [repeats]
+"""
+
+import json
+import re
+import sys
+import time
+from collections import Counter
+from pathlib import Path
+
+# Add the backend directory to Python path so `src` imports as a package
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+CORPUS = Path(__file__).resolve().parent / 'data' / 'quote_responses.jsonl'
+REPEATS = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+HOURLY_RATE = 45.0
+
+
+def legacy_parse(content, default_hourly_rate):
+    """The parser AIService used before the balanced-brace extractor"""
+    json_match = re.search(r'\{.*\}', content, re.DOTALL)
+    if json_match:
+        content = json_match.group()
+    quote_data = json.loads(content)
+
+    required_fields = {
+        'customer_name': 'Unknown Customer',
+        'job_description': 'Job description not provided',
+        'job_type': 'General',
+        'urgency': 'normal',
+        'labour_hours': 2.0,
+        'labour_rate': default_hourly_rate,
+        'materials_cost': 0.0,
+        'confidence': 0.8
+    }
+    for field, default_value in required_fields.items():
+        if field not in quote_data or quote_data[field] is None:
+            quote_data[field] = default_value
+    if 'materials' not in quote_data or not isinstance(quote_data['materials'], list):
+        quote_data['materials'] = []
+    labour_cost = quote_data['labour_hours'] * quote_data['labour_rate']
+    subtotal = labour_cost + quote_data['materials_cost']
+    vat_amount = subtotal * 0.20
+    quote_data.update({
+        'subtotal': round(subtotal, 2),
+        'vat_amount': round(vat_amount, 2),
+        'total_amount': round(subtotal + vat_amount, 2)
+    })
+    return quote_data
+
+
+def new_parse(content, default_hourly_rate):
+    from src.services.llm_json import extract_json_object
+    from src.services.quote_schema import quote_schema
+    return quote_schema.validate(extract_json_object(content), default_hourly_rate)
+
+
+def usable(quote):
+    """A quote we could show the user: numeric totals and a positive total"""
+    return isinstance(quote.get('total_amount'), float) and quote['total_amount'] > 0
+
+
+def evaluate(parse, corpus):
+    """Failures per shape, counting only responses that contained a usable quote"""
+    failures = Counter()
+    for record in corpus:
+        if record['expect'] != 'ok':
+            continue
+        try:
+            ok = usable(parse(record['response'], HOURLY_RATE))
+        except Exception:
+            ok = False
+        if not ok:
+            failures[record['shape']] += 1
+    return failures
+
+
+def time_per_response(parse, corpus):
+    """Mean parse time in microseconds over REPEATS passes of the corpus"""
+    start = time.perf_counter()
+    for _ in range(REPEATS):
+        for record in corpus:
+            try:
+                parse(record['response'], HOURLY_RATE)
+            except Exception:
+                pass
+    return (time.perf_counter() - start) / (REPEATS * len(corpus)) * 1e6
+
+
+def check_streaming(corpus):
+    """The incremental scanner must find the same object when fed in small chunks"""
+    from src.services.llm_json import JSONObjectScanner, extract_json_object
+    mismatches = 0
+    for record in corpus:
+        try:
+            expected = extract_json_object(record['response'])
+        except ValueError:
+            continue
+        scanner = JSONObjectScanner()
+        text = record['response']
+        found = None
+        for i in range(0, len(text), 3):
+            found = scanner.feed(text[i:i + 3])
+            if found is not None:
+                break
+        mismatches += found != expected
+    return mismatches
+
+
+def main():
+    with open(CORPUS, encoding='utf-8') as corpus_file:
+        corpus = [json.loads(line) for line in corpus_file if line.strip()]
+    parseable = sum(record['expect'] == 'ok' for record in corpus)
+    shapes = Counter(record['shape'] for record in corpus)
+
+    print(f"Corpus: {len(corpus)} responses, {parseable} containing a usable quote\n")
+    results = {}
+    for label, parse in (('legacy regex', legacy_parse), ('balanced+schema', new_parse)):
+        failures = evaluate(parse, corpus)
+        results[label] = failures
+        failed = sum(failures.values())
+        print(f"{label:>16}: {failed:3d} failed  "
+              f"wasted-call rate {failed / parseable:6.1%}  "
+              f"{time_per_response(parse, corpus):7.1f} us/response")
+
+    print(f"\n{'shape':<24}{'count':>6}{'legacy':>8}{'new':>6}")
+    for shape, count in sorted(shapes.items()):
+        print(f"{shape:<24}{count:>6}{results['legacy regex'][shape]:>8}{results['balanced+schema'][shape]:>6}")
+
+    mismatches = check_streaming(corpus)
+    print(f"\nIncremental scanner (3-char chunks) disagreements with full-text extraction: {mismatches}")
+    return 1 if mismatches or sum(results['balanced+schema'].values()) else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
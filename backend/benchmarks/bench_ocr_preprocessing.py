@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+OCR Preprocessing Benchmark for TradesMate
+Times each stage of the photo pipeline (decode, orient, grayscale,
+downscale, adaptive threshold, deskew) on a synthetic page of handwriting-
+sized word blocks, skewed by a few degrees under a strong lighting
+gradient, at common phone camera resolutions. Also reports how closely
+deskew recovers the applied angle and how much background the threshold
+mistakes for ink in the shadow, then pushes a batch of photos through the
+OCR process pool to show throughput across cores.
+
+Pages are encoded as BMP so the benchmark needs neither Pillow nor
+tesseract; without tesseract the pool runs a blank engine, so the numbers
+are preprocessing only.
+
+Run from the backend directory:
+    python benchmarks/bench_ocr_preprocessing.py [photos] [skew_degrees]
+"""
+
+import struct
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import numpy as np
+
+# Add the backend directory to Python path so `src` imports as a package
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+PHOTOS = int(sys.argv[1]) if len(sys.argv) > 1 else 8
+SKEW = float(sys.argv[2]) if len(sys.argv) > 2 else 4.0
+REPEATS = 3
+
+# (label, width, height)
+RESOLUTIONS = [
+    ('1 MP', 1152, 864),
+    ('3 MP', 2000, 1500),
+    ('12 MP', 4000, 3000),
+]
+
+
+def blank_engine(image):
+    """Stand-in OCR engine when tesseract is not installed"""
+    return '', 0.0
+
+
+def page(width, height, skew, shadow=True):
+    """Lines of dark word blocks on a light page, rotated by skew degrees, with a shadow across it"""
+    from src.services.imaging import rotate
+
+    rng = np.random.default_rng(0)
+    scale = width / 2000
+    ink = np.zeros((height, width), dtype=bool)
+    for row in range(int(150 * scale), height - int(150 * scale), max(8, int(70 * scale))):
+        x = int(150 * scale)
+        while x < width - int(300 * scale):
+            word = int(rng.integers(40, 160) * scale)
+            ink[row:row + max(3, int(22 * scale)), x:x + word] = True
+            x += word + int(rng.integers(20, 40) * scale)
+    truth = rotate(np.where(ink, 0, 255).astype(np.uint8), -skew) == 0
+
+    gray = np.where(truth, 40.0, 230.0)
+    if shadow:
+        gray *= np.linspace(0.45, 1.0, width)[None, :]
+    gray += rng.normal(0, 6, gray.shape)
+    return np.clip(gray, 0, 255).astype(np.uint8), truth
+
+
+def bmp(gray):
+    """24-bit BMP of a grayscale page, as a phone upload would be colour"""
+    height, width = gray.shape
+    stride = (24 * width + 31) // 32 * 4
+    rows = np.zeros((height, stride), dtype=np.uint8)
+    rows[:, :width * 3] = np.repeat(gray[::-1], 3, axis=1)
+    header = b'BM' + struct.pack('<IHHI', 54 + rows.size, 0, 0, 54) + struct.pack(
+        '<IiiHHIIiiII', 40, width, height, 1, 24, 0, rows.size, 2835, 2835, 0, 0)
+    return header + rows.tobytes()
+
+
+def main():
+    from src.services import imaging
+    from src.services.photo_intelligence_service import PhotoIntelligenceService, ocr_stats
+
+    print(f"Synthetic note skewed {SKEW:g} degrees with a shadow, best of {REPEATS} (ms)\n")
+    stages = ['decode', 'orient', 'grayscale', 'downscale', 'threshold', 'deskew']
+    print(f"{'size':<7}" + ''.join(f"{stage:>11}" for stage in stages) + f"{'total':>9}{'skew':>8}{'false ink':>11}")
+    for label, width, height in RESOLUTIONS:
+        gray, truth = page(width, height, SKEW)
+        data = bmp(gray)
+        best = {}
+        for _ in range(REPEATS):
+            binary, info = imaging.prepare_image(data, 'note.bmp')
+            for stage, elapsed in info['timings_ms'].items():
+                best[stage] = min(best.get(stage, elapsed), elapsed)
+        # Background taken for ink in the un-deskewed threshold, against the known page
+        threshold_only = imaging.adaptive_threshold(imaging.downscale(gray, 2000))
+        if threshold_only.shape == truth.shape:
+            false_ink = f"{float(((threshold_only == 0) & ~truth).sum() / (~truth).sum()):.2%}"
+        else:
+            false_ink = 'n/a'
+        print(f"{label:<7}" + ''.join(f"{best[stage]:>11.1f}" for stage in stages) +
+              f"{sum(best.values()):>9.1f}{info['skew_angle']:>8.1f}{false_ink:>11}")
+
+    engine = imaging.get_ocr_engine()
+    if engine is None:
+        imaging.register_ocr_engine('blank', blank_engine)
+        engine = imaging.get_ocr_engine('blank')
+        import os
+        os.environ['OCR_ENGINE'] = 'blank'
+    service = PhotoIntelligenceService()
+    workers = service.workers()
+    gray, _ = page(2000, 1500, SKEW)
+    path = Path(__file__).resolve().parent / '.bench_note.bmp'
+    path.write_bytes(bmp(gray))
+    try:
+        service.extract_text_from_image(str(path))  # start the pool
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=workers * 2) as pool:
+            results = list(pool.map(service.extract_text_from_image, [str(path)] * PHOTOS))
+        elapsed = time.perf_counter() - started
+    finally:
+        path.unlink()
+
+    failed = [result['error'] for result in results if not result['success']]
+    print(f"\nPool: {PHOTOS} x 3 MP photos, engine {engine[0]}, {workers} worker(s): "
+          f"{PHOTOS / elapsed:.1f} photos/s ({elapsed * 1000 / PHOTOS:.0f} ms each)")
+    if failed:
+        print(f"Failures: {failed[:3]}")
+    print("Average per stage in workers: " + ', '.join(
+        f"{stage} {stats['avg_ms']:.0f}" for stage, stats in ocr_stats()['stages'].items() if stats['count']))
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
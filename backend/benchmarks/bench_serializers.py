@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Serializer Micro-benchmark for TradesMate
+Compares hydrating ORM objects + to_dict() against Core rows + RowMapper
+for the quote list query, and checks both produce identical output.
+
+Run from the backend directory:
+    python benchmarks/bench_serializers.py [rows]
+"""
+
+import logging
+import sys
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+# Add the backend directory to Python path so `src` imports as a package
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+logging.basicConfig(level=logging.WARNING)
+
+ROWS = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+REPEATS = 5
+
+
+def best_of(fn):
+    """Best wall-clock time of REPEATS runs, in seconds"""
+    timings = []
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    from sqlalchemy import insert
+    from src.main import create_app
+    from src.database import db
+    from src.models.quote import Quote
+    from src.models.serializers import row_mapper
+
+    app = create_app({'SQLALCHEMY_DATABASE_URI': 'sqlite://', 'SECRET_KEY': 'bench', 'TESTING': True})
+
+    with app.app_context():
+        now = datetime.utcnow()
+        db.session.execute(insert(Quote), [{
+            'user_id': 1, 'customer_name': f'Customer {i}', 'customer_email': f'c{i}@example.com',
+            'customer_address': '1 High Street', 'job_description': 'Replace kitchen sockets',
+            'job_type': 'Kitchen', 'urgency': 'normal', 'labour_hours': 3, 'labour_rate': 45,
+            'materials_cost': 80, 'subtotal': 215, 'vat_rate': 0.2, 'vat_amount': 43,
+            'total_amount': 258, 'materials': '[]', 'status': 'draft', 'quote_number': f'BENCH-{i:07d}',
+            'valid_until': now + timedelta(days=30), 'created_at': now - timedelta(minutes=i),
+            'updated_at': now - timedelta(minutes=i),
+        } for i in range(ROWS)])
+        db.session.commit()
+
+        mapper = row_mapper(Quote)
+
+        def orm_path():
+            result = [q.to_dict() for q in Quote.query.filter_by(user_id=1).order_by(Quote.created_at.desc()).all()]
+            db.session.expunge_all()
+            return result
+
+        def row_path():
+            statement = mapper.select().where(Quote.user_id == 1).order_by(Quote.created_at.desc())
+            return mapper.to_dicts(db.session.execute(statement))
+
+        assert orm_path() == row_path(), 'RowMapper output differs from to_dict()'
+
+        orm_time = best_of(orm_path)
+        row_time = best_of(row_path)
+
+    print(f"Rows:                 {ROWS}")
+    print(f"ORM + to_dict():      {orm_time * 1000:8.1f} ms")
+    print(f"Core rows + mapper:   {row_time * 1000:8.1f} ms")
+    print(f"Speedup:              {orm_time / row_time:8.2f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Whisper Upload Benchmark for TradesMate
+Compares the old transcribe_audio upload path (read the whole upload, write a
+.wav temp file, reopen it) with streaming the upload straight into the
+multipart request. Uses a mock HTTP transport that drains the request body,
+so only client-side work is measured: wall time, peak Python heap and bytes
+written to disk.
+
+Run from the backend directory:
+    python benchmarks/bench_transcribe_upload.py [size_mb ...]
+"""
+
+import io
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+import httpx
+from openai import OpenAI
+from werkzeug.datastructures import FileStorage
+
+# Add the backend directory to Python path so `src` imports as a package
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+SIZES_MB = [float(arg) for arg in sys.argv[1:]] or [1, 5, 20]
+REPEATS = 3
+
+TRANSCRIPT = {'text': 'Replace two sockets in the kitchen', 'language': 'english', 'duration': 4.2, 'segments': []}
+
+
+class DrainTransport(httpx.BaseTransport):
+    """
+    Mock OpenAI: consume the multipart body chunk by chunk and answer like Whisper
+
+    (httpx.MockTransport buffers the whole request first, which would hide the difference.)
+    """
+
+    last_received = 0
+
+    def handle_request(self, request):
+        received = 0
+        for chunk in request.stream:
+            received += len(chunk)
+        DrainTransport.last_received = received
+        return httpx.Response(200, json=TRANSCRIPT)
+
+
+def make_client():
+    return OpenAI(api_key='bench', max_retries=0, http_client=httpx.Client(transport=DrainTransport()))
+
+
+def upload(size):
+    """A werkzeug upload like request.files['audio'], buffered in memory"""
+    # Written rather than passed to BytesIO(), whose read() would share the bytes without copying
+    stream = io.BytesIO()
+    stream.write(os.urandom(size))
+    stream.seek(0)
+    return FileStorage(stream=stream, filename='site-visit.m4a', content_type='audio/mp4')
+
+
+def legacy_transcribe(client, audio_file):
+    """transcribe_audio's upload handling before streaming"""
+    with tempfile.NamedTemporaryFile(delete=False, suffix='.wav') as temp_file:
+        audio_file.seek(0)
+        temp_file.write(audio_file.read())
+        temp_file_path = temp_file.name
+    try:
+        with open(temp_file_path, 'rb') as audio_data:
+            return client.audio.transcriptions.create(
+                model="whisper-1", file=audio_data, response_format="verbose_json", language="en"
+            ), os.path.getsize(temp_file_path)
+    finally:
+        os.unlink(temp_file_path)
+
+
+def streaming_transcribe(client, audio_file):
+    """The current VoiceService path, with the shared client swapped for the mock"""
+    from src.services import voice_service
+
+    voice_service.get_ai_client = lambda capability: client
+    service = voice_service.VoiceService()
+    filename, content_type = service.upload_name_and_type(audio_file)
+    return service._transcribe_stream(audio_file.stream, filename, content_type), 0
+
+
+def measure(fn, size):
+    """Best wall time, and peak heap / disk bytes of one run"""
+    client = make_client()
+    timings = []
+    for _ in range(REPEATS):
+        audio_file = upload(size)
+        start = time.perf_counter()
+        fn(client, audio_file)
+        timings.append(time.perf_counter() - start)
+
+    audio_file = upload(size)
+    tracemalloc.start()
+    baseline = tracemalloc.get_traced_memory()[0]
+    _, disk_bytes = fn(client, audio_file)
+    peak = tracemalloc.get_traced_memory()[1] - baseline
+    tracemalloc.stop()
+    return min(timings), peak, disk_bytes, DrainTransport.last_received
+
+
+def main():
+    print(f"{'size':>7} {'path':<10} {'time ms':>9} {'peak heap MB':>13} {'disk MB':>8} {'sent MB':>8}")
+    for size_mb in SIZES_MB:
+        size = int(size_mb * 1024 * 1024)
+        for label, fn in (('temp file', legacy_transcribe), ('streaming', streaming_transcribe)):
+            seconds, peak, disk_bytes, sent = measure(fn, size)
+            print(f"{size_mb:>5g}MB {label:<10} {seconds * 1000:>9.1f} {peak / 1048576:>13.2f} "
+                  f"{disk_bytes / 1048576:>8.2f} {sent / 1048576:>8.2f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+Voice Pipeline Load Test for TradesMate
+Drives the full voice -> quote -> database pipeline at a chosen concurrency
+with no network. Whisper and GPT-4 are replaced by the deterministic local
+engine (AI_BACKEND=local), so resilience, caching, parsing and database
+writes all run as in production. Each request uploads a distinct synthetic
+recording to POST /api/voice/voice-to-quote, then saves the quote with
+POST /api/quotes/create.
+
+Reports throughput, per-stage latency percentiles, outcome counts
+(including heuristic fallbacks while the circuit is open) and the local
+engine's injected errors.
+
+Run from the backend directory:
+    python benchmarks/load_voice_pipeline.py [requests] [concurrency] [profile] [latency_scale]
+
+profile is one of the LOCAL_AI_PROFILE values: instant, realistic (default),
+degraded, outage. latency_scale shrinks or stretches every simulated call.
+"""
+
+import io
+import json
+import os
+import queue
+import sys
+import tempfile
+import threading
+import time
+import wave
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import numpy as np
+
+REQUESTS = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+CONCURRENCY = int(sys.argv[2]) if len(sys.argv) > 2 else 16
+PROFILE = sys.argv[3] if len(sys.argv) > 3 else 'realistic'
+LATENCY_SCALE = sys.argv[4] if len(sys.argv) > 4 else '0.1'
+
+WORKDIR = tempfile.mkdtemp(prefix='tradesmate-load-')
+os.environ.update({
+    'AI_BACKEND': 'local',
+    'LOCAL_AI_PROFILE': PROFILE,
+    'LOCAL_AI_LATENCY_SCALE': LATENCY_SCALE,
+    # Fresh caches, with quote caching off so every request reaches the chat backend
+    'AI_CACHE_DB': os.path.join(WORKDIR, 'ai_cache.db'),
+    'AI_CACHE_TTL': '0',
+    'TRANSCRIBE_CACHE_DB': os.path.join(WORKDIR, 'transcripts.db'),
+    'RATE_LIMIT_DB': os.path.join(WORKDIR, 'ratelimit.db'),
+    'RATE_LIMIT_AI_BURST': '1000000',
+    'RATE_LIMIT_AI_PER_MINUTE': '1000000',
+    'RATE_LIMIT_LOGIN_ACCOUNT_BURST': '1000',
+    'RATE_LIMIT_LOGIN_IP_BURST': '1000',
+})
+# Load the app the way local dev runs it, with src on the path
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'src'))
+
+USER = {'name': 'Load Test', 'email': 'load@example.com', 'password': 'load-test-pass-123',
+        'trade_type': 'Electrician', 'hourly_rate': 45.0}
+
+
+def recording(index, seconds=12, sample_rate=16000):
+    """A distinct speech-like WAV per request, so the transcript cache never hits"""
+    rng = np.random.default_rng(index)
+    t = np.arange(seconds * sample_rate) / sample_rate
+    bursts = np.sin(2 * np.pi * 0.7 * t) > -0.2
+    signal = 6000 * bursts * np.sin(2 * np.pi * rng.uniform(150, 300) * t) + rng.normal(0, 30, t.size)
+    buffer = io.BytesIO()
+    with wave.open(buffer, 'wb') as writer:
+        writer.setnchannels(1)
+        writer.setsampwidth(2)
+        writer.setframerate(sample_rate)
+        writer.writeframes(signal.astype('<i2').tobytes())
+    buffer.seek(0)
+    return buffer
+
+
+def build_app():
+    from main import create_app
+
+    app = create_app({'SQLALCHEMY_DATABASE_URI': f'sqlite:///{os.path.join(WORKDIR, "load.db")}', 'TESTING': True})
+    app.test_client().post('/api/auth/register', json=USER)
+    return app
+
+
+def percentile(values, q):
+    return float(np.percentile(values, q)) * 1000 if values else 0.0
+
+
+def main():
+    app = build_app()
+    outcomes = Counter()
+    timings = {'voice_to_quote': [], 'save_quote': [], 'total': []}
+    lock = threading.Lock()
+
+    # Logged-in test clients, one per worker; logins run up front so password hashing is not measured
+    clients = queue.Queue()
+    for _ in range(CONCURRENCY):
+        http = app.test_client()
+        login = http.post('/api/auth/login', json={'email': USER['email'], 'password': USER['password']})
+        if login.status_code != 200:
+            print(f"Login failed: {login.status_code} {login.get_json()}")
+            return 1
+        clients.put(http)
+
+    def run(index):
+        http = clients.get()
+        try:
+            request_pipeline(http, index)
+        finally:
+            clients.put(http)
+
+    def request_pipeline(http, index):
+        start = time.perf_counter()
+        response = http.post('/api/voice/voice-to-quote', data={'audio': (recording(index), f'visit-{index}.wav')},
+                             content_type='multipart/form-data')
+        quoted = time.perf_counter()
+        body = response.get_json() or {}
+        if response.status_code != 200:
+            with lock:
+                outcomes[f'voice_to_quote {response.status_code}'] += 1
+            return
+
+        quote = dict(body['quote_data'], voice_transcript=body['transcript'], ai_confidence=body['ai_confidence'])
+        quote['materials'] = json.dumps(quote.get('materials', []))  # stored as a JSON string column
+        saved = http.post('/api/quotes/create', json=quote)
+        done = time.perf_counter()
+        with lock:
+            outcomes['fallback quote' if body['quote_data'].get('notes', '').startswith('Rough estimate')
+                     else 'ai quote'] += 1
+            if saved.status_code != 201:
+                outcomes[f'save {saved.status_code}'] += 1
+            timings['voice_to_quote'].append(quoted - start)
+            timings['save_quote'].append(done - quoted)
+            timings['total'].append(done - start)
+
+    print(f"{REQUESTS} requests, concurrency {CONCURRENCY}, profile {PROFILE}, latency scale {LATENCY_SCALE}\n")
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=CONCURRENCY) as pool:
+        list(pool.map(run, range(REQUESTS)))
+    elapsed = time.perf_counter() - started
+
+    print(f"Throughput: {REQUESTS / elapsed:.1f} req/s over {elapsed:.1f}s\n")
+    print(f"{'stage':<16}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'max ms':>9}")
+    for stage, values in timings.items():
+        print(f"{stage:<16}{percentile(values, 50):>9.1f}{percentile(values, 95):>9.1f}"
+              f"{percentile(values, 99):>9.1f}{percentile(values, 100):>9.1f}")
+
+    print("\nOutcomes:")
+    for outcome, count in outcomes.most_common():
+        print(f"  {outcome:<24}{count:>6}")
+
+    import metrics
+    snapshot = metrics.snapshot()
+    engine = snapshot.get('ai_backends', {}).get('local_engine')
+    if engine:
+        print(f"\nLocal engine calls: {engine['calls']}  injected errors: {engine['injected_errors']}")
+    guards = snapshot.get('ai_resilience', {})
+    for name, stats in guards.items():
+        if isinstance(stats, dict):
+            print(f"{name}: state {stats['state']}, retries {stats['retries']}, "
+                  f"bulkhead rejected {stats['rejected']}, short-circuited {stats['short_circuited']}")
+    print(f"\nWork files in {WORKDIR}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
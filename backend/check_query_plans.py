@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+"""
+Query Plan Regression Check for TradesMate
+Drives the real API routes against a seeded SQLite database, captures every
+SELECT they issue, runs EXPLAIN QUERY PLAN on each and fails if any of them
+falls back to a full table scan.
+
+Run from the backend directory:
+    python check_query_plans.py
+"""
+
+import logging
+import re
+import sys
+from datetime import datetime, timedelta
+from pathlib import Path
+
+# Add the backend directory to Python path so `src` imports as a package
+backend_dir = Path(__file__).parent
+sys.path.insert(0, str(backend_dir))
+
+logging.basicConfig(level=logging.WARNING)
+log = logging.getLogger(__name__)
+
+# Rows per table - enough that the planner has a reason to prefer an index
+SEED_ROWS = 200
+
+# Route calls to exercise: (method, path, json body or query string)
+# Add new list/lookup routes here as they are introduced.
+ROUTE_CALLS = [
+    ('GET', '/api/auth/me', None),
+    ('GET', '/api/quotes/', None),
+    ('GET', '/api/quotes/', {'limit': 10}),
+    ('GET', '/api/quotes/', {'status': 'sent'}),
+    ('GET', '/api/quotes/', {'status': 'draft,sent', 'urgency': 'urgent'}),
+    ('GET', '/api/quotes/', {'job_type': 'Kitchen'}),
+    ('GET', '/api/quotes/', {'q': 'customer 1', 'status': 'sent'}),
+    ('GET', '/api/quotes/', {'created_after': '2024-01-01', 'created_before': '2030-01-01'}),
+    ('GET', '/api/quotes/', {'fields': 'summary'}),
+    ('GET', '/api/quotes/stats', None),
+    ('GET', '/api/quotes/export', None),
+    ('GET', '/api/quotes/export', {'format': 'csv', 'created_after': '2024-01-01'}),
+    ('GET', '/api/invoices/', None),
+    ('GET', '/api/invoices/', {'fields': 'summary', 'status': 'pending,overdue'}),
+    ('GET', '/api/invoices/export', None),
+    ('GET', '/api/invoices/export', {'status': 'pending', 'created_before': '2030-01-01'}),
+    ('POST', '/api/quotes/batch', {'operations': [
+        {'op': 'update_status', 'id': 1, 'status': 'sent'},
+        {'op': 'delete', 'id': 5},
+    ]}),
+]
+
+# SQLite >= 3.36 prints "SCAN quotes", older versions "SCAN TABLE quotes"; either may
+# add "USING [COVERING] INDEX name" when the whole table is walked in index order
+SCAN = re.compile(r'^SCAN (?:TABLE )?(\w+)(?: USING (COVERING )?INDEX (\w+))?')
+TEMP_SORT = 'USE TEMP B-TREE'
+
+
+def seed(db, User, Quote, Job, Invoice):
+    """Create one login user plus background rows for other users"""
+    user = User(name='Plan Check', email='plancheck@example.com', trade_type='Plumber')
+    user.set_password('plan-check')
+    db.session.add(user)
+    db.session.flush()
+
+    now = datetime.utcnow()
+    statuses = ['draft', 'sent', 'accepted', 'rejected']
+    for i in range(SEED_ROWS):
+        owner_id = user.id if i % 4 == 0 else user.id + 1 + i % 3
+        db.session.add(Quote(
+            user_id=owner_id, customer_name=f'Customer {i}', job_description='Seed',
+            job_type='Kitchen' if i % 2 else 'General', urgency='urgent' if i % 5 == 0 else 'normal',
+            labour_hours=1, labour_rate=35, subtotal=35, vat_amount=7, total_amount=42,
+            status=statuses[i % 4], quote_number=f'PLAN-{i:06d}',
+            created_at=now - timedelta(hours=i)
+        ))
+        db.session.add(Job(
+            user_id=owner_id, customer_name=f'Customer {i}', job_description='Seed',
+            scheduled_date=now + timedelta(days=i % 30), status='scheduled'
+        ))
+        db.session.add(Invoice(
+            user_id=owner_id, invoice_number=f'INV-PLAN-{i:06d}', customer_name=f'Customer {i}',
+            subtotal=35, vat_amount=7, total_amount=42,
+            status='overdue' if i % 7 == 0 else 'pending', due_date=now + timedelta(days=i % 60 - 30),
+            created_at=now - timedelta(hours=i)
+        ))
+    db.session.commit()
+    db.session.execute(db.text('ANALYZE'))
+    return user
+
+
+def model_access_paths(db, user_id, Job, Invoice):
+    """Access paths for models that do not have list routes yet"""
+    now = datetime.utcnow()
+    Job.query.filter(Job.user_id == user_id).order_by(Job.scheduled_date).all()
+    Job.query.filter(Job.user_id == user_id, Job.status == 'scheduled').all()
+    Invoice.query.filter(Invoice.user_id == user_id).order_by(Invoice.created_at.desc()).all()
+    Invoice.query.filter(Invoice.user_id == user_id).order_by(Invoice.due_date).all()
+    Invoice.query.filter(Invoice.status == 'pending', Invoice.due_date < now).all()
+
+
+def full_scan(line, tables):
+    """
+    Describe a plan line that reads a whole table, or return None
+
+    A covering-index scan skips the table lookups but still reads an index
+    entry for every row of every user, so it is reported as a failure too.
+    Scans of subqueries, CTEs and constant rows are ignored.
+    """
+    match = SCAN.match(line)
+    if not match or match.group(1) not in tables:
+        return None
+    table, covering, index = match.groups()
+    if covering:
+        return f'full scan of covering index {index} on {table}'
+    if index:
+        return f'full scan of {table} in {index} order'
+    return f'full table scan of {table}'
+
+
+def explain(connection, statement, parameters):
+    """Return the EXPLAIN QUERY PLAN detail lines for a captured statement"""
+    cursor = connection.exec_driver_sql(f'EXPLAIN QUERY PLAN {statement}', parameters)
+    return [row[-1] for row in cursor]
+
+
+def check_query_plans():
+    """Run all routes and access paths, returning the number of failing queries"""
+    from sqlalchemy import event
+    from src.main import create_app
+    from src.database import db
+    from src.models.user import User
+    from src.models.quote import Quote, Job, Invoice
+
+    app = create_app({
+        'SQLALCHEMY_DATABASE_URI': 'sqlite://',
+        'SECRET_KEY': 'plan-check',
+        'TESTING': True,
+    })
+
+    captured = []
+
+    with app.app_context():
+        user = seed(db, User, Quote, Job, Invoice)
+        user_id = user.id
+        # Start routes with an empty identity map so lookups really hit the DB
+        db.session.remove()
+
+        def capture(conn, cursor, statement, parameters, context, executemany):
+            if statement.lstrip().upper().startswith('SELECT') and not executemany:
+                captured.append((statement, parameters))
+
+        event.listen(db.engine, 'before_cursor_execute', capture)
+
+        client = app.test_client()
+        with client.session_transaction() as sess:
+            sess['user_id'] = user_id
+
+        for method, path, payload in ROUTE_CALLS:
+            if method == 'GET':
+                response = client.get(path, query_string=payload)
+            else:
+                response = client.open(path, method=method, json=payload)
+            response.get_data()  # drain streamed responses so their queries run
+            if response.status_code >= 400:
+                log.error(f"{method} {path} returned {response.status_code}")
+                return 1
+
+        model_access_paths(db, user_id, Job, Invoice)
+        event.remove(db.engine, 'before_cursor_execute', capture)
+
+        failures = 0
+        seen = set()
+        tables = set(db.metadata.tables)
+        with db.engine.connect() as connection:
+            for statement, parameters in captured:
+                if statement in seen or 'FROM' not in statement.upper():
+                    continue
+                seen.add(statement)
+                plan = explain(connection, statement, parameters)
+                scans = [scan for scan in (full_scan(line, tables) for line in plan) if scan]
+                flat = ' '.join(statement.split())
+                summary = flat[flat.upper().find(' FROM '):].strip()[:120]
+                if scans:
+                    failures += 1
+                    print(f"❌ {summary}: {'; '.join(scans)}")
+                    for line in plan:
+                        print(f"     {line}")
+                else:
+                    marker = '⚠️ ' if any(TEMP_SORT in line for line in plan) else '✅'
+                    print(f"{marker} {summary}")
+
+        print(f"\nChecked {len(seen)} distinct queries, {failures} full table scan(s)")
+        return failures
+
+
+if __name__ == '__main__':
+    print("=" * 50)
+    print("TradesMate Query Plan Check")
+    print("=" * 50)
+
+    if check_query_plans():
+        print("❌ Query plan check failed - add or fix an index for the queries above")
+        sys.exit(1)
+
+    print("✅ All queries use an index")
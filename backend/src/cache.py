@@ -0,0 +1,229 @@
+"""
+Caching primitives for TradesMate
+In-process LRU/TTL caches and a SQLite-backed store shared by all workers
+on a node
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+
+class TTLCache:
+    """
+    Thread-safe, size-bounded LRU cache whose entries expire after `ttl` seconds
+
+    Counts hits, misses, expirations and evictions for the stats endpoint.
+    """
+
+    def __init__(self, maxsize=1024, ttl=60.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.expirations = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get(self, key, default=None):
+        """Return the cached value, or default when missing or expired"""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+            value, expires_at = entry
+            if expires_at <= now:
+                del self._data[key]
+                self.expirations += 1
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key, value, ttl=None):
+        """Store a value, evicting the least recently used entry when full"""
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, key):
+        """Drop one entry; returns True if it was cached"""
+        with self._lock:
+            if self._data.pop(key, None) is not None:
+                self.invalidations += 1
+                return True
+            return False
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+    def stats(self):
+        """Counters and current size"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self._data),
+                'maxsize': self.maxsize,
+                'ttl_seconds': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0,
+                'expirations': self.expirations,
+                'evictions': self.evictions,
+                'invalidations': self.invalidations,
+            }
+
+
+class SQLiteCache:
+    """
+    Persistent JSON cache in a local SQLite file, shared across workers
+
+    Entries expire after `ttl` seconds; when more than `max_entries` are
+    stored the least recently read ones are evicted.
+    """
+
+    def __init__(self, path, ttl=86400.0, max_entries=10000):
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._writes = 0
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+
+    def _connection(self):
+        """One connection per thread (and per process after fork)"""
+        connection = getattr(self._local, 'connection', None)
+        if connection is None or self._local.pid != os.getpid():
+            connection = sqlite3.connect(self.path, timeout=1.0, isolation_level=None)
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute('PRAGMA synchronous=NORMAL')
+            connection.execute(
+                'CREATE TABLE IF NOT EXISTS cache_entries ('
+                'key TEXT PRIMARY KEY, value TEXT NOT NULL, '
+                'expires_at REAL NOT NULL, last_access REAL NOT NULL)'
+            )
+            connection.execute(
+                'CREATE INDEX IF NOT EXISTS ix_cache_entries_last_access '
+                'ON cache_entries (last_access)'
+            )
+            self._local.connection = connection
+            self._local.pid = os.getpid()
+        return connection
+
+    def _count(self, counter):
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def get(self, key):
+        """Return the decoded value, or None when missing, expired or unreadable"""
+        now = time.time()
+        try:
+            connection = self._connection()
+            row = connection.execute(
+                'SELECT value, expires_at FROM cache_entries WHERE key = ?', (key,)
+            ).fetchone()
+            if row is None or row[1] <= now:
+                if row is not None:
+                    connection.execute('DELETE FROM cache_entries WHERE key = ?', (key,))
+                self._count('misses')
+                return None
+            connection.execute('UPDATE cache_entries SET last_access = ? WHERE key = ?', (now, key))
+        except sqlite3.Error:
+            self._count('errors')
+            return None
+        self._count('hits')
+        return json.loads(row[0])
+
+    def set(self, key, value, ttl=None):
+        """Store a JSON-serialisable value"""
+        now = time.time()
+        expires_at = now + (self.ttl if ttl is None else ttl)
+        try:
+            connection = self._connection()
+            connection.execute(
+                'INSERT OR REPLACE INTO cache_entries (key, value, expires_at, last_access) '
+                'VALUES (?, ?, ?, ?)',
+                (key, json.dumps(value, separators=(',', ':')), expires_at, now)
+            )
+            with self._lock:
+                self._writes += 1
+                prune = self._writes % 100 == 0
+            if prune:
+                self.prune()
+        except sqlite3.Error:
+            self._count('errors')
+
+    def prune(self):
+        """Drop expired entries, then the least recently read beyond max_entries"""
+        connection = self._connection()
+        connection.execute('DELETE FROM cache_entries WHERE expires_at <= ?', (time.time(),))
+        connection.execute(
+            'DELETE FROM cache_entries WHERE key IN ('
+            'SELECT key FROM cache_entries ORDER BY last_access DESC LIMIT -1 OFFSET ?)',
+            (self.max_entries,)
+        )
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'path': self.path,
+                'max_entries': self.max_entries,
+                'ttl_seconds': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0,
+                'errors': self.errors,
+            }
+
+
+class TwoTierCache:
+    """In-process TTLCache in front of a shared SQLiteCache"""
+
+    def __init__(self, memory, disk):
+        self.memory = memory
+        self.disk = disk
+
+    def get(self, key):
+        """Return a fresh copy of the cached value, or None"""
+        encoded = self.memory.get(key)
+        if encoded is not None:
+            return json.loads(encoded)
+        value = self.disk.get(key)
+        if value is not None:
+            self.memory.set(key, json.dumps(value))
+        return value
+
+    def set(self, key, value):
+        # Stored encoded so callers can never mutate the cached copy
+        self.memory.set(key, json.dumps(value))
+        self.disk.set(key, value)
+
+    def stats(self):
+        memory, disk = self.memory.stats(), self.disk.stats()
+        lookups = memory['hits'] + memory['misses']
+        hits = memory['hits'] + disk['hits']
+        return {
+            'hit_rate': round(hits / lookups, 4) if lookups else 0.0,
+            'memory': memory,
+            'disk': disk,
+        }
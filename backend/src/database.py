@@ -2,6 +2,143 @@
 Database initialization for TradesMate
 """
 
+import os
+import threading
+import time
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import event
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import QueuePool
+try:
+    from .metrics import Histogram
+except ImportError:
+    from metrics import Histogram
 
 db = SQLAlchemy()
+
+
+class PoolStats:
+    """Counters for connection pool checkouts, waits and overflow"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.wait = Histogram()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.connects = 0
+            self.checkouts = 0
+            self.checkins = 0
+            self.invalidations = 0
+            self.overflow_checkouts = 0
+            self.timeouts = 0
+        self.wait.reset()
+
+    def record_wait(self, wait_ms, overflowed):
+        self.wait.observe(wait_ms)
+        if overflowed:
+            self.increment('overflow_checkouts')
+
+    def record_timeout(self):
+        self.increment('timeouts')
+
+    def increment(self, counter):
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def to_dict(self):
+        with self._lock:
+            counters = {
+                'connects': self.connects,
+                'checkouts': self.checkouts,
+                'checkins': self.checkins,
+                'invalidations': self.invalidations,
+                'overflow_checkouts': self.overflow_checkouts,
+                'timeouts': self.timeouts,
+            }
+        counters['checkout_wait'] = self.wait.to_dict()
+        return counters
+
+
+pool_stats = PoolStats()
+
+
+class InstrumentedQueuePool(QueuePool):
+    """QueuePool that times how long each checkout waits for a connection"""
+
+    def _do_get(self):
+        start = time.perf_counter()
+        overflow_before = self.overflow()
+        try:
+            connection = super()._do_get()
+        except PoolTimeoutError:
+            pool_stats.record_timeout()
+            raise
+        # overflow() counts opened connections from -pool_size up; only a
+        # checkout that opened one past pool_size is an overflow checkout,
+        # not every checkout made while overflow connections exist
+        overflow_after = self.overflow()
+        overflowed = overflow_after > overflow_before and overflow_after > 0
+        pool_stats.record_wait((time.perf_counter() - start) * 1000, overflowed)
+        return connection
+
+
+def engine_options_from_env(database_uri):
+    """
+    Build SQLALCHEMY_ENGINE_OPTIONS from DB_POOL_* environment variables
+
+    Size the pool so that gunicorn workers x threads x DB_POOL_SIZE (plus
+    overflow) stays under the database's connection limit.
+    """
+    options = {
+        'pool_pre_ping': os.getenv('DB_POOL_PRE_PING', 'true').lower() in ('1', 'true', 'yes'),
+        'pool_recycle': int(os.getenv('DB_POOL_RECYCLE', 1800)),
+    }
+    # In-memory SQLite needs its single shared StaticPool connection
+    if database_uri in ('sqlite://', 'sqlite:///:memory:'):
+        return options
+    options.update({
+        'poolclass': InstrumentedQueuePool,
+        'pool_size': int(os.getenv('DB_POOL_SIZE', 5)),
+        'max_overflow': int(os.getenv('DB_MAX_OVERFLOW', 10)),
+        'pool_timeout': float(os.getenv('DB_POOL_TIMEOUT', 30)),
+    })
+    return options
+
+
+def instrument_pool(engine):
+    """Attach pool event counters to an engine"""
+    pool = engine.pool
+    event.listen(pool, 'connect', lambda *args: pool_stats.increment('connects'))
+    event.listen(pool, 'checkout', lambda *args: pool_stats.increment('checkouts'))
+    event.listen(pool, 'checkin', lambda *args: pool_stats.increment('checkins'))
+    event.listen(pool, 'invalidate', lambda *args: pool_stats.increment('invalidations'))
+
+
+def pool_status(engine):
+    """Live pool gauges plus cumulative counters"""
+    pool = engine.pool
+    status = {'pool_class': type(pool).__name__}
+    if isinstance(pool, QueuePool):
+        status.update({
+            'size': pool.size(),
+            'checked_in': pool.checkedin(),
+            'checked_out': pool.checkedout(),
+            'overflow': pool.overflow(),
+            'timeout': pool.timeout(),
+        })
+    status.update(pool_stats.to_dict())
+    return status
+
+
+def ensure_indexes():
+    """
+    Create any model indexes missing from existing tables
+
+    db.create_all() only creates indexes alongside new tables, so databases
+    created before an index was declared never receive it.
+    """
+    for table in db.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=db.engine, checkfirst=True)
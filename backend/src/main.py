@@ -59,6 +59,16 @@ def create_app(test_config=None):
         app.config.from_mapping(test_config)
         log.info("Test configuration loaded.")
 
+    # Connection pool sizing, pre-ping and recycle from DB_POOL_* env vars
+    try:
+        from .database import engine_options_from_env
+    except ImportError:
+        from database import engine_options_from_env
+    app.config.setdefault(
+        'SQLALCHEMY_ENGINE_OPTIONS',
+        engine_options_from_env(app.config.get('SQLALCHEMY_DATABASE_URI', ''))
+    )
+
     # --- Database Initialization ---
     try:
         # Handle both relative and absolute imports
@@ -136,20 +146,34 @@ def create_app(test_config=None):
         try:
             # Handle flexible imports for both deployment and local dev
             try:
-                from .database import db
-                from .routes import auth, quotes
+                from .database import db, ensure_indexes, instrument_pool, pool_status
+                from . import metrics
+                from .routes import auth, quotes, invoices, jobs, internal, voice, photo
                 from .models import User, Quote
             except ImportError:
-                from database import db
-                from routes import auth, quotes
+                from database import db, ensure_indexes, instrument_pool, pool_status
+                import metrics
+                from routes import auth, quotes, invoices, jobs, internal, voice, photo
                 from models import User, Quote
 
             app.register_blueprint(auth.auth_bp)
             app.register_blueprint(quotes.quotes_bp)
+            app.register_blueprint(invoices.invoices_bp)
+            app.register_blueprint(jobs.jobs_bp)
+            app.register_blueprint(internal.internal_bp)
+            app.register_blueprint(voice.voice_bp)
+            app.register_blueprint(photo.photo_bp)
             log.info("Blueprints registered successfully.")
 
+            if not photo.photo_service.ocr_available():
+                log.warning("No OCR engine available (install tesseract or set OCR_ENGINE). Photo notes will return 503.")
+
+            instrument_pool(db.engine)
+            metrics.register('db_pool', lambda: pool_status(db.engine))
+
             db.create_all()
-            log.info("Database tables created/verified.")
+            ensure_indexes()
+            log.info("Database tables and indexes created/verified.")
 
         except ImportError as e:
             log.error(f"Failed to import a module during app context setup. Error: {e}")
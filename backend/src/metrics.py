@@ -0,0 +1,69 @@
+"""
+Process-local runtime metrics for TradesMate
+Components register a provider callable; the internal stats endpoint
+returns a snapshot of every provider.
+"""
+
+import threading
+
+_providers = {}
+_lock = threading.Lock()
+
+
+def register(name, provider):
+    """Register a zero-argument callable returning a JSON-ready dict"""
+    with _lock:
+        _providers[name] = provider
+
+
+def snapshot():
+    """Collect the current value of every registered provider"""
+    with _lock:
+        providers = dict(_providers)
+    stats = {}
+    for name, provider in providers.items():
+        try:
+            stats[name] = provider()
+        except Exception as e:
+            stats[name] = {'error': str(e)}
+    return stats
+
+
+class Histogram:
+    """Thread-safe latency histogram with fixed millisecond bucket bounds"""
+
+    DEFAULT_BUCKETS_MS = (1, 5, 10, 50, 100, 500, 1000, 5000)
+
+    def __init__(self, buckets_ms=DEFAULT_BUCKETS_MS):
+        self.buckets_ms = tuple(buckets_ms)
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.count = 0
+            self.total_ms = 0.0
+            self.max_ms = 0.0
+            self.buckets = [0] * (len(self.buckets_ms) + 1)
+
+    def observe(self, value_ms):
+        with self._lock:
+            self.count += 1
+            self.total_ms += value_ms
+            self.max_ms = max(self.max_ms, value_ms)
+            for i, bound in enumerate(self.buckets_ms):
+                if value_ms <= bound:
+                    self.buckets[i] += 1
+                    break
+            else:
+                self.buckets[-1] += 1
+
+    def to_dict(self):
+        with self._lock:
+            labels = [f'le_{bound}ms' for bound in self.buckets_ms] + ['inf']
+            return {
+                'count': self.count,
+                'avg_ms': round(self.total_ms / self.count, 3) if self.count else 0.0,
+                'max_ms': round(self.max_ms, 3),
+                'buckets': dict(zip(labels, self.buckets)),
+            }
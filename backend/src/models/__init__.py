@@ -1,5 +1,7 @@
 # Import all models here so they are registered with SQLAlchemy
 from .user import User
 from .quote import Quote
+from .sequence import NumberSequence
+from .ai_job import AIJob
 
-__all__ = ['User', 'Quote']
+__all__ = ['User', 'Quote', 'NumberSequence', 'AIJob']
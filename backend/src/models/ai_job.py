@@ -0,0 +1,45 @@
+"""
+Background AI job model for TradesMate
+"""
+
+import json
+from datetime import datetime
+try:
+    from ..database import db
+except ImportError:
+    from database import db
+
+class AIJob(db.Model):
+    """Queued voice-to-quote / photo-to-quote work and its result"""
+    
+    __tablename__ = 'ai_jobs'
+    
+    id = db.Column(db.String(32), primary_key=True)  # uuid4 hex
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=True)
+    kind = db.Column(db.String(30), nullable=False)  # voice_to_quote, photo_to_quote
+    status = db.Column(db.String(20), nullable=False, default='queued')  # queued, running, succeeded, failed
+    
+    # JSON payload returned by the equivalent synchronous endpoint
+    result = db.Column(db.Text, nullable=True)
+    error = db.Column(db.Text, nullable=True)
+    
+    # Timestamps
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
+    started_at = db.Column(db.DateTime, nullable=True)
+    finished_at = db.Column(db.DateTime, nullable=True)
+    
+    def __repr__(self):
+        return f'<AIJob {self.id} {self.kind} {self.status}>'
+    
+    def to_dict(self):
+        """Convert job to dictionary"""
+        return {
+            'id': self.id,
+            'kind': self.kind,
+            'status': self.status,
+            'result': json.loads(self.result) if self.result else None,
+            'error': self.error,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'started_at': self.started_at.isoformat() if self.started_at else None,
+            'finished_at': self.finished_at.isoformat() if self.finished_at else None
+        }
@@ -12,6 +12,13 @@ class Quote(db.Model):
     """Quote model for customer quotes"""
     
     __tablename__ = 'quotes'
+    __table_args__ = (
+        # Newest-first listing and keyset pagination per user
+        db.Index('ix_quotes_user_created', 'user_id', 'created_at'),
+        db.Index('ix_quotes_user_status', 'user_id', 'status'),
+        # Index-only max(updated_at)/count(*) validator for conditional GET
+        db.Index('ix_quotes_user_updated', 'user_id', 'updated_at'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
@@ -90,6 +97,12 @@ class Job(db.Model):
     """Job model for scheduled work"""
     
     __tablename__ = 'jobs'
+    __table_args__ = (
+        # Calendar listing per user
+        db.Index('ix_jobs_user_scheduled', 'user_id', 'scheduled_date'),
+        db.Index('ix_jobs_user_status', 'user_id', 'status'),
+        db.Index('ix_jobs_quote', 'quote_id'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
@@ -147,6 +160,14 @@ class Invoice(db.Model):
     """Invoice model for billing"""
     
     __tablename__ = 'invoices'
+    __table_args__ = (
+        db.Index('ix_invoices_user_created', 'user_id', 'created_at'),
+        db.Index('ix_invoices_user_due', 'user_id', 'due_date'),
+        db.Index('ix_invoices_user_status', 'user_id', 'status'),
+        # Overdue sweeps across all users
+        db.Index('ix_invoices_status_due', 'status', 'due_date'),
+        db.Index('ix_invoices_quote', 'quote_id'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
@@ -0,0 +1,19 @@
+"""
+Number sequence counters for TradesMate
+"""
+
+try:
+    from ..database import db
+except ImportError:
+    from database import db
+
+class NumberSequence(db.Model):
+    """Named counter that number allocators reserve blocks from"""
+    
+    __tablename__ = 'number_sequences'
+    
+    name = db.Column(db.String(50), primary_key=True)  # e.g. quote:20250127
+    next_value = db.Column(db.BigInteger, nullable=False, default=1)
+    
+    def __repr__(self):
+        return f'<NumberSequence {self.name}={self.next_value}>'
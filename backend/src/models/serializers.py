@@ -0,0 +1,133 @@
+"""
+Row serializers for TradesMate list endpoints
+Select only the needed columns as Core rows and turn them into JSON-ready
+dicts with a mapper compiled once per (model, fields), skipping ORM
+hydration entirely.
+"""
+
+from datetime import date, datetime
+from functools import lru_cache
+from sqlalchemy import select
+
+
+# Named projections; list endpoints accept ?fields=<name>. Summaries cover
+# what list views render and leave out the large TEXT columns.
+PROJECTIONS = {
+    'Quote': {
+        'summary': (
+            'id', 'quote_number', 'customer_name', 'customer_email', 'customer_phone',
+            'customer_address', 'job_description', 'job_type', 'urgency', 'labour_hours',
+            'labour_rate', 'materials_cost', 'total_amount', 'status', 'valid_until', 'created_at'
+        ),
+    },
+    'Job': {
+        'summary': (
+            'id', 'quote_id', 'customer_name', 'customer_phone', 'estimated_duration',
+            'scheduled_date', 'completed_date', 'status', 'created_at'
+        ),
+    },
+    'Invoice': {
+        'summary': (
+            'id', 'invoice_number', 'quote_id', 'job_id', 'customer_name', 'total_amount',
+            'status', 'due_date', 'paid_date', 'created_at'
+        ),
+    },
+}
+
+
+@lru_cache(maxsize=None)
+def default_fields(model):
+    """Field names and order produced by model.to_dict()"""
+    # A transient instance gives the to_dict() keys without touching the DB
+    return tuple(model().to_dict().keys())
+
+
+def resolve_fields(model, spec, required=('id',)):
+    """
+    Resolve a ?fields= value into an ordered field tuple
+
+    Args:
+        model: Model class
+        spec (str): Projection name or comma-separated field names; empty for all
+        required (tuple): Fields always included (e.g. pagination keys)
+
+    Returns:
+        tuple: Field names in to_dict() order, or None for the full field set
+
+    Raises:
+        ValueError: If spec names a field to_dict() does not expose
+    """
+    if not spec:
+        return None
+    allowed = default_fields(model)
+    projection = PROJECTIONS.get(model.__name__, {}).get(spec)
+    if projection is not None:
+        requested = set(projection)
+    else:
+        requested = {name.strip() for name in spec.split(',') if name.strip()}
+        unknown = requested.difference(allowed)
+        if unknown:
+            raise ValueError(f'Unknown fields: {", ".join(sorted(unknown))}')
+    requested.update(required)
+    return tuple(name for name in allowed if name in requested)
+
+
+def _isoformat(value):
+    return value.isoformat() if value is not None else None
+
+
+class RowMapper:
+    """Compiled column selection and row -> dict conversion for one model"""
+
+    def __init__(self, model, fields=None):
+        self.model = model
+        self.fields = tuple(fields) if fields is not None else default_fields(model)
+        table = model.__table__
+        self.columns = [table.c[name] for name in self.fields]
+        self._convert = self._compile()
+
+    def _compile(self):
+        """Generate a single dict-literal function for this field set"""
+        items = []
+        for index, column in enumerate(self.columns):
+            try:
+                python_type = column.type.python_type
+            except NotImplementedError:
+                python_type = None
+            if python_type in (datetime, date):
+                items.append(f'{column.name!r}: _iso(row[{index}])')
+            else:
+                items.append(f'{column.name!r}: row[{index}]')
+        source = 'def convert(row):\n    return {' + ', '.join(items) + '}\n'
+        namespace = {'_iso': _isoformat}
+        exec(compile(source, f'<RowMapper {self.model.__name__}>', 'exec'), namespace)
+        return namespace['convert']
+
+    def select(self):
+        """select() of exactly the mapped columns, in mapper order"""
+        return select(*self.columns)
+
+    def to_dict(self, row):
+        """Convert one Core row into a JSON-ready dict"""
+        return self._convert(row)
+
+    def to_dicts(self, rows):
+        """Convert an iterable of Core rows into a list of dicts"""
+        convert = self._convert
+        return [convert(row) for row in rows]
+
+
+# Field sets come from client ?fields= values, so bound the cache
+MAX_CACHED_MAPPERS = 128
+_mappers = {}
+
+
+def row_mapper(model, fields=None):
+    """Return the cached RowMapper for a model and field set"""
+    key = (model, tuple(fields) if fields is not None else None)
+    mapper = _mappers.get(key)
+    if mapper is None:
+        mapper = RowMapper(model, fields)
+        if len(_mappers) < MAX_CACHED_MAPPERS:
+            _mappers[key] = mapper
+    return mapper
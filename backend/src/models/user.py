@@ -7,9 +7,10 @@ import hashlib
 import os
 try:
     from ..database import db
+    from ..services.password_service import password_service
 except ImportError:
     from database import db
-from werkzeug.security import generate_password_hash, check_password_hash
+    from services.password_service import password_service
 
 class User(db.Model):
     """User model for tradespeople"""
@@ -32,12 +33,16 @@ class User(db.Model):
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
     def set_password(self, password):
-        """Set password hash using pbkdf2 for Python 3.9 compatibility"""
-        self.password_hash = generate_password_hash(password, method='pbkdf2:sha256')
+        """Set password hash using pbkdf2, computed in the hashing process pool"""
+        self.password_hash = password_service.hash(password)
     
     def check_password(self, password):
         """Check password against hash"""
-        return check_password_hash(self.password_hash, password)
+        return password_service.verify(self.password_hash, password)
+    
+    def password_needs_rehash(self):
+        """True when the stored hash predates the configured work factor"""
+        return password_service.needs_rehash(self.password_hash)
     
     def to_dict(self, include_sensitive=False):
         """Convert user to dictionary"""
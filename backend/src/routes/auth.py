@@ -7,13 +7,28 @@ from datetime import datetime
 try:
     from ..database import db
     from ..models.user import User
+    from .conditional import is_not_modified, make_etag, not_modified, with_validators
+    from ..services.identity import invalidate_identity, load_identity, remember_user
+    from ..services.password_service import PasswordHasherBusy, password_service
+    from .ratelimit import json_field_key, rate_limit
 except ImportError:
     from database import db
     from models.user import User
+    from routes.conditional import is_not_modified, make_etag, not_modified, with_validators
+    from services.identity import invalidate_identity, load_identity, remember_user
+    from services.password_service import PasswordHasherBusy, password_service
+    from routes.ratelimit import json_field_key, rate_limit
 
 auth_bp = Blueprint('auth', __name__, url_prefix='/api/auth')
 
+def _hashing_busy():
+    """503 response when the password hashing pool is saturated"""
+    response = jsonify({'error': 'Server busy, please try again shortly'})
+    response.headers['Retry-After'] = '1'
+    return response, 503
+
 @auth_bp.route('/register', methods=['POST'])
+@rate_limit('register', burst=5, per_minute=5, key='ip')
 def register():
     """Register a new user"""
     try:
@@ -59,11 +74,16 @@ def register():
             'user': user.to_dict()
         }), 201
         
+    except PasswordHasherBusy:
+        db.session.rollback()
+        return _hashing_busy()
     except Exception as e:
         db.session.rollback()
         return jsonify({'error': str(e)}), 500
 
 @auth_bp.route('/login', methods=['POST'])
+@rate_limit('login_ip', burst=20, per_minute=20, key='ip')
+@rate_limit('login_account', burst=5, per_minute=5, key=json_field_key('email'))
 def login():
     """Login user"""
     try:
@@ -81,6 +101,15 @@ def login():
         if not user.is_active:
             return jsonify({'error': 'Account is deactivated'}), 401
         
+        # Transparently upgrade hashes made with an older work factor
+        if user.password_needs_rehash():
+            try:
+                user.set_password(data['password'])
+                db.session.commit()
+                password_service.record_rehash()
+            except PasswordHasherBusy:
+                pass  # Try again on a later login
+        
         # Create session
         session['user_id'] = user.id
         session['user_email'] = user.email
@@ -88,9 +117,11 @@ def login():
         return jsonify({
             'success': True,
             'message': 'Login successful',
-            'user': user.to_dict()
+            'user': remember_user(user)
         })
         
+    except PasswordHasherBusy:
+        return _hashing_busy()
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -111,15 +142,20 @@ def get_current_user():
         if not user_id:
             return jsonify({'error': 'Not authenticated'}), 401
         
-        user = User.query.get(user_id)
-        if not user:
+        identity = load_identity(user_id)
+        if not identity:
             session.clear()
             return jsonify({'error': 'User not found'}), 404
         
-        return jsonify({
+        updated_at = identity['updated_at'] and datetime.fromisoformat(identity['updated_at'])
+        etag = make_etag(user_id, identity['updated_at'])
+        if is_not_modified(etag, updated_at):
+            return not_modified(etag, updated_at)
+        
+        return with_validators(jsonify({
             'success': True,
-            'user': user.to_dict()
-        })
+            'user': identity
+        }), etag, updated_at)
         
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -132,7 +168,7 @@ def update_profile():
         if not user_id:
             return jsonify({'error': 'Not authenticated'}), 401
         
-        user = User.query.get(user_id)
+        user = db.session.get(User, user_id)
         if not user:
             return jsonify({'error': 'User not found'}), 404
         
@@ -150,6 +186,7 @@ def update_profile():
         
         user.updated_at = datetime.utcnow()
         db.session.commit()
+        invalidate_identity(user.id)
         
         return jsonify({
             'success': True,
@@ -171,13 +208,13 @@ def require_auth(f):
         if not user_id:
             return jsonify({'error': 'Authentication required'}), 401
         
-        user = User.query.get(user_id)
-        if not user or not user.is_active:
+        identity = load_identity(user_id)
+        if not identity or not identity['is_active']:
             session.clear()
             return jsonify({'error': 'Invalid or inactive user'}), 401
         
-        # Add user to request context
-        request.current_user = user
+        # Add the cached profile dict (User.to_dict(), not a model) to request context
+        request.current_identity = dict(identity)
         return f(*args, **kwargs)
     
     return decorated_function
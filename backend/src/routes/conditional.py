@@ -0,0 +1,67 @@
+"""
+Conditional GET helpers for TradesMate
+Compute a cheap validator (ETag + Last-Modified) before any serialization
+work and answer 304 Not Modified when the client's copy is still current.
+"""
+
+import hashlib
+from datetime import timezone
+from flask import request, make_response
+from sqlalchemy import func, select
+try:
+    from ..database import db
+except ImportError:
+    from database import db
+
+
+def collection_validator(model, user_id):
+    """
+    Return (max updated_at, row count) for a user's rows
+
+    Served from the (user_id, updated_at) index without touching the table.
+    Use both parts in an ETag only: deleting a row leaves max(updated_at)
+    unchanged, so it is not a valid Last-Modified for the collection.
+    """
+    statement = select(func.max(model.updated_at), func.count()).where(model.user_id == user_id)
+    return tuple(db.session.execute(statement).one())
+
+
+def make_etag(*parts):
+    """Build a strong ETag from validator parts and the request's query string"""
+    digest = hashlib.sha1()
+    for part in parts + (request.query_string,):
+        digest.update(repr(part).encode('utf-8'))
+        digest.update(b'\0')
+    return digest.hexdigest()
+
+
+def _http_date(value):
+    """Naive UTC datetime -> aware, truncated to HTTP-date precision"""
+    if value is None:
+        return None
+    return value.replace(microsecond=0, tzinfo=timezone.utc)
+
+
+def is_not_modified(etag, last_modified=None):
+    """True when the request's If-None-Match / If-Modified-Since still match"""
+    if request.if_none_match:
+        # If-None-Match takes precedence over If-Modified-Since (RFC 9110)
+        return request.if_none_match.contains(etag)
+    since = request.if_modified_since
+    last_modified = _http_date(last_modified)
+    return bool(since and last_modified and last_modified <= since)
+
+
+def with_validators(response, etag, last_modified=None):
+    """Attach ETag, Last-Modified and revalidation headers to a response"""
+    response.set_etag(etag)
+    if last_modified is not None:
+        response.last_modified = _http_date(last_modified)
+    # Let the browser cache privately but revalidate on every use
+    response.headers['Cache-Control'] = 'private, no-cache'
+    return response
+
+
+def not_modified(etag, last_modified=None):
+    """Empty 304 response carrying the current validators"""
+    return with_validators(make_response('', 304), etag, last_modified)
@@ -0,0 +1,75 @@
+"""
+Streaming export helpers for TradesMate
+Rows are pulled through a server-side cursor and written out one at a time,
+so memory use does not grow with the size of the export.
+"""
+
+import csv
+import json
+from flask import Response, stream_with_context
+try:
+    from ..database import db
+except ImportError:
+    from database import db
+
+EXPORT_FORMATS = {
+    'ndjson': 'application/x-ndjson',
+    'csv': 'text/csv',
+}
+
+# Rows fetched from the DB cursor per round trip
+EXPORT_BATCH_SIZE = 500
+
+
+class _LineBuffer:
+    """Minimal file-like object so csv.writer hands back each line"""
+
+    def write(self, value):
+        return value
+
+
+def iter_rows(statement, batch_size=EXPORT_BATCH_SIZE):
+    """Yield Core rows for a select() using a streaming server-side cursor"""
+    result = db.session.execute(
+        statement.execution_options(stream_results=True, yield_per=batch_size)
+    )
+    for row in result:
+        yield row
+
+
+def _ndjson_lines(rows, mapper):
+    for row in rows:
+        yield json.dumps(mapper.to_dict(row), separators=(',', ':')) + '\n'
+
+
+def _csv_lines(rows, mapper):
+    writer = csv.writer(_LineBuffer())
+    yield writer.writerow(mapper.fields)
+    for row in rows:
+        yield writer.writerow(mapper.to_dict(row).values())
+
+
+def export_response(mapper, statement, export_format, filename):
+    """
+    Build a streaming export response
+
+    Args:
+        mapper: RowMapper defining the exported fields
+        statement: select() built from mapper.select() for the rows to export
+        export_format (str): 'ndjson' or 'csv'
+        filename (str): Download filename without extension
+
+    Returns:
+        Response: Chunked response that streams rows as they are fetched
+    """
+    rows = iter_rows(statement)
+    if export_format == 'csv':
+        body = _csv_lines(rows, mapper)
+    else:
+        body = _ndjson_lines(rows, mapper)
+
+    return Response(
+        stream_with_context(body),
+        mimetype=EXPORT_FORMATS[export_format],
+        headers={'Content-Disposition': f'attachment; filename={filename}.{export_format}'}
+    )
@@ -0,0 +1,32 @@
+"""
+Internal operational routes for TradesMate
+"""
+
+import hmac
+import os
+from flask import Blueprint, request, jsonify, abort
+try:
+    from .. import metrics
+except ImportError:
+    import metrics
+
+internal_bp = Blueprint('internal', __name__, url_prefix='/internal')
+
+@internal_bp.before_request
+def restrict_access():
+    """Require INTERNAL_STATS_TOKEN when set, otherwise only allow loopback callers"""
+    token = os.getenv('INTERNAL_STATS_TOKEN')
+    if token:
+        supplied = request.headers.get('X-Internal-Token', '')
+        if not hmac.compare_digest(supplied, token):
+            abort(404)
+    elif request.remote_addr not in ('127.0.0.1', '::1'):
+        abort(404)
+
+@internal_bp.route('/stats', methods=['GET'])
+def stats():
+    """Snapshot of this worker's runtime metrics"""
+    return jsonify({
+        'pid': os.getpid(),
+        **metrics.snapshot()
+    })
@@ -0,0 +1,92 @@
+"""
+Invoice routes for TradesMate
+"""
+from flask import Blueprint, request, jsonify, session
+try:
+    from ..models.quote import Invoice
+    from ..models.serializers import row_mapper
+    from .pagination import PaginationError, keyset_paginate, parse_date, parse_fields, parse_limit
+    from .export import EXPORT_FORMATS, export_response
+except ImportError:
+    from models.quote import Invoice
+    from models.serializers import row_mapper
+    from routes.pagination import PaginationError, keyset_paginate, parse_date, parse_fields, parse_limit
+    from routes.export import EXPORT_FORMATS, export_response
+
+invoices_bp = Blueprint('invoices', __name__, url_prefix='/api/invoices')
+
+def _filtered(statement, args):
+    """Apply the shared status and created_at filters"""
+    created_after = parse_date(args.get('created_after'), 'created_after')
+    created_before = parse_date(args.get('created_before'), 'created_before')
+
+    status = args.get('status')
+    if status:
+        statement = statement.where(Invoice.status.in_([s.strip() for s in status.split(',') if s.strip()]))
+    if created_after:
+        statement = statement.where(Invoice.created_at >= created_after)
+    if created_before:
+        statement = statement.where(Invoice.created_at < created_before)
+    return statement
+
+@invoices_bp.route('/', methods=['GET'])
+def get_invoices():
+    """
+    Get a page of invoices for authenticated user, newest first
+
+    Query params:
+        limit: page size (default 50, max 200)
+        cursor: opaque cursor from a previous page's next_cursor
+        fields: 'summary' or comma-separated field names (id and created_at always included)
+        status: exact-match filter (comma-separated for several)
+        created_after, created_before: ISO 8601 date range on created_at
+    """
+    user_id = session.get('user_id')
+    if not user_id:
+        return jsonify({'error': 'Authentication required'}), 401
+
+    try:
+        limit = parse_limit(request.args.get('limit'))
+        mapper = row_mapper(Invoice, parse_fields(Invoice, request.args.get('fields')))
+        statement = _filtered(mapper.select().where(Invoice.user_id == user_id), request.args)
+
+        rows, next_cursor = keyset_paginate(
+            statement, Invoice.created_at, Invoice.id,
+            cursor=request.args.get('cursor'), limit=limit
+        )
+    except PaginationError as e:
+        return jsonify({'error': str(e)}), 400
+
+    return jsonify({
+        'invoices': mapper.to_dicts(rows),
+        'next_cursor': next_cursor,
+        'has_more': next_cursor is not None
+    })
+
+@invoices_bp.route('/export', methods=['GET'])
+def export_invoices():
+    """
+    Stream all invoices for authenticated user as NDJSON or CSV, oldest first
+
+    Query params:
+        format: ndjson (default) or csv
+        fields: 'summary' or comma-separated field names
+        status: exact-match filter (comma-separated for several)
+        created_after, created_before: ISO 8601 date range on created_at
+    """
+    user_id = session.get('user_id')
+    if not user_id:
+        return jsonify({'error': 'Authentication required'}), 401
+
+    export_format = request.args.get('format', 'ndjson').lower()
+    if export_format not in EXPORT_FORMATS:
+        return jsonify({'error': f'format must be one of: {", ".join(EXPORT_FORMATS)}'}), 400
+
+    try:
+        mapper = row_mapper(Invoice, parse_fields(Invoice, request.args.get('fields'), required=('id',)))
+        statement = _filtered(mapper.select().where(Invoice.user_id == user_id), request.args)
+    except PaginationError as e:
+        return jsonify({'error': str(e)}), 400
+
+    statement = statement.order_by(Invoice.created_at, Invoice.id)
+    return export_response(mapper, statement, export_format, 'invoices')
@@ -0,0 +1,45 @@
+"""
+Background AI job routes for TradesMate
+"""
+from flask import Blueprint, jsonify, session
+try:
+    from ..database import db
+    from ..models.ai_job import AIJob
+    from ..services.ai_jobs import ai_jobs
+    from .auth import require_auth
+except ImportError:
+    from database import db
+    from models.ai_job import AIJob
+    from services.ai_jobs import ai_jobs
+    from routes.auth import require_auth
+
+jobs_bp = Blueprint('jobs', __name__, url_prefix='/api/jobs')
+
+# Suggested polling interval while a job is queued or running
+POLL_AFTER_SECONDS = 2
+
+@jobs_bp.route('/<job_id>', methods=['GET'])
+@require_auth
+def get_job(job_id):
+    """
+    Get the status of a voice-to-quote or photo-to-quote job
+
+    Returns the job's status (queued, running, succeeded, failed) and, once
+    it has finished, the same payload the synchronous endpoint returns
+    under 'result' or its message under 'error'. A job still queued or
+    running AI_JOB_DEADLINE_SECONDS after submission is reported as failed.
+    """
+    try:
+        job = db.session.get(AIJob, job_id)
+        # Jobs are only visible to the user who submitted them
+        if job is None or job.user_id != session['user_id']:
+            return jsonify({'error': 'Job not found'}), 404
+        ai_jobs.expire_if_stale(job)
+
+        response = jsonify({'job': job.to_dict()})
+        if job.status in ('queued', 'running'):
+            response.headers['Retry-After'] = str(POLL_AFTER_SECONDS)
+        return response
+
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
@@ -0,0 +1,104 @@
+"""
+Keyset pagination helpers for TradesMate list endpoints
+"""
+
+import base64
+import json
+from datetime import datetime
+from sqlalchemy import and_, or_
+try:
+    from ..database import db
+    from ..models.serializers import resolve_fields
+except ImportError:
+    from database import db
+    from models.serializers import resolve_fields
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+
+class PaginationError(ValueError):
+    """Raised when pagination or filter parameters are malformed"""
+
+
+def encode_cursor(sort_value, row_id):
+    """Encode the (sort_value, id) of the last row into an opaque cursor"""
+    if isinstance(sort_value, datetime):
+        sort_value = sort_value.isoformat()
+    payload = json.dumps([sort_value, row_id], separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor):
+    """Decode an opaque cursor back into (datetime, id)"""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        sort_value, row_id = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+        return datetime.fromisoformat(sort_value), int(row_id)
+    except (ValueError, TypeError, UnicodeError):
+        raise PaginationError('Invalid cursor')
+
+
+def parse_limit(value):
+    """Parse the page size, clamped to MAX_PAGE_SIZE"""
+    if value is None or value == '':
+        return DEFAULT_PAGE_SIZE
+    try:
+        limit = int(value)
+    except ValueError:
+        raise PaginationError('limit must be an integer')
+    if limit < 1:
+        raise PaginationError('limit must be positive')
+    return min(limit, MAX_PAGE_SIZE)
+
+
+def parse_date(value, name):
+    """Parse an ISO date or datetime query parameter"""
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(value)
+    except ValueError:
+        raise PaginationError(f'{name} must be an ISO 8601 date')
+
+
+def parse_fields(model, value, required=('id', 'created_at')):
+    """Parse ?fields= into a field tuple (None for all fields)"""
+    try:
+        return resolve_fields(model, value, required)
+    except ValueError as e:
+        raise PaginationError(str(e))
+
+
+def keyset_paginate(statement, sort_column, id_column, cursor=None, limit=DEFAULT_PAGE_SIZE):
+    """
+    Apply newest-first keyset pagination on (sort_column, id_column)
+
+    Args:
+        statement: select() already filtered to the caller's rows; must
+            include sort_column and id_column in its columns
+        sort_column: Column to order by (descending)
+        id_column: Primary key column used as a tie-breaker
+        cursor (str): Opaque cursor returned by a previous page
+        limit (int): Page size
+
+    Returns:
+        tuple: (Core rows, next_cursor) where next_cursor is None on the last page
+    """
+    if cursor:
+        sort_value, row_id = decode_cursor(cursor)
+        statement = statement.where(or_(
+            sort_column < sort_value,
+            and_(sort_column == sort_value, id_column < row_id)
+        ))
+
+    statement = statement.order_by(sort_column.desc(), id_column.desc()).limit(limit + 1)
+    rows = db.session.execute(statement).all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = encode_cursor(getattr(last, sort_column.key), getattr(last, id_column.key))
+
+    return rows, next_cursor
@@ -3,66 +3,148 @@ Photo AI routes for TradesMate
 """
 
 from flask import Blueprint, request, jsonify
-from services.photo_intelligence_service import PhotoIntelligenceService
-from services.ai_service import AIService
-from models.user import User
+try:
+    from ..services.photo_intelligence_service import PhotoIntelligenceService
+    from ..services.ai_service import AIService
+    from ..services.ai_jobs import AIJobFailed, AIJobQueueFull, ai_jobs, detach_upload
+    from .auth import require_auth
+    from .ratelimit import rate_limit
+except ImportError:
+    from services.photo_intelligence_service import PhotoIntelligenceService
+    from services.ai_service import AIService
+    from services.ai_jobs import AIJobFailed, AIJobQueueFull, ai_jobs, detach_upload
+    from routes.auth import require_auth
+    from routes.ratelimit import rate_limit
 
-photo_bp = Blueprint('photo', __name__)
+photo_bp = Blueprint('photo', __name__, url_prefix='/api/photo')
 photo_service = PhotoIntelligenceService()
 ai_service = AIService()
 
+def run_photo_to_quote(photo_file, trade_type, hourly_rate):
+    """
+    Read a handwritten note from a photo and generate a quote from it
+
+    Args:
+        photo_file: Uploaded image file object
+        trade_type (str): User's trade
+        hourly_rate (float): User's hourly rate
+
+    Returns:
+        dict: analyze-note response payload
+
+    Raises:
+        AIJobFailed: With the message and status code to report
+    """
+    try:
+        extraction_result = photo_service.extract_text_from_image(photo_file)
+    finally:
+        photo_file.close()
+    
+    if not extraction_result['success']:
+        if extraction_result.get('invalid_image'):
+            status = 400
+        elif extraction_result.get('busy') or extraction_result.get('unavailable'):
+            status = 503
+        else:
+            status = 500
+        raise AIJobFailed(f'Text extraction failed: {extraction_result["error"]}', status)
+    
+    extracted_text = extraction_result['text']
+    
+    if not extracted_text or len(extracted_text.strip()) < 5:
+        raise AIJobFailed(
+            'No readable text found in image. Please ensure the photo is clear and contains handwritten text.', 400
+        )
+    
+    # Generate quote using AI
+    ai_result = ai_service.analyze_photo_text(
+        extracted_text,
+        trade_type,
+        hourly_rate
+    )
+    
+    if not ai_result['success']:
+        raise AIJobFailed(f'Quote generation failed: {ai_result["error"]}')
+    
+    return {
+        'success': True,
+        'extracted_text': extracted_text,
+        'extraction_confidence': extraction_result.get('confidence', 0.8),
+        'extraction': {
+            'method': extraction_result.get('method'),
+            'skew_angle': extraction_result.get('skew_angle'),
+            'timings_ms': extraction_result.get('timings_ms', {})
+        },
+        'quote_data': ai_result['quote_data'],
+        'ai_confidence': ai_result['quote_data'].get('confidence', 0.8)
+    }
+
+def _validated_photo():
+    """Return (photo_file, None) or (None, error response)"""
+    if 'photo' not in request.files:
+        return None, (jsonify({'error': 'No photo file provided'}), 400)
+    
+    photo_file = request.files['photo']
+    
+    if photo_file.filename == '':
+        return None, (jsonify({'error': 'No file selected'}), 400)
+    
+    if not photo_service.is_allowed_image_file(photo_file.filename):
+        return None, (jsonify({'error': 'File type not supported. Please upload a photo (JPEG, PNG, BMP, ...)'}), 400)
+    
+    return photo_file, None
+
 @photo_bp.route('/analyze-note', methods=['POST'])
+@require_auth
+@rate_limit('ai', burst=5, per_minute=10, key='user')
 def analyze_handwritten_note():
     """Analyze handwritten note from photo"""
     try:
-        if 'photo' not in request.files:
-            return jsonify({'error': 'No photo file provided'}), 400
-        
-        photo_file = request.files['photo']
+        photo_file, error = _validated_photo()
+        if error:
+            return error
         
-        if photo_file.filename == '':
-            return jsonify({'error': 'No file selected'}), 400
+        user = request.current_identity
+        return jsonify(run_photo_to_quote(photo_file, user['trade_type'], user['hourly_rate']))
         
-        # Extract text from photo
-        extraction_result = photo_service.extract_text_from_image(photo_file)
-        
-        if not extraction_result['success']:
-            return jsonify({
-                'error': f'Text extraction failed: {extraction_result["error"]}'
-            }), 500
-        
-        extracted_text = extraction_result['text']
-        
-        if not extracted_text or len(extracted_text.strip()) < 5:
-            return jsonify({
-                'error': 'No readable text found in image. Please ensure the photo is clear and contains handwritten text.'
-            }), 400
-        
-        # Get user info
-        user = User.query.first()  # Demo: get first user
-        if not user:
-            return jsonify({'error': 'User not found'}), 404
-        
-        # Generate quote using AI
-        ai_result = ai_service.analyze_photo_text(
-            extracted_text,
-            user.trade_type,
-            user.hourly_rate
+    except AIJobFailed as e:
+        return jsonify({'error': str(e)}), e.status_code
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@photo_bp.route('/analyze-note/async', methods=['POST'])
+@require_auth
+@rate_limit('ai', burst=5, per_minute=10, key='user')
+def submit_analyze_handwritten_note():
+    """Queue photo-to-quote processing; poll GET /api/jobs/<id> for the result"""
+    try:
+        photo_file, error = _validated_photo()
+        if error:
+            return error
+        
+        user = request.current_identity
+        job = ai_jobs.submit(
+            'photo_to_quote',
+            user['id'],
+            run_photo_to_quote,
+            detach_upload(photo_file),
+            user['trade_type'],
+            user['hourly_rate']
         )
         
-        if not ai_result['success']:
-            return jsonify({
-                'error': f'Quote generation failed: {ai_result["error"]}'
-            }), 500
-        
-        return jsonify({
+        response = jsonify({
             'success': True,
-            'extracted_text': extracted_text,
-            'extraction_confidence': extraction_result.get('confidence', 0.8),
-            'quote_data': ai_result['quote_data'],
-            'ai_confidence': ai_result['quote_data'].get('confidence', 0.8)
+            'job_id': job.id,
+            'status': job.status,
+            'status_url': f'/api/jobs/{job.id}'
         })
+        response.headers['Location'] = f'/api/jobs/{job.id}'
+        return response, 202
         
+    except AIJobQueueFull as e:
+        response = jsonify({'error': f'{e}, please try again shortly'})
+        response.headers['Retry-After'] = '5'
+        return response, 503
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -1,28 +1,209 @@
 """
 Quote management routes for TradesMate
 """
+import os
 from flask import Blueprint, request, jsonify, session
 from datetime import datetime, timedelta
+from sqlalchemy import delete, func, insert, or_, select, update
 try:
     from ..database import db
-    from ..models.quote import Quote
-    from ..services.ai_service import AIService
+    from ..models.quote import Quote, Job, Invoice
+    from ..models.serializers import row_mapper
+    from ..services.numbering import quote_numbers
+    from .pagination import PaginationError, keyset_paginate, parse_date, parse_fields, parse_limit
+    from .export import EXPORT_FORMATS, export_response
+    from .conditional import collection_validator, is_not_modified, make_etag, not_modified, with_validators
 except ImportError:
     from database import db
-    from models.quote import Quote
-    from services.ai_service import AIService
+    from models.quote import Quote, Job, Invoice
+    from models.serializers import row_mapper
+    from services.numbering import quote_numbers
+    from routes.pagination import PaginationError, keyset_paginate, parse_date, parse_fields, parse_limit
+    from routes.export import EXPORT_FORMATS, export_response
+    from routes.conditional import collection_validator, is_not_modified, make_etag, not_modified, with_validators
 
 quotes_bp = Blueprint('quotes', __name__, url_prefix='/api/quotes')
 
 @quotes_bp.route('/', methods=['GET'])
 def get_quotes():
-    """Get all quotes for authenticated user"""
+    """
+    Get a page of quotes for authenticated user, newest first
+
+    Query params:
+        limit: page size (default 50, max 200)
+        cursor: opaque cursor from a previous page's next_cursor
+        fields: 'summary' or comma-separated field names (id and created_at always included)
+        status, job_type, urgency: exact-match filters (comma-separated for several)
+        q: case-insensitive search over customer name, email and job description
+        created_after, created_before: ISO 8601 date range on created_at
+    """
+    user_id = session.get('user_id')
+    if not user_id:
+        return jsonify({'error': 'Authentication required'}), 401
+
+    try:
+        limit = parse_limit(request.args.get('limit'))
+        fields = parse_fields(Quote, request.args.get('fields'))
+        created_after = parse_date(request.args.get('created_after'), 'created_after')
+        created_before = parse_date(request.args.get('created_before'), 'created_before')
+
+        mapper = row_mapper(Quote, fields)
+        statement = mapper.select().where(Quote.user_id == user_id)
+        for field in ('status', 'job_type', 'urgency'):
+            value = request.args.get(field)
+            if value:
+                values = [v.strip() for v in value.split(',') if v.strip()]
+                statement = statement.where(getattr(Quote, field).in_(values))
+        search = request.args.get('q', '').strip()
+        if search:
+            statement = statement.where(or_(*(
+                column.icontains(search, autoescape=True)
+                for column in (Quote.customer_name, Quote.customer_email, Quote.job_description)
+            )))
+        if created_after:
+            statement = statement.where(Quote.created_at >= created_after)
+        if created_before:
+            statement = statement.where(Quote.created_at < created_before)
+
+        # Answer revalidations from the index before loading or serializing rows
+        etag = make_etag(user_id, *collection_validator(Quote, user_id))
+        if is_not_modified(etag):
+            return not_modified(etag)
+
+        rows, next_cursor = keyset_paginate(
+            statement, Quote.created_at, Quote.id,
+            cursor=request.args.get('cursor'), limit=limit
+        )
+    except PaginationError as e:
+        return jsonify({'error': str(e)}), 400
+
+    return with_validators(jsonify({
+        'quotes': mapper.to_dicts(rows),
+        'next_cursor': next_cursor,
+        'has_more': next_cursor is not None
+    }), etag)
+
+@quotes_bp.route('/stats', methods=['GET'])
+def get_quote_stats():
+    """
+    Totals over all of the authenticated user's quotes, computed in the database
+
+    The quote list is paginated, so clients read counts and value from
+    here rather than summing the pages they have loaded.
+
+    Returns:
+        {"total": int, "total_value": float, "by_status": {status: count}}
+    """
+    user_id = session.get('user_id')
+    if not user_id:
+        return jsonify({'error': 'Authentication required'}), 401
+
+    etag = make_etag('stats', user_id, *collection_validator(Quote, user_id))
+    if is_not_modified(etag):
+        return not_modified(etag)
+
+    rows = db.session.execute(
+        select(Quote.status, func.count(), func.coalesce(func.sum(Quote.total_amount), 0.0))
+        .where(Quote.user_id == user_id)
+        .group_by(Quote.status)
+    ).all()
+    by_status = dict.fromkeys(QUOTE_STATUSES, 0)
+    for status, status_count, _ in rows:
+        by_status[status or 'draft'] = by_status.get(status or 'draft', 0) + status_count
+
+    return with_validators(jsonify({
+        'total': sum(status_count for _, status_count, _ in rows),
+        'total_value': round(sum(value for _, _, value in rows), 2),
+        'by_status': by_status
+    }), etag)
+
+@quotes_bp.route('/export', methods=['GET'])
+def export_quotes():
+    """
+    Stream all quotes for authenticated user as NDJSON or CSV, oldest first
+
+    Query params:
+        format: ndjson (default) or csv
+        fields: 'summary' or comma-separated field names
+        created_after, created_before: ISO 8601 date range on created_at
+    """
     user_id = session.get('user_id')
     if not user_id:
         return jsonify({'error': 'Authentication required'}), 401
+
+    export_format = request.args.get('format', 'ndjson').lower()
+    if export_format not in EXPORT_FORMATS:
+        return jsonify({'error': f'format must be one of: {", ".join(EXPORT_FORMATS)}'}), 400
+
+    try:
+        fields = parse_fields(Quote, request.args.get('fields'), required=('id',))
+        created_after = parse_date(request.args.get('created_after'), 'created_after')
+        created_before = parse_date(request.args.get('created_before'), 'created_before')
+    except PaginationError as e:
+        return jsonify({'error': str(e)}), 400
+
+    mapper = row_mapper(Quote, fields)
+    statement = mapper.select().where(Quote.user_id == user_id)
+    if created_after:
+        statement = statement.where(Quote.created_at >= created_after)
+    if created_before:
+        statement = statement.where(Quote.created_at < created_before)
+    statement = statement.order_by(Quote.created_at, Quote.id)
+
+    return export_response(mapper, statement, export_format, 'quotes')
+
+QUOTE_STATUSES = ('draft', 'sent', 'accepted', 'rejected')
+
+# Upper bound on operations per /batch request
+BATCH_MAX_OPERATIONS = int(os.getenv('QUOTE_BATCH_MAX_OPERATIONS', 500))
+
+def _quote_values(data, user_id):
+    """
+    Validate quote input and compute totals
+
+    Returns:
+        dict: Column values for a new quote
+
+    Raises:
+        ValueError: If required fields are missing or numbers are malformed
+    """
+    # Simple validation
+    if not data.get('customer_name') or not data.get('job_description'):
+        raise ValueError('Customer name and job description are required')
+    
+    # Calculate totals
+    labour_hours = float(data.get('labour_hours', 0))
+    labour_rate = float(data.get('labour_rate', 35))
+    materials_cost = float(data.get('materials_cost', 0))
+    
+    labour_cost = labour_hours * labour_rate
+    subtotal = labour_cost + materials_cost
+    vat_amount = subtotal * 0.20  # 20% VAT
+    total_amount = subtotal + vat_amount
     
-    quotes = Quote.query.filter_by(user_id=user_id).order_by(Quote.created_at.desc()).all()
-    return jsonify([quote.to_dict() for quote in quotes])
+    return dict(
+        user_id=user_id,
+        customer_name=data.get('customer_name'),
+        customer_email=data.get('customer_email'),
+        customer_phone=data.get('customer_phone'),
+        customer_address=data.get('customer_address'),
+        job_description=data.get('job_description'),
+        job_type=data.get('job_type', 'General'),
+        urgency=data.get('urgency', 'normal'),
+        labour_hours=labour_hours,
+        labour_rate=labour_rate,
+        materials_cost=materials_cost,
+        subtotal=round(subtotal, 2),
+        vat_rate=0.20,
+        vat_amount=round(vat_amount, 2),
+        total_amount=round(total_amount, 2),
+        materials=data.get('materials'),  # JSON string of materials list
+        quote_number=quote_numbers.allocate(),
+        valid_until=datetime.utcnow() + timedelta(days=30),
+        voice_transcript=data.get('voice_transcript'),
+        ai_confidence=data.get('ai_confidence'),
+        processing_notes=data.get('processing_notes')
+    )
 
 @quotes_bp.route('/create', methods=['POST'])
 def create_quote():
@@ -32,46 +213,14 @@ def create_quote():
         return jsonify({'error': 'Authentication required'}), 401
 
     try:
-        data = request.get_json()
-        ai_service = AIService()
+        data = request.get_json(silent=True)
+        if not isinstance(data, dict):
+            return jsonify({'error': 'Body must be a JSON object'}), 400
         
-        # Simple validation
-        if not data.get('customer_name') or not data.get('job_description'):
-            return jsonify({'error': 'Customer name and job description are required'}), 400
-        
-        # Calculate totals
-        labour_hours = float(data.get('labour_hours', 0))
-        labour_rate = float(data.get('labour_rate', 35))
-        materials_cost = float(data.get('materials_cost', 0))
-        
-        labour_cost = labour_hours * labour_rate
-        subtotal = labour_cost + materials_cost
-        vat_amount = subtotal * 0.20  # 20% VAT
-        total_amount = subtotal + vat_amount
-        
-        quote = Quote(
-            user_id=user_id,
-            customer_name=data.get('customer_name'),
-            customer_email=data.get('customer_email'),
-            customer_phone=data.get('customer_phone'),
-            customer_address=data.get('customer_address'),
-            job_description=data.get('job_description'),
-            job_type=data.get('job_type', 'General'),
-            urgency=data.get('urgency', 'normal'),
-            labour_hours=labour_hours,
-            labour_rate=labour_rate,
-            materials_cost=materials_cost,
-            subtotal=round(subtotal, 2),
-            vat_rate=0.20,
-            vat_amount=round(vat_amount, 2),
-            total_amount=round(total_amount, 2),
-            materials=data.get('materials'),  # JSON string of materials list
-            quote_number=ai_service.generate_quote_number(),
-            valid_until=datetime.utcnow() + timedelta(days=30),
-            voice_transcript=data.get('voice_transcript'),
-            ai_confidence=data.get('ai_confidence'),
-            processing_notes=data.get('processing_notes')
-        )
+        try:
+            quote = Quote(**_quote_values(data, user_id))
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
         
         db.session.add(quote)
         db.session.commit()
@@ -86,3 +235,148 @@ def create_quote():
         db.session.rollback()
         return jsonify({'error': str(e)}), 500
 
+@quotes_bp.route('/batch', methods=['POST'])
+def batch_quotes():
+    """
+    Apply many quote mutations in one transaction
+
+    Body:
+        {"operations": [
+            {"op": "create", "quote": {...same fields as /create...}},
+            {"op": "update_status", "id": 12, "status": "sent"},
+            {"op": "delete", "id": 13}
+        ]}
+
+    Creates run as one multi-row INSERT, status changes as one
+    UPDATE ... WHERE id IN per target status, and deletes as one
+    DELETE ... WHERE id IN. Invalid operations are reported per item and
+    skipped; the valid ones commit together or not at all.
+    """
+    user_id = session.get('user_id')
+    if not user_id:
+        return jsonify({'error': 'Authentication required'}), 401
+
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict):
+        return jsonify({'error': 'Body must be a JSON object'}), 400
+    operations = data.get('operations')
+    if not isinstance(operations, list) or not operations:
+        return jsonify({'error': 'operations must be a non-empty list'}), 400
+    if len(operations) > BATCH_MAX_OPERATIONS:
+        return jsonify({'error': f'At most {BATCH_MAX_OPERATIONS} operations per batch'}), 400
+
+    results = [None] * len(operations)
+    creates = []            # (index, values)
+    status_updates = {}     # status -> [(index, id)]
+    deletes = []            # (index, id)
+    targeted = {}           # quote id -> index of the operation using it
+
+    def fail(index, op, error):
+        results[index] = {'index': index, 'op': op, 'success': False, 'error': error}
+
+    # Validate and group
+    for index, operation in enumerate(operations):
+        op = operation.get('op') if isinstance(operation, dict) else None
+        if op == 'create':
+            quote = operation.get('quote')
+            if not isinstance(quote, dict):
+                fail(index, op, 'quote must be an object')
+                continue
+            try:
+                creates.append((index, _quote_values(quote, user_id)))
+            except (ValueError, TypeError) as e:
+                fail(index, op, str(e))
+            continue
+        if op not in ('update_status', 'delete'):
+            fail(index, op, 'op must be one of: create, update_status, delete')
+            continue
+
+        quote_id = operation.get('id')
+        if not isinstance(quote_id, int) or isinstance(quote_id, bool):  # bool is an int subclass
+            fail(index, op, 'id must be an integer')
+        elif quote_id in targeted:
+            fail(index, op, f'Quote {quote_id} is already targeted by operation {targeted[quote_id]}')
+        elif op == 'update_status' and operation.get('status') not in QUOTE_STATUSES:
+            fail(index, op, f'status must be one of: {", ".join(QUOTE_STATUSES)}')
+        else:
+            targeted[quote_id] = index
+            if op == 'delete':
+                deletes.append((index, quote_id))
+            else:
+                status_updates.setdefault(operation['status'], []).append((index, quote_id))
+
+    try:
+        # One lookup for ownership of every targeted id
+        owned = set()
+        referenced = set()
+        if targeted:
+            owned = set(db.session.execute(
+                select(Quote.id).where(Quote.user_id == user_id, Quote.id.in_(list(targeted)))
+            ).scalars())
+        delete_ids = [quote_id for _, quote_id in deletes if quote_id in owned]
+        if delete_ids:
+            for model in (Job, Invoice):
+                referenced.update(db.session.execute(
+                    select(model.quote_id).where(model.quote_id.in_(delete_ids))
+                ).scalars())
+
+        # Creates: single executemany INSERT, ids returned in parameter order
+        if creates:
+            created = db.session.execute(
+                insert(Quote).returning(Quote.id, Quote.quote_number, sort_by_parameter_order=True),
+                [values for _, values in creates]
+            ).all()
+            for (index, _), row in zip(creates, created):
+                results[index] = {'index': index, 'op': 'create', 'success': True,
+                                  'id': row.id, 'quote_number': row.quote_number}
+
+        # Status changes: one UPDATE ... WHERE id IN per target status
+        now = datetime.utcnow()
+        for status, items in status_updates.items():
+            ids = []
+            for index, quote_id in items:
+                if quote_id in owned:
+                    ids.append(quote_id)
+                    results[index] = {'index': index, 'op': 'update_status', 'success': True, 'id': quote_id}
+                else:
+                    fail(index, 'update_status', f'Quote {quote_id} not found')
+            if ids:
+                values = {'status': status, 'updated_at': now}
+                if status == 'sent':
+                    values['sent_at'] = now
+                elif status == 'accepted':
+                    values['accepted_at'] = now
+                db.session.execute(
+                    update(Quote).where(Quote.user_id == user_id, Quote.id.in_(ids)).values(**values),
+                    execution_options={'synchronize_session': False}
+                )
+
+        # Deletes: one DELETE ... WHERE id IN
+        ids = []
+        for index, quote_id in deletes:
+            if quote_id not in owned:
+                fail(index, 'delete', f'Quote {quote_id} not found')
+            elif quote_id in referenced:
+                fail(index, 'delete', f'Quote {quote_id} is referenced by a job or invoice')
+            else:
+                ids.append(quote_id)
+                results[index] = {'index': index, 'op': 'delete', 'success': True, 'id': quote_id}
+        if ids:
+            db.session.execute(
+                delete(Quote).where(Quote.user_id == user_id, Quote.id.in_(ids)),
+                execution_options={'synchronize_session': False}
+            )
+
+        db.session.commit()
+
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
+
+    succeeded = sum(1 for result in results if result['success'])
+    return jsonify({
+        'success': succeeded == len(results),
+        'succeeded': succeeded,
+        'failed': len(results) - succeeded,
+        'results': results
+    })
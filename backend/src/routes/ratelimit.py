@@ -0,0 +1,78 @@
+"""
+Rate limiting decorator for TradesMate routes
+"""
+
+import logging
+import math
+import os
+import sqlite3
+from functools import wraps
+from flask import request, jsonify, session
+try:
+    from ..services.rate_limiter import bucket_store
+except ImportError:
+    from services.rate_limiter import bucket_store
+
+log = logging.getLogger(__name__)
+
+TRUST_FORWARDED_FOR = os.getenv('RATE_LIMIT_TRUST_X_FORWARDED_FOR', 'false').lower() in ('1', 'true', 'yes')
+
+def client_ip():
+    """Caller IP; honours X-Forwarded-For only when the proxy is trusted"""
+    if TRUST_FORWARDED_FOR and request.access_route:
+        return request.access_route[0]
+    return request.remote_addr or 'unknown'
+
+def _resolve_key(key):
+    if callable(key):
+        return key()
+    if key == 'ip':
+        return f'ip:{client_ip()}'
+    if key == 'user':
+        user_id = session.get('user_id')
+        return f'user:{user_id}' if user_id else f'ip:{client_ip()}'
+    raise ValueError(f'Unknown rate limit key: {key}')
+
+def rate_limit(name, burst, per_minute, key='ip'):
+    """
+    Token-bucket limit shared by all workers on the node
+
+    Args:
+        name (str): Limit name; RATE_LIMIT_<NAME>_BURST and
+            RATE_LIMIT_<NAME>_PER_MINUTE override the defaults
+        burst (float): Requests allowed back to back
+        per_minute (float): Sustained refill rate
+        key: 'ip', 'user' (session user, else IP) or a callable returning a
+            key string (None skips the limit for that request)
+    """
+    burst = float(os.getenv(f'RATE_LIMIT_{name.upper()}_BURST', burst))
+    refill_per_second = float(os.getenv(f'RATE_LIMIT_{name.upper()}_PER_MINUTE', per_minute)) / 60.0
+
+    def decorator(f):
+        @wraps(f)
+        def decorated_function(*args, **kwargs):
+            bucket_key = _resolve_key(key)
+            if bucket_key is not None:
+                try:
+                    allowed, retry_after = bucket_store.acquire(f'{name}:{bucket_key}', burst, refill_per_second)
+                except sqlite3.Error as e:
+                    # Fail open: a limiter fault must not take the endpoint down
+                    log.warning(f"Rate limiter unavailable for {name}: {e}")
+                    bucket_store.record_error()
+                else:
+                    bucket_store.record(name, allowed)
+                    if not allowed:
+                        response = jsonify({'error': 'Too many requests, please slow down'})
+                        response.headers['Retry-After'] = str(max(1, math.ceil(retry_after)))
+                        return response, 429
+            return f(*args, **kwargs)
+        return decorated_function
+    return decorator
+
+def json_field_key(field):
+    """Key callable for a (lower-cased) JSON body field, e.g. the login email"""
+    def key():
+        data = request.get_json(silent=True)
+        value = data.get(field) if isinstance(data, dict) else None
+        return f'{field}:{str(value).strip().lower()}' if value else None
+    return key
@@ -2,16 +2,28 @@
 Voice API routes for TradesMate
 """
 
-from flask import Blueprint, request, jsonify
-from services.voice_service import VoiceService
-from services.ai_service import AIService
-from models.user import User
+import json
+from flask import Blueprint, Response, current_app, request, jsonify, stream_with_context
+try:
+    from ..services.voice_service import VoiceService
+    from ..services.ai_service import AIService
+    from ..services.ai_jobs import AIJobFailed, AIJobQueueFull, ai_jobs, detach_upload
+    from .auth import require_auth
+    from .ratelimit import rate_limit
+except ImportError:
+    from services.voice_service import VoiceService
+    from services.ai_service import AIService
+    from services.ai_jobs import AIJobFailed, AIJobQueueFull, ai_jobs, detach_upload
+    from routes.auth import require_auth
+    from routes.ratelimit import rate_limit
 
-voice_bp = Blueprint('voice', __name__)
+voice_bp = Blueprint('voice', __name__, url_prefix='/api/voice')
 voice_service = VoiceService()
 ai_service = AIService()
 
 @voice_bp.route('/transcribe', methods=['POST'])
+@require_auth
+@rate_limit('ai', burst=5, per_minute=10, key='user')
 def transcribe_audio():
     """Transcribe uploaded audio file"""
     try:
@@ -30,9 +42,12 @@ def transcribe_audio():
         
         # Analyze audio quality
         quality_result = voice_service.analyze_audio_quality(audio_file)
+        rejection = _quality_rejection(quality_result)
+        if rejection:
+            return rejection
         
         # Transcribe audio
-        transcription_result = voice_service.transcribe_audio(audio_file)
+        transcription_result = voice_service.transcribe_audio(audio_file, _preprocess_requested())
         
         if not transcription_result['success']:
             return jsonify({
@@ -45,73 +60,229 @@ def transcribe_audio():
             'language': transcription_result.get('language', 'en'),
             'duration': transcription_result.get('duration'),
             'quality_analysis': quality_result,
+            'preprocessing': transcription_result.get('preprocessing'),
+            'cached': transcription_result.get('cached', False),
             'word_count': len(transcription_result['text'].split()) if transcription_result['text'] else 0
         })
         
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+def run_voice_to_quote(audio_file, trade_type, hourly_rate, preprocess=None):
+    """
+    Transcribe a recording and generate a quote from it
+
+    Args:
+        audio_file: Uploaded audio file object
+        trade_type (str): User's trade
+        hourly_rate (float): User's hourly rate
+        preprocess (bool): Trim silence and normalize before transcribing (None: service default)
+
+    Returns:
+        dict: voice-to-quote response payload
+
+    Raises:
+        AIJobFailed: With the message and status code to report
+    """
+    try:
+        transcription_result = voice_service.transcribe_audio(audio_file, preprocess)
+    finally:
+        audio_file.close()
+    
+    if not transcription_result['success']:
+        raise AIJobFailed(f'Transcription failed: {transcription_result["error"]}')
+    
+    transcript = transcription_result['text']
+    
+    if not transcript or len(transcript.strip()) < 10:
+        raise AIJobFailed('Transcript too short or empty. Please record a longer description.', 400)
+    
+    # Generate quote using AI
+    ai_result = ai_service.generate_quote_from_transcript(
+        transcript,
+        trade_type,
+        hourly_rate
+    )
+    
+    if not ai_result['success']:
+        raise AIJobFailed(f'Quote generation failed: {ai_result["error"]}')
+    
+    return {
+        'success': True,
+        'transcript': transcript,
+        'transcription_metadata': {
+            'language': transcription_result.get('language', 'en'),
+            'duration': transcription_result.get('duration'),
+            'word_count': len(transcript.split()),
+            'preprocessing': transcription_result.get('preprocessing'),
+            'cached': transcription_result.get('cached', False)
+        },
+        'quote_data': ai_result['quote_data'],
+        'ai_confidence': ai_result['quote_data'].get('confidence', 0.8)
+    }
+
+def _quality_rejection(quality_result):
+    """Error response when the quality gate rejects a recording, otherwise None"""
+    if not voice_service.quality_gate or quality_result.get('acceptable', True):
+        return None
+    return jsonify({
+        'error': 'Audio quality too poor to transcribe. ' + ' '.join(quality_result.get('recommendations', [])),
+        'quality_analysis': quality_result
+    }), 400
+
+def _preprocess_requested():
+    """The optional 'preprocess' form field as a bool, or None for the service default"""
+    value = request.form.get('preprocess')
+    return None if value is None else value.strip().lower() in ('1', 'true', 'yes')
+
+def _validated_audio():
+    """Return (audio_file, None) or (None, error response), rejecting unusable recordings up front"""
+    if 'audio' not in request.files:
+        return None, (jsonify({'error': 'No audio file provided'}), 400)
+    
+    audio_file = request.files['audio']
+    
+    if not voice_service.is_allowed_file(audio_file.filename):
+        return None, (jsonify({
+            'error': f'File type not supported. Allowed formats: {", ".join(voice_service.allowed_extensions)}'
+        }), 400)
+    
+    # Cheap local check before paying for Whisper and GPT-4
+    rejection = _quality_rejection(voice_service.analyze_audio_quality(audio_file))
+    if rejection:
+        return None, rejection
+    
+    return audio_file, None
+
 @voice_bp.route('/voice-to-quote', methods=['POST'])
+@require_auth
+@rate_limit('ai', burst=5, per_minute=10, key='user')
 def voice_to_quote():
     """Process audio file and generate quote"""
     try:
-        if 'audio' not in request.files:
-            return jsonify({'error': 'No audio file provided'}), 400
+        audio_file, error = _validated_audio()
+        if error:
+            return error
         
-        audio_file = request.files['audio']
-        
-        if not voice_service.is_allowed_file(audio_file.filename):
-            return jsonify({
-                'error': f'File type not supported. Allowed formats: {", ".join(voice_service.allowed_extensions)}'
-            }), 400
+        user = request.current_identity
+        return jsonify(run_voice_to_quote(audio_file, user['trade_type'], user['hourly_rate'], _preprocess_requested()))
         
-        # Get user info
-        user = User.query.first()  # Demo: get first user
-        if not user:
-            return jsonify({'error': 'User not found'}), 404
-        
-        # Transcribe audio
-        transcription_result = voice_service.transcribe_audio(audio_file)
-        
-        if not transcription_result['success']:
-            return jsonify({
-                'error': f'Transcription failed: {transcription_result["error"]}'
-            }), 500
-        
-        transcript = transcription_result['text']
-        
-        if not transcript or len(transcript.strip()) < 10:
-            return jsonify({
-                'error': 'Transcript too short or empty. Please record a longer description.'
-            }), 400
+    except AIJobFailed as e:
+        return jsonify({'error': str(e)}), e.status_code
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@voice_bp.route('/voice-to-quote/async', methods=['POST'])
+@require_auth
+@rate_limit('ai', burst=5, per_minute=10, key='user')
+def submit_voice_to_quote():
+    """Queue voice-to-quote processing; poll GET /api/jobs/<id> for the result"""
+    try:
+        audio_file, error = _validated_audio()
+        if error:
+            return error
         
-        # Generate quote using AI
-        ai_result = ai_service.generate_quote_from_transcript(
-            transcript,
-            user.trade_type,
-            user.hourly_rate
+        user = request.current_identity
+        job = ai_jobs.submit(
+            'voice_to_quote',
+            user['id'],
+            run_voice_to_quote,
+            detach_upload(audio_file),
+            user['trade_type'],
+            user['hourly_rate'],
+            _preprocess_requested()
         )
         
-        if not ai_result['success']:
-            return jsonify({
-                'error': f'Quote generation failed: {ai_result["error"]}'
-            }), 500
-        
-        return jsonify({
+        response = jsonify({
             'success': True,
-            'transcript': transcript,
-            'transcription_metadata': {
-                'language': transcription_result.get('language', 'en'),
-                'duration': transcription_result.get('duration'),
-                'word_count': len(transcript.split())
-            },
-            'quote_data': ai_result['quote_data'],
-            'ai_confidence': ai_result['quote_data'].get('confidence', 0.8)
+            'job_id': job.id,
+            'status': job.status,
+            'status_url': f'/api/jobs/{job.id}'
         })
+        response.headers['Location'] = f'/api/jobs/{job.id}'
+        return response, 202
         
+    except AIJobQueueFull as e:
+        response = jsonify({'error': f'{e}, please try again shortly'})
+        response.headers['Retry-After'] = '5'
+        return response, 503
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+def _sse(event, data):
+    """Format one Server-Sent Events message"""
+    return f'event: {event}\ndata: {json.dumps(data, separators=(",", ":"))}\n\n'
+
+@voice_bp.route('/voice-to-quote/stream', methods=['POST'])
+@require_auth
+@rate_limit('ai', burst=5, per_minute=10, key='user')
+def stream_voice_to_quote():
+    """
+    Generate a quote as a Server-Sent Events stream
+    
+    Accepts either an 'audio' upload (transcribed first, with optional
+    'preprocess' form field) or JSON {"transcript": "..."}. Events:
+        transcript: {'transcript', 'language', 'duration'} (audio uploads only)
+        field: {'name', 'value'} as each quote field is generated
+        item: {'name': 'materials', 'index', 'value'} per materials line
+        quote: final validated result, as returned by /voice-to-quote
+        error: {'error'}
+    """
+    try:
+        audio_file = None
+        transcript = None
+        if 'audio' in request.files:
+            audio_file, error = _validated_audio()
+            if error:
+                return error
+        else:
+            data = request.get_json(silent=True)
+            if not data or not data.get('transcript'):
+                return jsonify({'error': 'Audio file or transcript is required'}), 400
+            transcript = data['transcript']
+        
+        trade_type, hourly_rate = request.current_identity['trade_type'], request.current_identity['hourly_rate']
+        preprocess = _preprocess_requested()
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+    
+    def generate(transcript):
+        # Flush headers straight away so proxies and clients start reading
+        yield ': stream open\n\n'
+        try:
+            if audio_file is not None:
+                try:
+                    transcription_result = voice_service.transcribe_audio(audio_file, preprocess)
+                finally:
+                    audio_file.close()
+                if not transcription_result['success']:
+                    yield _sse('error', {'error': f'Transcription failed: {transcription_result["error"]}'})
+                    return
+                transcript = transcription_result['text']
+                if not transcript or len(transcript.strip()) < 10:
+                    yield _sse('error', {'error': 'Transcript too short or empty. Please record a longer description.'})
+                    return
+                yield _sse('transcript', {
+                    'transcript': transcript,
+                    'language': transcription_result.get('language', 'en'),
+                    'duration': transcription_result.get('duration')
+                })
+            
+            for event, data in ai_service.stream_quote_from_transcript(transcript, trade_type, hourly_rate):
+                if event == 'quote' and not data['success']:
+                    yield _sse('error', {'error': f'Quote generation failed: {data["error"]}'})
+                    return
+                yield _sse(event, data)
+        except Exception as e:
+            yield _sse('error', {'error': str(e)})
+    
+    return Response(
+        stream_with_context(generate(transcript)),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
 @voice_bp.route('/analyze-quality', methods=['POST'])
 def analyze_audio_quality():
     """Analyze audio file quality"""
@@ -137,25 +308,26 @@ def get_supported_formats():
         return jsonify({'error': str(e)}), 500
 
 @voice_bp.route('/test-transcript', methods=['POST'])
+@require_auth
+@rate_limit('ai', burst=5, per_minute=10, key='user')
 def test_transcript():
-    """Test quote generation with sample transcript (for development)"""
+    """Test quote generation with sample transcript (debug and testing only)"""
+    if not (current_app.debug or current_app.testing):
+        return jsonify({'error': 'Not found'}), 404
     try:
-        data = request.get_json()
+        data = request.get_json(silent=True)
         
-        if not data or 'transcript' not in data:
+        if not isinstance(data, dict) or 'transcript' not in data:
             return jsonify({'error': 'Transcript is required'}), 400
         
         transcript = data['transcript']
-        user = User.query.first()
-        
-        if not user:
-            return jsonify({'error': 'User not found'}), 404
+        user = request.current_identity
         
         # Generate quote using AI
         ai_result = ai_service.generate_quote_from_transcript(
             transcript,
-            user.trade_type,
-            user.hourly_rate
+            user['trade_type'],
+            user['hourly_rate']
         )
         
         return jsonify(ai_result)
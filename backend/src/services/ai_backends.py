@@ -0,0 +1,80 @@
+"""
+AI Backend Registry for TradesMate
+Selects the client used for transcription and for quote generation:
+the OpenAI API, or the deterministic local engine for offline load tests
+"""
+
+import os
+import threading
+try:
+    from .. import metrics
+    from .openai_client import get_openai_client
+    from .local_engine import LocalEngine
+except ImportError:
+    import metrics
+    from services.openai_client import get_openai_client
+    from services.local_engine import LocalEngine
+
+CAPABILITIES = ('chat', 'transcribe')
+
+_local_engine = None
+_local_engine_pid = None
+_lock = threading.Lock()
+
+def get_local_engine():
+    """This process's LocalEngine, configured from LOCAL_AI_* on first use"""
+    global _local_engine, _local_engine_pid
+    with _lock:
+        if _local_engine is None or _local_engine_pid != os.getpid():
+            _local_engine = LocalEngine.from_env()
+            _local_engine_pid = os.getpid()
+        return _local_engine
+
+# name -> factory() returning an OpenAI-compatible client, or None when unavailable
+_backends = {
+    'openai': get_openai_client,
+    'local': get_local_engine,
+}
+
+def register_backend(name, factory):
+    """
+    Register an AI backend
+
+    Args:
+        name (str): Value for AI_BACKEND / AI_CHAT_BACKEND / AI_TRANSCRIBE_BACKEND
+        factory (callable): Returns a client exposing chat.completions.create
+            and audio.transcriptions.create like the OpenAI SDK, or None
+    """
+    _backends[name.lower()] = factory
+
+def backend_name(capability):
+    """Configured backend for 'chat' or 'transcribe'; AI_<CAPABILITY>_BACKEND overrides AI_BACKEND"""
+    return os.getenv(f'AI_{capability.upper()}_BACKEND', os.getenv('AI_BACKEND', 'openai')).lower()
+
+def get_ai_client(capability):
+    """
+    Client for one capability, from the configured backend
+
+    Args:
+        capability (str): 'chat' or 'transcribe'
+
+    Returns:
+        Client, or None when the backend is unavailable (e.g. no OpenAI key)
+
+    Raises:
+        ValueError: The configured backend is not registered
+    """
+    name = backend_name(capability)
+    factory = _backends.get(name)
+    if factory is None:
+        raise ValueError(f'Unknown AI backend {name!r}; registered: {", ".join(sorted(_backends))}')
+    return factory()
+
+def backend_stats():
+    """Selected backend per capability, plus the local engine's counters when in use"""
+    stats = {capability: backend_name(capability) for capability in CAPABILITIES}
+    if _local_engine is not None and _local_engine_pid == os.getpid():
+        stats['local_engine'] = _local_engine.stats()
+    return stats
+
+metrics.register('ai_backends', backend_stats)
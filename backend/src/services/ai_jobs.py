@@ -0,0 +1,232 @@
+"""
+Background AI Job Service for TradesMate
+Runs slow Whisper / GPT-4 work on a bounded thread pool so request workers
+return a job id immediately instead of waiting out the round trip
+"""
+
+import json
+import logging
+import os
+import random
+import tempfile
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from flask import current_app
+from werkzeug.datastructures import FileStorage
+try:
+    from .. import metrics
+    from ..database import db
+    from ..metrics import Histogram
+    from ..models.ai_job import AIJob
+except ImportError:
+    import metrics
+    from database import db
+    from metrics import Histogram
+    from models.ai_job import AIJob
+
+log = logging.getLogger(__name__)
+
+class AIJobQueueFull(Exception):
+    """Raised when every worker is busy and the queue is full; callers should answer 503"""
+
+class AIJobFailed(Exception):
+    """Expected failure of an AI job, carrying the HTTP status the sync endpoint would return"""
+
+    def __init__(self, message, status_code=500):
+        super().__init__(message)
+        self.status_code = status_code
+
+def detach_upload(file_storage):
+    """
+    Copy an upload out of the request so a background job can read it
+
+    The request stream is gone once the response is sent. Small uploads stay
+    in memory; larger ones spill to a temporary file.
+
+    Args:
+        file_storage (FileStorage): Upload from request.files
+
+    Returns:
+        FileStorage: Detached copy with the same filename and content type
+    """
+    spool = tempfile.SpooledTemporaryFile(max_size=int(os.getenv('AI_JOB_SPOOL_MEMORY', 1048576)))
+    file_storage.stream.seek(0)
+    while True:
+        chunk = file_storage.stream.read(65536)
+        if not chunk:
+            break
+        spool.write(chunk)
+    spool.seek(0)
+    return FileStorage(
+        stream=spool,
+        filename=file_storage.filename,
+        name=file_storage.name,
+        content_type=file_storage.content_type
+    )
+
+class AIJobRunner:
+    """Bounded background execution of AI jobs with results stored in ai_jobs"""
+
+    # Whisper + GPT-4 round trips take seconds to tens of seconds
+    LATENCY_BUCKETS_MS = (250, 500, 1000, 2500, 5000, 10000, 30000, 60000)
+
+    def __init__(self):
+        self.workers = int(os.getenv('AI_JOB_WORKERS', 4))
+        self.max_pending = int(os.getenv('AI_JOB_QUEUE', self.workers * 8))
+        self.retention = timedelta(hours=float(os.getenv('AI_JOB_RETENTION_HOURS', 24)))
+        # A job still queued or running this long after submission is reported as failed
+        self.deadline = timedelta(seconds=float(os.getenv('AI_JOB_DEADLINE_SECONDS', 600)))
+        self._slots = threading.BoundedSemaphore(max(1, self.max_pending))
+        self._executor = None
+        self._executor_pid = None
+        self._lock = threading.Lock()
+        self.queue_wait = Histogram(self.LATENCY_BUCKETS_MS)
+        self.run_time = Histogram(self.LATENCY_BUCKETS_MS)
+        self.pending = 0
+        self.submitted = 0
+        self.succeeded = 0
+        self.failed = 0
+        self.rejected = 0
+        self.expired = 0
+
+    def _get_executor(self):
+        """Create the pool lazily in each (post-fork) worker process"""
+        with self._lock:
+            if self._executor is None or self._executor_pid != os.getpid():
+                self._executor = ThreadPoolExecutor(
+                    max_workers=max(1, self.workers),
+                    thread_name_prefix='ai-job'
+                )
+                self._executor_pid = os.getpid()
+            return self._executor
+
+    def _count(self, counter, delta=1):
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + delta)
+
+    def submit(self, kind, user_id, fn, *args):
+        """
+        Record a queued job and schedule fn(*args) on the pool
+
+        fn returns the JSON-ready payload of the equivalent synchronous
+        endpoint, or raises AIJobFailed.
+
+        Args:
+            kind (str): Job kind, e.g. 'voice_to_quote'
+            user_id (int): Owner; only they can poll the job
+            fn (callable): Work to run in the background
+
+        Returns:
+            AIJob: The queued job
+        """
+        if not self._slots.acquire(blocking=False):
+            self._count('rejected')
+            raise AIJobQueueFull('AI job queue is full')
+        # Count before scheduling: a fast job can finish and decrement first
+        self._count('pending')
+        try:
+            job = AIJob(id=uuid.uuid4().hex, user_id=user_id, kind=kind, status='queued')
+            db.session.add(job)
+            if random.random() < 0.01:
+                self.prune()
+            db.session.commit()
+            self._get_executor().submit(
+                self._run, current_app._get_current_object(), job.id, time.perf_counter(), fn, args
+            )
+        except Exception:
+            self._count('pending', -1)
+            self._slots.release()
+            raise
+        self._count('submitted')
+        return job
+
+    def _run(self, app, job_id, queued_at, fn, args):
+        """Execute one job inside an app context and store its outcome"""
+        started = time.perf_counter()
+        self.queue_wait.observe((started - queued_at) * 1000)
+        try:
+            with app.app_context():
+                try:
+                    if not self._update(job_id, 'queued', status='running', started_at=datetime.utcnow()):
+                        return  # expired while queued
+                    result = fn(*args)
+                except AIJobFailed as e:
+                    if self._update(job_id, 'running', status='failed', error=str(e), finished_at=datetime.utcnow()):
+                        self._count('failed')
+                except Exception as e:
+                    log.exception(f"AI job {job_id} crashed")
+                    if self._update(job_id, 'running', status='failed', error=str(e), finished_at=datetime.utcnow()):
+                        self._count('failed')
+                else:
+                    # Discarded if the job expired while running
+                    if self._update(
+                        job_id, 'running', status='succeeded', result=json.dumps(result), finished_at=datetime.utcnow()
+                    ):
+                        self._count('succeeded')
+                finally:
+                    db.session.remove()
+        except Exception:
+            log.exception(f"AI job {job_id} could not record its result")
+        finally:
+            self.run_time.observe((time.perf_counter() - started) * 1000)
+            self._count('pending', -1)
+            self._slots.release()
+
+    def _update(self, job_id, from_status, **values):
+        """Move a job on from from_status; False if it has left that status (e.g. expired)"""
+        updated = db.session.query(AIJob).filter(AIJob.id == job_id, AIJob.status == from_status).update(
+            values, synchronize_session=False
+        )
+        db.session.commit()
+        return bool(updated)
+
+    def expire_if_stale(self, job):
+        """
+        Fail a queued or running job that has outlived the deadline
+
+        Covers jobs lost with a restarted worker as well as hung ones; a
+        late result from a hung job is then discarded.
+
+        Args:
+            job (AIJob): Job loaded in the current session
+
+        Returns:
+            bool: True if the job was expired by this call
+        """
+        if job.status not in ('queued', 'running') or job.created_at > datetime.utcnow() - self.deadline:
+            return False
+        expired = self._update(job.id, job.status, status='failed', finished_at=datetime.utcnow(),
+                               error='Job did not finish in time, please try again')
+        db.session.refresh(job)
+        if expired:
+            self._count('expired')
+        return expired
+
+    def prune(self):
+        """Delete jobs older than the retention window"""
+        cutoff = datetime.utcnow() - self.retention
+        db.session.query(AIJob).filter(AIJob.created_at < cutoff).delete(synchronize_session=False)
+
+    def stats(self):
+        with self._lock:
+            counters = {
+                'pending': self.pending,
+                'submitted': self.submitted,
+                'succeeded': self.succeeded,
+                'failed': self.failed,
+                'rejected': self.rejected,
+                'expired': self.expired,
+            }
+        return {
+            'workers': self.workers,
+            'max_pending': self.max_pending,
+            **counters,
+            'queue_wait': self.queue_wait.to_dict(),
+            'run_time': self.run_time.to_dict(),
+        }
+
+ai_jobs = AIJobRunner()
+metrics.register('ai_jobs', ai_jobs.stats)
@@ -5,24 +5,69 @@ Handles OpenAI GPT-4 integration for quote generation
 
 import os
 import json
-import re
+import hashlib
+import tempfile
 from datetime import datetime, timedelta
-from openai import OpenAI
+try:
+    from ..cache import SQLiteCache, TTLCache, TwoTierCache
+    from .. import metrics
+    from .ai_backends import backend_name, get_ai_client
+    from .llm_json import IncrementalFieldParser, extract_json_object
+    from .quote_schema import quote_schema
+    from .resilience import ServiceUnavailable, chat_guard
+except ImportError:
+    from cache import SQLiteCache, TTLCache, TwoTierCache
+    import metrics
+    from services.ai_backends import backend_name, get_ai_client
+    from services.llm_json import IncrementalFieldParser, extract_json_object
+    from services.quote_schema import quote_schema
+    from services.resilience import ServiceUnavailable, chat_guard
+
+# Bump whenever a system prompt or the model changes so cached quotes are not reused
+PROMPT_VERSION = 'gpt-4/2025-01-v1'
+
+# Repeat submissions (retries, "regenerate") are served from here instead of GPT-4
+quote_cache = TwoTierCache(
+    memory=TTLCache(
+        maxsize=int(os.getenv('AI_CACHE_MEMORY_SIZE', 512)),
+        ttl=float(os.getenv('AI_CACHE_TTL', 7 * 86400))
+    ),
+    disk=SQLiteCache(
+        os.getenv('AI_CACHE_DB', os.path.join(tempfile.gettempdir(), 'tradesmate_ai_cache.db')),
+        ttl=float(os.getenv('AI_CACHE_TTL', 7 * 86400)),
+        max_entries=int(os.getenv('AI_CACHE_MAX_ENTRIES', 20000))
+    )
+)
+metrics.register('ai_quote_cache', quote_cache.stats)
+
+# When OpenAI is unreachable or the circuit is open, answer with a heuristic estimate
+FALLBACK_TO_HEURISTIC = os.getenv('AI_FALLBACK_HEURISTIC', 'true').lower() in ('1', 'true', 'yes')
+
+# Array fields streamed element by element as 'item' events
+STREAMED_ITEMS = ('materials',)
+
+def quote_cache_key(kind, text, user_trade_type, hourly_rate):
+    """
+    Cache key over normalized input text, trade settings, prompt version and chat backend
+    
+    The backend is part of the key so quotes from the local engine are never
+    served once the app is back on OpenAI.
+    """
+    normalized = ' '.join(text.split()).casefold()
+    material = json.dumps(
+        [PROMPT_VERSION, backend_name('chat'), kind, normalized, (user_trade_type or '').casefold(), float(hourly_rate)]
+    )
+    return hashlib.sha256(material.encode('utf-8')).hexdigest()
 
 class AIService:
     """Service for AI-powered quote generation and analysis"""
     
-    def __init__(self):
-        api_key = os.getenv('OPENAI_API_KEY', 'demo-key')
-        if api_key and api_key != 'demo-key':
-            self.client = OpenAI(
-                api_key=api_key,
-                base_url=os.getenv('OPENAI_API_BASE', 'https://api.openai.com/v1')
-            )
-        else:
-            self.client = None  # Demo mode - use mock responses
+    @property
+    def client(self):
+        """Client from the configured chat backend (AI_BACKEND), or None in demo mode (mock responses)"""
+        return get_ai_client('chat')
     
-    def generate_quote_from_transcript(self, transcript, user_trade_type="Electrician", hourly_rate=45.0):
+    def generate_quote_from_transcript(self, transcript, user_trade_type="Electrician", hourly_rate=45.0, use_cache=True):
         """
         Generate a professional quote from voice transcript
         
@@ -30,12 +75,162 @@ class AIService:
             transcript (str): Voice transcript of job description
             user_trade_type (str): Type of trade (Electrician, Plumber, etc.)
             hourly_rate (float): User's hourly rate
+            use_cache (bool): Serve repeat inputs from the quote cache
             
         Returns:
             dict: Generated quote data
         """
         
-        system_prompt = f"""You are an AI assistant helping UK {user_trade_type.lower()}s create professional quotes.
+        system_prompt = self._transcript_prompt(user_trade_type, hourly_rate)
+
+        try:
+            if self.client is None:
+                # Demo mode - return mock response
+                return self._generate_mock_quote(transcript, user_trade_type, hourly_rate)
+            
+            cache_key = quote_cache_key('transcript', transcript, user_trade_type, hourly_rate)
+            if use_cache:
+                cached = quote_cache.get(cache_key)
+                if cached is not None:
+                    cached['cached'] = True
+                    return cached
+            
+            client = self.client
+            response = chat_guard.call(lambda timeout: client.chat.completions.create(
+                model="gpt-4",
+                messages=[
+                    {"role": "system", "content": system_prompt},
+                    {"role": "user", "content": f"Voice transcript: {transcript}"}
+                ],
+                temperature=0.3,
+                max_tokens=1500,
+                timeout=timeout
+            ))
+            
+            # Parse the JSON response
+            content = response.choices[0].message.content.strip()
+            quote_data, content = self._parse_quote_response(content, hourly_rate)
+            
+            result = {
+                'success': True,
+                'quote_data': quote_data,
+                'raw_response': content
+            }
+            quote_cache.set(cache_key, result)
+            return result
+            
+        except ServiceUnavailable as e:
+            return self._fallback_quote(transcript, user_trade_type, hourly_rate, e)
+        except json.JSONDecodeError as e:
+            return {
+                'success': False,
+                'error': f'Failed to parse AI response: {str(e)}',
+                'raw_response': content if 'content' in locals() else None
+            }
+        except Exception as e:
+            return {
+                'success': False,
+                'error': f'AI service error: {str(e)}'
+            }
+    
+    def stream_quote_from_transcript(self, transcript, user_trade_type="Electrician", hourly_rate=45.0, use_cache=True):
+        """
+        Streaming variant of generate_quote_from_transcript
+
+        Yields quote fields as soon as they can be parsed from the GPT-4 token
+        stream, then the same result generate_quote_from_transcript returns.
+
+        Args:
+            transcript (str): Voice transcript of job description
+            user_trade_type (str): Type of trade (Electrician, Plumber, etc.)
+            hourly_rate (float): User's hourly rate
+            use_cache (bool): Serve repeat inputs from the quote cache
+
+        Yields:
+            tuple: (event, data) where event is 'field' ({'name', 'value'}),
+            'item' ({'name', 'index', 'value'}) for each materials line, and
+            finally 'quote' (the full result dict, 'success' may be False)
+        """
+        try:
+            if self.client is None:
+                result = self._generate_mock_quote(transcript, user_trade_type, hourly_rate)
+                yield from self._replay_quote(result)
+                return
+
+            cache_key = quote_cache_key('transcript', transcript, user_trade_type, hourly_rate)
+            if use_cache:
+                cached = quote_cache.get(cache_key)
+                if cached is not None:
+                    cached['cached'] = True
+                    yield from self._replay_quote(cached)
+                    return
+
+            client = self.client
+            stream = chat_guard.stream(lambda timeout: client.chat.completions.create(
+                model="gpt-4",
+                messages=[
+                    {"role": "system", "content": self._transcript_prompt(user_trade_type, hourly_rate)},
+                    {"role": "user", "content": f"Voice transcript: {transcript}"}
+                ],
+                temperature=0.3,
+                max_tokens=1500,
+                stream=True,
+                timeout=timeout
+            ))
+
+            parser = IncrementalFieldParser(itemized=STREAMED_ITEMS)
+            parts = []
+            for chunk in stream:
+                if not chunk.choices:
+                    continue
+                delta = chunk.choices[0].delta.content
+                if not delta:
+                    continue
+                parts.append(delta)
+                yield from parser.feed(delta)
+
+            content = ''.join(parts).strip()
+        except ServiceUnavailable as e:
+            # Fields already sent are superseded by the fallback's
+            yield from self._replay_quote(self._fallback_quote(transcript, user_trade_type, hourly_rate, e))
+            return
+        except Exception as e:
+            yield 'quote', {
+                'success': False,
+                'error': f'AI service error: {str(e)}'
+            }
+            return
+
+        try:
+            quote_data, content = self._parse_quote_response(content, hourly_rate)
+        except json.JSONDecodeError as e:
+            yield 'quote', {
+                'success': False,
+                'error': f'Failed to parse AI response: {str(e)}',
+                'raw_response': content
+            }
+            return
+
+        result = {
+            'success': True,
+            'quote_data': quote_data,
+            'raw_response': content
+        }
+        quote_cache.set(cache_key, result)
+        yield 'quote', result
+
+    def _replay_quote(self, result):
+        """Stream events for an already complete result (cache hit or demo mode), in live-stream order"""
+        for name, value in result.get('quote_data', {}).items():
+            if name in STREAMED_ITEMS and isinstance(value, list):
+                for index, item in enumerate(value):
+                    yield 'item', {'name': name, 'index': index, 'value': item}
+            yield 'field', {'name': name, 'value': value}
+        yield 'quote', result
+
+    def _transcript_prompt(self, user_trade_type, hourly_rate):
+        """System prompt for quotes from voice transcripts"""
+        return f"""You are an AI assistant helping UK {user_trade_type.lower()}s create professional quotes.
 
 Analyze the voice transcript and extract:
 1. Customer details (name, phone, address if mentioned)
@@ -73,54 +268,8 @@ Respond with valid JSON only:
     "scheduling_suggestion": "string",
     "notes": "any additional notes"
 }}"""
-
-        try:
-            if self.client is None:
-                # Demo mode - return mock response
-                return self._generate_mock_quote(transcript, user_trade_type, hourly_rate)
-            
-            response = self.client.chat.completions.create(
-                model="gpt-4",
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": f"Voice transcript: {transcript}"}
-                ],
-                temperature=0.3,
-                max_tokens=1500
-            )
-            
-            # Parse the JSON response
-            content = response.choices[0].message.content.strip()
-            
-            # Extract JSON from response (in case there's extra text)
-            json_match = re.search(r'\{.*\}', content, re.DOTALL)
-            if json_match:
-                content = json_match.group()
-            
-            quote_data = json.loads(content)
-            
-            # Validate and ensure required fields
-            quote_data = self._validate_quote_data(quote_data, hourly_rate)
-            
-            return {
-                'success': True,
-                'quote_data': quote_data,
-                'raw_response': content
-            }
-            
-        except json.JSONDecodeError as e:
-            return {
-                'success': False,
-                'error': f'Failed to parse AI response: {str(e)}',
-                'raw_response': content if 'content' in locals() else None
-            }
-        except Exception as e:
-            return {
-                'success': False,
-                'error': f'AI service error: {str(e)}'
-            }
     
-    def analyze_photo_text(self, extracted_text, user_trade_type="Electrician", hourly_rate=45.0):
+    def analyze_photo_text(self, extracted_text, user_trade_type="Electrician", hourly_rate=45.0, use_cache=True):
         """
         Analyze extracted text from photo and generate quote
         
@@ -128,6 +277,7 @@ Respond with valid JSON only:
             extracted_text (str): Text extracted from photo
             user_trade_type (str): Type of trade
             hourly_rate (float): User's hourly rate
+            use_cache (bool): Serve repeat inputs from the quote cache
             
         Returns:
             dict: Generated quote data
@@ -166,82 +316,88 @@ Respond with valid JSON only:
 }}"""
 
         try:
-            response = self.client.chat.completions.create(
+            cache_key = quote_cache_key('photo', extracted_text, user_trade_type, hourly_rate)
+            if use_cache:
+                cached = quote_cache.get(cache_key)
+                if cached is not None:
+                    cached['cached'] = True
+                    return cached
+            
+            client = self.client
+            response = chat_guard.call(lambda timeout: client.chat.completions.create(
                 model="gpt-4",
                 messages=[
                     {"role": "system", "content": system_prompt},
                     {"role": "user", "content": f"Extracted text from photo: {extracted_text}"}
                 ],
                 temperature=0.3,
-                max_tokens=1500
-            )
+                max_tokens=1500,
+                timeout=timeout
+            ))
             
             content = response.choices[0].message.content.strip()
+            quote_data, content = self._parse_quote_response(content, hourly_rate)
             
-            # Extract JSON from response
-            json_match = re.search(r'\{.*\}', content, re.DOTALL)
-            if json_match:
-                content = json_match.group()
-            
-            quote_data = json.loads(content)
-            quote_data = self._validate_quote_data(quote_data, hourly_rate)
-            
-            return {
+            result = {
                 'success': True,
                 'quote_data': quote_data,
                 'raw_response': content
             }
+            quote_cache.set(cache_key, result)
+            return result
             
+        except ServiceUnavailable as e:
+            return self._fallback_quote(extracted_text, user_trade_type, hourly_rate, e)
         except Exception as e:
             return {
                 'success': False,
                 'error': f'Photo analysis error: {str(e)}'
             }
     
-    def _validate_quote_data(self, quote_data, default_hourly_rate):
-        """Validate and clean quote data"""
-        
-        # Ensure required fields exist
-        required_fields = {
-            'customer_name': 'Unknown Customer',
-            'job_description': 'Job description not provided',
-            'job_type': 'General',
-            'urgency': 'normal',
-            'labour_hours': 2.0,
-            'labour_rate': default_hourly_rate,
-            'materials_cost': 0.0,
-            'confidence': 0.8
-        }
-        
-        for field, default_value in required_fields.items():
-            if field not in quote_data or quote_data[field] is None:
-                quote_data[field] = default_value
-        
-        # Ensure materials is a list
-        if 'materials' not in quote_data or not isinstance(quote_data['materials'], list):
-            quote_data['materials'] = []
-        
-        # Calculate totals
-        labour_cost = quote_data['labour_hours'] * quote_data['labour_rate']
-        materials_cost = quote_data['materials_cost']
-        subtotal = labour_cost + materials_cost
-        vat_amount = subtotal * 0.20  # 20% UK VAT
-        total_amount = subtotal + vat_amount
+    def _parse_quote_response(self, content, hourly_rate):
+        """
+        Extract and validate the quote JSON from a completion
         
-        quote_data.update({
-            'subtotal': round(subtotal, 2),
-            'vat_amount': round(vat_amount, 2),
-            'total_amount': round(total_amount, 2)
-        })
+        Returns:
+            tuple: (quote_data, json_text)
         
-        return quote_data
+        Raises:
+            json.JSONDecodeError: If no valid JSON object is found
+        """
+        # Balanced-brace scan, so prose with braces around the JSON is ignored
+        quote_data = extract_json_object(content)
+        return self._validate_quote_data(quote_data, hourly_rate), json.dumps(quote_data)
+    
+    def _validate_quote_data(self, quote_data, default_hourly_rate):
+        """Validate and clean quote data (coerce numbers, normalize materials, recompute totals)"""
+        return quote_schema.validate(quote_data, default_hourly_rate)
     
     def generate_quote_number(self):
-        """Generate a unique quote number"""
-        timestamp = datetime.now().strftime("%Y%m%d")
-        import random
-        random_suffix = random.randint(1000, 9999)
-        return f"TM-{timestamp}-{random_suffix}"
+        """Generate a unique quote number from the shared per-day sequence"""
+        try:
+            from .numbering import quote_numbers
+        except ImportError:
+            from services.numbering import quote_numbers
+        return quote_numbers.allocate()
+    
+    def _fallback_quote(self, text, user_trade_type, hourly_rate, reason):
+        """
+        Heuristic quote used when the AI provider is unavailable
+        
+        Not cached, so the next request tries GPT-4 again.
+        """
+        if not FALLBACK_TO_HEURISTIC:
+            return {
+                'success': False,
+                'error': f'AI service unavailable: {reason}'
+            }
+        result = self._generate_mock_quote(text, user_trade_type, hourly_rate)
+        result['fallback'] = True
+        result['quote_data'].update({
+            'confidence': 0.3,
+            'notes': 'Rough estimate made while the AI service was unavailable. Please review before sending.'
+        })
+        return result
     
     def _generate_mock_quote(self, transcript, user_trade_type="Electrician", hourly_rate=45.0):
         """Generate a mock quote for demo purposes"""
@@ -0,0 +1,415 @@
+"""
+Audio Processing for TradesMate
+PCM decoding, signal analysis, silence detection and WAV encoding used to
+prepare recordings for transcription
+"""
+
+import io
+import logging
+import os
+import shutil
+import struct
+import subprocess
+import wave
+try:
+    import numpy as np
+except ImportError:  # chunking and analysis are skipped without NumPy
+    np = None
+
+log = logging.getLogger(__name__)
+
+# Whisper works on 16 kHz mono internally, so compressed formats are decoded straight to that
+WHISPER_SAMPLE_RATE = 16000
+
+class AudioDecodeError(Exception):
+    """Raised when a recording cannot be decoded to PCM"""
+
+class PCMAudio:
+    """Decoded audio: int16 samples shaped (frames, channels) at sample_rate"""
+
+    def __init__(self, samples, sample_rate):
+        if samples.ndim == 1:
+            samples = samples.reshape(-1, 1)
+        self.samples = samples
+        self.sample_rate = int(sample_rate)
+
+    @property
+    def channels(self):
+        return self.samples.shape[1]
+
+    @property
+    def frames(self):
+        return self.samples.shape[0]
+
+    @property
+    def duration(self):
+        """Length in seconds"""
+        return self.frames / self.sample_rate if self.sample_rate else 0.0
+
+    @property
+    def bytes_per_second(self):
+        """Size of this audio as 16-bit PCM WAV, per second"""
+        return self.sample_rate * self.channels * 2
+
+    def mono(self):
+        """Float32 mono mix scaled to [-1, 1]"""
+        # Column by column: mean(axis=1) over interleaved int16 is several times slower
+        mix = self.samples[:, 0].astype(np.float32)
+        for channel in range(1, self.channels):
+            mix += self.samples[:, channel]
+        mix *= 1.0 / (32768.0 * self.channels)
+        return mix
+
+    def slice(self, start, end):
+        """Sub-range by frame index"""
+        return PCMAudio(self.samples[start:end], self.sample_rate)
+
+    def to_wav(self):
+        """Encode as 16-bit PCM WAV in memory"""
+        buffer = io.BytesIO()
+        with wave.open(buffer, 'wb') as writer:
+            writer.setnchannels(self.channels)
+            writer.setsampwidth(2)
+            writer.setframerate(self.sample_rate)
+            writer.writeframes(np.ascontiguousarray(self.samples, dtype='<i2').tobytes())
+        buffer.seek(0)
+        return buffer
+
+# WAV format tags; EXTENSIBLE carries the real tag at the start of its sub-format GUID
+WAVE_FORMAT_PCM = 0x0001
+WAVE_FORMAT_IEEE_FLOAT = 0x0003
+WAVE_FORMAT_EXTENSIBLE = 0xFFFE
+
+def _wav_chunks(data):
+    """(fmt chunk, data chunk) bytes of a RIFF/WAVE file"""
+    if len(data) < 12 or data[:4] != b'RIFF' or data[8:12] != b'WAVE':
+        raise AudioDecodeError('Invalid WAV file: not a RIFF/WAVE file')
+    fmt = payload = None
+    position = 12
+    while position + 8 <= len(data) and (fmt is None or payload is None):
+        chunk_id = data[position:position + 4]
+        size = struct.unpack_from('<I', data, position + 4)[0]
+        body = position + 8
+        if chunk_id == b'fmt ':
+            fmt = data[body:body + size]
+        elif chunk_id == b'data':
+            # Recorders that stream to disk may leave the size unset, so take what is there
+            payload = memoryview(data)[body:body + size if 0 < size < len(data) - body else len(data)]
+        position = body + size + (size & 1)  # chunks are word aligned
+    if fmt is None or payload is None or len(fmt) < 16:
+        raise AudioDecodeError('Invalid WAV file: missing fmt or data chunk')
+    return fmt, payload
+
+def decode_wav(stream):
+    """
+    Decode PCM (8/16/24/32-bit) and IEEE float WAV, including WAVE_FORMAT_EXTENSIBLE
+
+    Parsed directly rather than with the wave module, which on Python 3.11
+    rejects float and extensible headers that Whisper accepts.
+    """
+    fmt, payload = _wav_chunks(stream.read())
+    tag, channels, rate, _, block_align, _ = struct.unpack_from('<HHIIHH', fmt)
+    if tag == WAVE_FORMAT_EXTENSIBLE and len(fmt) >= 26:
+        tag = struct.unpack_from('<H', fmt, 24)[0]
+    if not channels or not rate or block_align % channels:
+        raise AudioDecodeError('Invalid WAV file: bad fmt chunk')
+    width = block_align // channels
+    raw = np.frombuffer(payload, dtype=np.uint8, count=len(payload) // block_align * block_align)
+
+    if tag == WAVE_FORMAT_PCM and width == 1:
+        samples = (raw.astype(np.int16) - 128) << 8
+    elif tag == WAVE_FORMAT_PCM and width == 2:
+        samples = raw.view('<i2')
+    elif tag == WAVE_FORMAT_PCM and width in (3, 4):
+        # Keep the top two bytes of each little-endian sample
+        samples = np.ascontiguousarray(raw.reshape(-1, width)[:, width - 2:]).view('<i2')
+    elif tag == WAVE_FORMAT_IEEE_FLOAT and width in (4, 8):
+        values = raw.view('<f4' if width == 4 else '<f8')
+        samples = (np.clip(values, -1.0, 1.0) * 32767).astype(np.int16)
+    else:
+        raise AudioDecodeError(f'Unsupported WAV encoding: format {tag:#06x}, {width * 8}-bit')
+    return PCMAudio(samples.reshape(-1, channels), rate)
+
+def decode_ffmpeg(stream):
+    """Decode any format ffmpeg understands to 16 kHz mono PCM"""
+    process = subprocess.run(
+        [shutil.which('ffmpeg') or 'ffmpeg', '-v', 'error', '-i', 'pipe:0',
+         '-f', 's16le', '-acodec', 'pcm_s16le', '-ac', '1', '-ar', str(WHISPER_SAMPLE_RATE), 'pipe:1'],
+        input=stream.read(),
+        capture_output=True,
+        timeout=float(os.getenv('AUDIO_DECODE_TIMEOUT', 60))
+    )
+    if process.returncode != 0:
+        raise AudioDecodeError(f'ffmpeg could not decode audio: {process.stderr.decode(errors="replace")[:200]}')
+    return PCMAudio(np.frombuffer(process.stdout, dtype='<i2'), WHISPER_SAMPLE_RATE)
+
+# extension -> decoder(stream) -> PCMAudio
+_decoders = {'wav': decode_wav}
+if shutil.which('ffmpeg'):
+    for _extension in ('mp3', 'mp4', 'm4a', 'mpeg', 'mpga', 'webm', 'ogg', 'oga', 'flac'):
+        _decoders[_extension] = decode_ffmpeg
+
+def register_decoder(extensions, decoder):
+    """
+    Register a decoder for extra formats
+
+    Args:
+        extensions (iterable): File extensions without the dot, e.g. ('m4a', 'webm')
+        decoder (callable): Takes a binary stream and returns PCMAudio
+    """
+    for extension in extensions:
+        _decoders[extension.lower()] = decoder
+
+def can_decode(filename):
+    """True when NumPy is available and a decoder is registered for the file's extension"""
+    extension = filename.rsplit('.', 1)[-1].lower() if filename and '.' in filename else ''
+    return np is not None and extension in _decoders
+
+def decode_audio(stream, filename):
+    """
+    Decode a recording to PCM, leaving the stream position where it was
+
+    Args:
+        stream: Seekable binary stream
+        filename (str): Name used to pick the decoder
+
+    Returns:
+        PCMAudio: Decoded samples
+
+    Raises:
+        AudioDecodeError: No decoder for the format, or the data is invalid
+    """
+    if not can_decode(filename):
+        raise AudioDecodeError(f'No decoder available for {filename}')
+    decoder = _decoders[filename.rsplit('.', 1)[-1].lower()]
+    position = stream.tell()
+    try:
+        return decoder(stream)
+    finally:
+        stream.seek(position)
+
+def frame_rms(mono, sample_rate, frame_ms=30):
+    """
+    RMS level of consecutive non-overlapping frames
+
+    Returns:
+        tuple: (rms array, frame length in samples)
+    """
+    frame = max(1, int(sample_rate * frame_ms / 1000))
+    count = len(mono) // frame
+    if count == 0:
+        return np.zeros(0, dtype=np.float32), frame
+    frames = mono[:count * frame].reshape(count, frame)
+    return np.sqrt(np.mean(frames * frames, axis=1)), frame
+
+def chunk_bounds(audio, max_seconds, min_silence_ms=500, frame_ms=30):
+    """
+    Split points that keep each chunk under max_seconds, cut in the quietest pause
+
+    Each cut is placed in the quietest min_silence_ms stretch of the second
+    half of the allowed window, so words are not split.
+
+    Returns:
+        list: (start_frame, end_frame) pairs covering the whole recording
+    """
+    limit = int(max_seconds * audio.sample_rate)
+    if audio.frames <= limit:
+        return [(0, audio.frames)]
+
+    rms, frame = frame_rms(audio.mono(), audio.sample_rate, frame_ms)
+    # Moving average over the pause length, via cumulative sums
+    window = max(1, int(min_silence_ms / frame_ms))
+    cumulative = np.concatenate(([0.0], np.cumsum(rms, dtype=np.float64)))
+    smoothed = (cumulative[window:] - cumulative[:-window]) / window
+
+    bounds = []
+    start = 0
+    while audio.frames - start > limit:
+        lo = (start + limit // 2) // frame
+        hi = max(lo + 1, min((start + limit) // frame - window, len(smoothed)))
+        quietest = lo + int(np.argmin(smoothed[lo:hi])) if lo < len(smoothed) else lo
+        cut = min((quietest + window // 2) * frame, start + limit)
+        if cut <= start:
+            cut = start + limit
+        bounds.append((start, cut))
+        start = cut
+    bounds.append((start, audio.frames))
+    return bounds
+
+def voiced_frames(rms, silence_dbfs=-45.0, margin_db=10.0):
+    """
+    Energy-based VAD over per-frame RMS levels
+
+    A frame is voiced when its RMS is margin_db above the noise floor (10th
+    percentile frame RMS) and above silence_dbfs.
+
+    Returns:
+        numpy.ndarray: bool per frame, True for speech
+    """
+    if len(rms) == 0:
+        return np.zeros(0, dtype=bool)
+    noise, loud = np.percentile(rms, (10, 95))
+    # Margin over the noise floor, but never above 20 dB under the loud frames (speech throughout)
+    threshold = max(10 ** (silence_dbfs / 20), min(noise * 10 ** (margin_db / 20), loud / 10))
+    return rms > threshold
+
+def _dbfs(level):
+    return round(float(20 * np.log10(max(float(level), 1e-10))), 1)
+
+def analyze_signal(audio, frame_ms=30, silence_dbfs=-45.0, min_noise_ms=300):
+    """
+    Level, clipping, silence and noise statistics of decoded audio
+
+    Everything is computed with vectorized frame statistics: a min/max pass
+    over the int16 samples (plus a clipping count only when the peak reaches
+    full scale) and one pass over the float32 mono mix for per-frame energy,
+    decimated to about 16 kHz for high sample rates.
+
+    snr_db compares the mean energy of the frames voiced_frames() marks as
+    speech with that of the remaining frames. It is None when either side has
+    too little audio for an estimate, e.g. speech (or a steady tone) with no
+    pause longer than min_noise_ms.
+
+    Args:
+        audio (PCMAudio): Decoded recording
+        frame_ms (int): Analysis frame length
+        silence_dbfs (float): Frames quieter than this count as silence
+        min_noise_ms (int): Non-speech audio needed to estimate the noise floor
+
+    Returns:
+        dict: duration, rms_dbfs, peak_dbfs, clipping_ratio, silence_ratio, snr_db
+    """
+    samples = audio.samples
+    total = samples.size
+    if total == 0:
+        return {
+            'duration': 0.0, 'rms_dbfs': -200.0, 'peak_dbfs': -200.0,
+            'clipping_ratio': 0.0, 'silence_ratio': 1.0, 'snr_db': None
+        }
+
+    peak = max(int(samples.max()), -int(samples.min()))
+    # Samples at (or within 0.2% of) full scale in any channel; only scanned when the peak gets there
+    clipped = np.count_nonzero((samples > 32700) | (samples < -32700)) if peak > 32700 else 0
+
+    # Frame energy only needs speech bandwidth: measure on a strided view near 16 kHz
+    step = max(1, audio.sample_rate // WHISPER_SAMPLE_RATE)
+    analysed = PCMAudio(samples[::step], audio.sample_rate / step) if step > 1 else audio
+    mono = analysed.mono()
+    frame = max(1, int(analysed.sample_rate * frame_ms / 1000))
+    count = max(1, len(mono) // frame)
+    frames = mono[:count * frame].reshape(count, -1)
+    energy = np.einsum('ij,ij->i', frames, frames) / frames.shape[1]
+    rms = np.sqrt(energy)
+
+    overall_rms = float(np.sqrt(energy.mean()))
+    silent = rms < 10 ** (silence_dbfs / 20)
+    # Speech level vs noise floor, measured in the pauses the VAD finds
+    voiced = voiced_frames(rms, silence_dbfs)
+    needed = max(1, int(min_noise_ms / frame_ms))
+    snr_db = None
+    if needed <= np.count_nonzero(voiced) and needed <= np.count_nonzero(~voiced):
+        speech, noise = energy[voiced].mean(), energy[~voiced].mean()
+        snr_db = round(float(10 * np.log10(max(speech, 1e-20) / max(noise, 1e-20))), 1)
+
+    return {
+        'duration': round(audio.duration, 3),
+        'rms_dbfs': _dbfs(overall_rms),
+        'peak_dbfs': _dbfs(peak / 32768.0),
+        'clipping_ratio': round(clipped / total, 5),
+        'silence_ratio': round(float(np.count_nonzero(silent)) / len(rms), 4),
+        'snr_db': snr_db,
+    }
+
+def to_whisper_format(audio):
+    """
+    Downmix to mono and resample to 16 kHz, Whisper's native input
+
+    Downsampling averages groups of samples for integer ratios, otherwise
+    applies a moving-average low-pass the width of the ratio followed by
+    linear interpolation; speech has little energy above the 8 kHz the
+    result can represent.
+
+    Returns:
+        PCMAudio: int16 mono at WHISPER_SAMPLE_RATE
+    """
+    mono = audio.mono()
+    if audio.sample_rate % WHISPER_SAMPLE_RATE == 0 and audio.sample_rate > WHISPER_SAMPLE_RATE:
+        # Integer ratio (32/48 kHz): average each group of samples
+        ratio = audio.sample_rate // WHISPER_SAMPLE_RATE
+        count = len(mono) // ratio
+        mono = mono[:count * ratio].reshape(count, ratio).mean(axis=1)
+    elif audio.sample_rate != WHISPER_SAMPLE_RATE and len(mono):
+        ratio = audio.sample_rate / WHISPER_SAMPLE_RATE
+        width = int(round(ratio))
+        offset = 0.0
+        if width > 1 and len(mono) > width:
+            cumulative = np.concatenate(([0.0], np.cumsum(mono, dtype=np.float64)))
+            mono = ((cumulative[width:] - cumulative[:-width]) / width).astype(np.float32)
+            offset = (width - 1) / 2  # the average is centred between samples
+        count = int(audio.frames / ratio)
+        positions = np.arange(count, dtype=np.float64) * ratio - offset
+        mono = np.interp(positions, np.arange(len(mono), dtype=np.float64), mono).astype(np.float32)
+    samples = np.clip(mono * 32768.0, -32768, 32767).astype(np.int16)
+    return PCMAudio(samples, WHISPER_SAMPLE_RATE)
+
+class SilenceTrim:
+    """Result of trim_silence: the shortened audio and where each kept frame came from"""
+
+    def __init__(self, audio, kept_starts, frame, source_duration):
+        self.audio = audio
+        self.kept_starts = kept_starts  # source sample index of each kept frame
+        self.frame = frame
+        self.source_duration = source_duration
+
+    @property
+    def seconds_removed(self):
+        return max(0.0, self.source_duration - self.audio.duration)
+
+    def source_time(self, seconds):
+        """Map a time in the trimmed audio back to the original recording"""
+        if len(self.kept_starts) == 0:
+            return 0.0
+        position = seconds * self.audio.sample_rate
+        index = min(max(int(position // self.frame), 0), len(self.kept_starts) - 1)
+        source = self.kept_starts[index] + position - index * self.frame
+        return min(source / self.audio.sample_rate, self.source_duration)
+
+def trim_silence(audio, pad_ms=250, frame_ms=30, silence_dbfs=-45.0, margin_db=10.0):
+    """
+    Energy-based VAD: drop leading/trailing silence and shorten long pauses
+
+    Frames are classified by voiced_frames(); voiced frames are dilated
+    by pad_ms on each side, so pauses up to 2 * pad_ms survive intact and
+    longer ones are cut down to that length.
+
+    Args:
+        audio (PCMAudio): Mono recording, normally from to_whisper_format()
+        pad_ms (int): Silence kept either side of speech
+
+    Returns:
+        SilenceTrim: Trimmed audio and the mapping back to source time
+    """
+    frame = max(1, int(audio.sample_rate * frame_ms / 1000))
+    samples = audio.samples[:, 0] if audio.channels == 1 else to_whisper_format(audio).samples[:, 0]
+    count = -(-len(samples) // frame)
+    if count == 0:
+        return SilenceTrim(audio, np.zeros(0, dtype=np.int64), frame, 0.0)
+
+    padded = np.zeros(count * frame, dtype=np.float32)
+    padded[:len(samples)] = samples
+    frames = padded.reshape(count, frame) * (1.0 / 32768.0)
+    rms = np.sqrt(np.einsum('ij,ij->i', frames, frames) / frame)
+
+    voiced = voiced_frames(rms, silence_dbfs, margin_db).astype(np.int32)
+
+    # Dilate by pad frames with a moving sum
+    pad = max(0, int(round(pad_ms / frame_ms)))
+    cumulative = np.concatenate(([0], np.cumsum(voiced)))
+    low = np.clip(np.arange(count) - pad, 0, count)
+    high = np.clip(np.arange(count) + pad + 1, 0, count)
+    keep = cumulative[high] > cumulative[low]
+
+    kept_frames = np.flatnonzero(keep)
+    mask = np.repeat(keep, frame)[:len(samples)]
+    trimmed = PCMAudio(samples[mask], audio.sample_rate)
+    return SilenceTrim(trimmed, kept_frames * frame, frame, audio.duration)
@@ -0,0 +1,76 @@
+"""
+Identity Cache for TradesMate
+Caches the authenticated user's profile across requests so the auth hot
+path only queries the users table on a miss
+"""
+
+import os
+from sqlalchemy import event
+from sqlalchemy.orm import Session, object_session
+try:
+    from ..cache import TTLCache
+    from .. import metrics
+    from ..database import db
+    from ..models.user import User
+except ImportError:
+    from cache import TTLCache
+    import metrics
+    from database import db
+    from models.user import User
+
+# Entries are per worker; the TTL bounds how long another worker can serve
+# a profile after it changed elsewhere.
+identity_cache = TTLCache(
+    maxsize=int(os.getenv('IDENTITY_CACHE_SIZE', 10000)),
+    ttl=float(os.getenv('IDENTITY_CACHE_TTL', 60))
+)
+metrics.register('identity_cache', identity_cache.stats)
+
+def load_identity(user_id):
+    """
+    Get a user's profile dict (User.to_dict()) from cache or the database
+
+    Args:
+        user_id (int): User primary key
+
+    Returns:
+        dict: Profile data, or None if the user does not exist
+    """
+    identity = identity_cache.get(user_id)
+    if identity is None:
+        user = db.session.get(User, user_id)
+        if user is None:
+            return None
+        identity = remember_user(user)
+    return identity
+
+def remember_user(user):
+    """Cache a freshly loaded or updated User and return its profile dict"""
+    identity = user.to_dict()
+    identity_cache.set(user.id, identity)
+    return identity
+
+def invalidate_identity(user_id):
+    """Drop a user's cached profile, e.g. after a profile change or deactivation"""
+    identity_cache.invalidate(user_id)
+
+@event.listens_for(User, 'after_update')
+@event.listens_for(User, 'after_delete')
+def _invalidate_on_change(mapper, connection, target):
+    """Any ORM write to a user (deactivation included) invalidates this worker's entry once committed"""
+    session = object_session(target)
+    if session is None:
+        invalidate_identity(target.id)
+    else:
+        session.info.setdefault('changed_user_ids', set()).add(target.id)
+
+@event.listens_for(Session, 'after_commit')
+def _invalidate_committed(session):
+    """Invalidate after commit, so a request racing the flush cannot re-cache the old row"""
+    for user_id in session.info.pop('changed_user_ids', ()):
+        invalidate_identity(user_id)
+
+@event.listens_for(Session, 'after_rollback')
+def _forget_rolled_back(session):
+    """Rolled-back writes leave the cached profile as it was"""
+    session.info.pop('changed_user_ids', None)
@@ -0,0 +1,383 @@
+"""
+Image Processing for TradesMate
+Decoding, orientation, downscaling, adaptive thresholding and deskew used
+to prepare photos of handwritten notes for OCR, plus the OCR engine registry
+"""
+
+import io
+import math
+import os
+import shutil
+import struct
+import subprocess
+import time
+try:
+    import numpy as np
+except ImportError:  # OCR preprocessing is unavailable without NumPy
+    np = None
+try:
+    from PIL import Image
+except ImportError:  # BMP and PNM are still decoded natively
+    Image = None
+
+# EXIF orientation tag and the array operation that undoes each value
+EXIF_ORIENTATION = 0x0112
+_ORIENT = {
+    2: lambda a: a[:, ::-1],
+    3: lambda a: a[::-1, ::-1],
+    4: lambda a: a[::-1],
+    5: lambda a: a.swapaxes(0, 1),
+    6: lambda a: np.rot90(a, -1),
+    7: lambda a: a[::-1, ::-1].swapaxes(0, 1),
+    8: lambda a: np.rot90(a, 1),
+}
+
+class ImageDecodeError(Exception):
+    """Raised when a photo cannot be decoded"""
+
+def decode_pil(data, max_side=None):
+    """
+    Decode any format Pillow reads, as grayscale
+
+    JPEGs are decoded at reduced DCT scale when that still leaves at least
+    max_side pixels on the long edge, which is far cheaper than decoding
+    full size and downscaling.
+
+    Returns:
+        tuple: (uint8 array (height, width), EXIF orientation)
+    """
+    try:
+        image = Image.open(io.BytesIO(data))
+        orientation = image.getexif().get(EXIF_ORIENTATION, 1)
+        if max_side and max(image.size) > max_side:
+            scale = max_side / max(image.size)
+            image.draft('L', (math.ceil(image.size[0] * scale), math.ceil(image.size[1] * scale)))
+        return np.asarray(image.convert('L')), orientation
+    except (OSError, ValueError, Image.DecompressionBombError) as e:
+        raise ImageDecodeError(f'Invalid image: {e}')
+
+def decode_bmp(data, max_side=None):
+    """Decode uncompressed 8/24/32-bit BMP"""
+    if data[:2] != b'BM' or len(data) < 54:
+        raise ImageDecodeError('Invalid BMP file')
+    offset, header_size, width, height, _, bits, compression = struct.unpack_from('<I I i i H H I', data, 10)
+    if compression not in (0, 3) or bits not in (8, 24, 32):
+        raise ImageDecodeError(f'Unsupported BMP: {bits}-bit, compression {compression}')
+    rows, top_down = abs(height), height < 0
+    stride = (bits * width + 31) // 32 * 4
+    if len(data) < offset + stride * rows:
+        raise ImageDecodeError('Truncated BMP file')
+
+    pixels = np.frombuffer(data, dtype=np.uint8, count=stride * rows, offset=offset).reshape(rows, stride)
+    if bits == 8:
+        palette = np.frombuffer(data, dtype=np.uint8, count=1024, offset=14 + header_size).reshape(256, 4)
+        image = palette[pixels[:, :width]][:, :, 2::-1]  # BGRA palette -> RGB
+    else:
+        channels = bits // 8
+        image = pixels[:, :width * channels].reshape(rows, width, channels)[:, :, 2::-1]  # BGR(A) -> RGB
+    return (image if top_down else image[::-1]), 1
+
+def decode_pnm(data, max_side=None):
+    """Decode binary PGM (P5) and PPM (P6) with 8-bit samples"""
+    if data[:2] not in (b'P5', b'P6'):
+        raise ImageDecodeError('Only binary PGM/PPM is supported')
+    tokens = []
+    position = 2
+    while len(tokens) < 3:
+        while position < len(data) and data[position:position + 1].isspace():
+            position += 1
+        if data[position:position + 1] == b'#':
+            position = data.index(b'\n', position)
+            continue
+        start = position
+        while position < len(data) and not data[position:position + 1].isspace():
+            position += 1
+        tokens.append(int(data[start:position]))
+    width, height, maxval = tokens
+    if maxval > 255:
+        raise ImageDecodeError('Only 8-bit PGM/PPM is supported')
+    channels = 3 if data[:2] == b'P6' else 1
+    pixels = np.frombuffer(data, dtype=np.uint8, count=width * height * channels, offset=position + 1)
+    return pixels.reshape(height, width, channels).squeeze(axis=2) if channels == 1 else pixels.reshape(height, width, 3), 1
+
+def encode_pgm(image):
+    """uint8 grayscale array as binary PGM, which tesseract reads from stdin"""
+    return b'P5\n%d %d\n255\n' % (image.shape[1], image.shape[0]) + np.ascontiguousarray(image).tobytes()
+
+# extension -> decoder(data, max_side) -> (array, orientation)
+_decoders = {'bmp': decode_bmp, 'pgm': decode_pnm, 'ppm': decode_pnm, 'pnm': decode_pnm}
+if Image is not None:
+    for _extension in ('jpg', 'jpeg', 'png', 'gif', 'bmp', 'tif', 'tiff', 'webp'):
+        _decoders[_extension] = decode_pil
+
+def register_decoder(extensions, decoder):
+    """
+    Register an image decoder for extra formats
+
+    Args:
+        extensions (iterable): File extensions without the dot
+        decoder (callable): Module-level function taking (bytes, max_side)
+            and returning (uint8 array, EXIF orientation); like OCR engines,
+            it is pickled by reference into the OCR worker processes
+    """
+    for extension in extensions:
+        _decoders[extension.lower()] = decoder
+
+def get_decoder(filename):
+    """Decoder registered for the file's extension, or None when there is none (or no NumPy)"""
+    extension = filename.rsplit('.', 1)[-1].lower() if filename and '.' in filename else ''
+    return _decoders.get(extension) if np is not None else None
+
+def can_decode(filename):
+    """True when NumPy is available and a decoder is registered for the file's extension"""
+    return get_decoder(filename) is not None
+
+def to_grayscale(image):
+    """uint8 luma (ITU-R BT.601) of an RGB(A) or grayscale array"""
+    if image.ndim == 2:
+        return image
+    # Fixed-point weights (77, 150, 29) / 256 avoid a float copy of the whole image
+    luma = image[:, :, 0].astype(np.uint16) * 77
+    luma += image[:, :, 1].astype(np.uint16) * 150
+    luma += image[:, :, 2].astype(np.uint16) * 29
+    return (luma >> 8).astype(np.uint8)
+
+def downscale(image, max_side):
+    """Area-average a grayscale image by the smallest integer factor that brings the long side within max_side"""
+    factor = math.ceil(max(image.shape[:2]) / max_side) if max_side else 1
+    if factor <= 1:
+        return image
+    height, width = image.shape[0] // factor, image.shape[1] // factor
+    # Summing strided views is an order of magnitude faster than a reduction over reshaped blocks
+    total = np.zeros((height, width), dtype=np.uint16 if factor <= 16 else np.uint32)
+    for dy in range(factor):
+        for dx in range(factor):
+            total += image[dy:height * factor:factor, dx:width * factor:factor]
+    return (total // (factor * factor)).astype(np.uint8)
+
+def _box_mean(values, radius):
+    """Mean over a (2 * radius + 1)^2 window clipped at the edges, via separable running sums"""
+    for axis in (0, 1):
+        length = values.shape[axis]
+        running = np.zeros_like(values, shape=tuple(n + (i == axis) for i, n in enumerate(values.shape)))
+        np.cumsum(values, axis=axis, out=running[1:] if axis == 0 else running[:, 1:])
+        high = np.minimum(np.arange(length) + radius + 1, length)
+        low = np.maximum(np.arange(length) - radius, 0)
+        values = (running.take(high, axis=axis) - running.take(low, axis=axis)) / np.expand_dims(
+            (high - low).astype(np.float64), 1 - axis)
+    return values
+
+def adaptive_threshold(gray, window=None, k=0.2, dynamic_range=128.0):
+    """
+    Sauvola binarization: ink where a pixel is darker than its neighbourhood's threshold
+
+    The local mean and standard deviation come from running sums, so the
+    cost is independent of the window size. They vary slowly at that scale,
+    so for large windows they are computed on a grid of small blocks and the
+    threshold is expanded back to full resolution. Copes with shadows and
+    uneven lighting across a phone photo.
+
+    Args:
+        gray (ndarray): uint8 grayscale image
+        window (int): Neighbourhood side in pixels (default: 1/16 of the short side)
+
+    Returns:
+        ndarray: uint8 image, text 0 on a 255 background
+    """
+    height, width = gray.shape
+    if window is None:
+        window = max(15, min(height, width) // 16)
+    step = max(1, window // 16)
+
+    # Block means of the values and their squares (edge-padded to whole blocks)
+    padded = np.pad(gray, ((0, -height % step), (0, -width % step)), mode='edge').astype(np.float32)
+    rows, cols = padded.shape[0] // step, padded.shape[1] // step
+    blocks = padded.reshape(rows, step, cols, step)
+    values = blocks.mean(axis=(1, 3), dtype=np.float64)
+    squares = np.einsum('ijkl,ijkl->ik', blocks, blocks, dtype=np.float64) / (step * step)
+
+    radius = max(1, window // (2 * step))
+    mean = _box_mean(values, radius)
+    std = np.sqrt(np.maximum(_box_mean(squares, radius) - mean * mean, 0))
+    threshold = (mean * (1 + k * (std / dynamic_range - 1))).astype(np.float32)
+    if step > 1:
+        threshold = threshold.repeat(step, axis=0).repeat(step, axis=1)[:height, :width]
+    return np.where(gray < threshold, 0, 255).astype(np.uint8)
+
+def _projection_score(ys, xs, angle):
+    """Sharpness of the row histogram of ink points rotated by angle (degrees)"""
+    radians = math.radians(angle)
+    rows = np.round(ys * math.cos(radians) - xs * math.sin(radians)).astype(np.int64)
+    counts = np.bincount(rows - rows.min())
+    return float(np.dot(counts, counts))
+
+def estimate_skew(binary, max_angle=15.0, max_points=60000):
+    """
+    Text skew in degrees by projection profile: the rotation that makes ink rows sharpest
+
+    A coarse 1-degree search is refined in 0.1-degree steps, on a random
+    sample of ink pixels.
+    """
+    ys, xs = np.nonzero(binary == 0)
+    if len(ys) < 50:
+        return 0.0
+    if len(ys) > max_points:
+        pick = np.random.default_rng(0).choice(len(ys), max_points, replace=False)
+        ys, xs = ys[pick], xs[pick]
+    ys = ys.astype(np.float64)
+    xs = xs.astype(np.float64)
+
+    coarse = np.arange(-max_angle, max_angle + 0.5, 1.0)
+    best = coarse[int(np.argmax([_projection_score(ys, xs, angle) for angle in coarse]))]
+    fine = np.arange(best - 1.0, best + 1.05, 0.1)
+    return round(float(fine[int(np.argmax([_projection_score(ys, xs, angle) for angle in fine]))]), 2)
+
+def rotate(binary, angle):
+    """Undo a skew found by estimate_skew: rotate about the centre (nearest neighbour, white fill)"""
+    height, width = binary.shape
+    radians = math.radians(angle)
+    cos, sin = math.cos(radians), math.sin(radians)
+    cy, cx = (height - 1) / 2, (width - 1) / 2
+    y = np.arange(height, dtype=np.float32)[:, None] - cy
+    x = np.arange(width, dtype=np.float32)[None, :] - cx
+    # Inverse map: each output pixel samples the source pixel it came from. Coordinates are
+    # shifted onto a one-pixel white border, and anything outside the page clips onto it
+    padded = np.pad(binary, 1, constant_values=255)
+    source_y = (y * cos + (cy + 1.5)) + x * sin
+    np.clip(source_y, 0, height + 1, out=source_y)
+    source_x = (x * cos + (cx + 1.5)) - y * sin
+    np.clip(source_x, 0, width + 1, out=source_x)
+    index = source_y.astype(np.int32)
+    index *= width + 2
+    index += source_x.astype(np.int32)
+    return padded.ravel().take(index)
+
+def tesseract_engine(image):
+    """
+    OCR with the tesseract CLI, treating the image as one block of text
+
+    Returns:
+        tuple: (text, mean word confidence 0-1)
+    """
+    process = subprocess.run(
+        [shutil.which('tesseract') or 'tesseract', 'stdin', 'stdout',
+         '--psm', os.getenv('OCR_TESSERACT_PSM', '6'), '-l', os.getenv('OCR_LANGUAGE', 'eng'), 'tsv'],
+        input=encode_pgm(image),
+        capture_output=True,
+        timeout=float(os.getenv('OCR_TIMEOUT', 60))
+    )
+    if process.returncode != 0:
+        raise RuntimeError(f'tesseract failed: {process.stderr.decode(errors="replace")[:200]}')
+
+    lines = {}
+    confidences = []
+    for row in process.stdout.decode('utf-8', errors='replace').splitlines()[1:]:
+        fields = row.split('\t')
+        if len(fields) < 12 or not fields[11].strip():
+            continue
+        confidence = float(fields[10])
+        if confidence < 0:
+            continue
+        lines.setdefault(tuple(fields[1:5]), []).append(fields[11].strip())
+        confidences.append(confidence)
+    text = '\n'.join(' '.join(words) for _, words in sorted(lines.items(), key=lambda item: tuple(map(int, item[0]))))
+    return text, round(sum(confidences) / len(confidences) / 100, 3) if confidences else 0.0
+
+# name -> engine(binary uint8 array) -> (text, confidence)
+_ocr_engines = {}
+if shutil.which('tesseract'):
+    _ocr_engines['tesseract'] = tesseract_engine
+
+def register_ocr_engine(name, engine):
+    """
+    Register an OCR engine
+
+    Args:
+        name (str): Value for OCR_ENGINE
+        engine (callable): Module-level function taking a binarized uint8
+            image (text 0 on 255) and returning (text, confidence 0-1); it
+            is pickled by reference into the OCR worker processes
+    """
+    _ocr_engines[name.lower()] = engine
+
+def get_ocr_engine(name=None):
+    """(name, engine) for OCR_ENGINE or the first registered engine, or None when there is none"""
+    name = (name or os.getenv('OCR_ENGINE', '')).lower()
+    if name:
+        return (name, _ocr_engines[name]) if name in _ocr_engines else None
+    return next(iter(_ocr_engines.items()), None)
+
+def prepare_image(data, filename, max_side=2000, decoder=None):
+    """
+    Decode, orient, convert to grayscale, downscale, binarize and deskew a photo
+
+    Args:
+        decoder (callable): Decoder to use; looked up from filename when None
+
+    Returns:
+        tuple: (binary uint8 image, info dict with skew_angle, sizes and
+        per-stage timings in ms)
+
+    Raises:
+        ImageDecodeError: No decoder for the format, or the data is invalid
+    """
+    decoder = decoder or get_decoder(filename)
+    if decoder is None:
+        raise ImageDecodeError(f'No decoder available for {filename}')
+    timings = {}
+    clock = time.perf_counter()
+
+    def lap(stage):
+        nonlocal clock
+        now = time.perf_counter()
+        timings[stage] = round((now - clock) * 1000, 2)
+        clock = now
+
+    try:
+        image, orientation = decoder(data, max_side)
+    except (ValueError, IndexError, struct.error) as e:  # malformed headers or truncated pixel data
+        raise ImageDecodeError(f'Invalid image: {e}')
+    original_size = [int(image.shape[1]), int(image.shape[0])]
+    lap('decode')
+    image = _ORIENT.get(orientation, lambda a: a)(image)
+    lap('orient')
+    image = to_grayscale(image)
+    lap('grayscale')
+    image = downscale(image, max_side)
+    lap('downscale')
+    binary = adaptive_threshold(image)
+    lap('threshold')
+    angle = estimate_skew(binary)
+    if abs(angle) >= 0.2:
+        binary = rotate(binary, angle)
+    lap('deskew')
+
+    return binary, {
+        'skew_angle': angle,
+        'orientation': orientation,
+        'original_size': original_size,
+        'processed_size': [int(binary.shape[1]), int(binary.shape[0])],
+        'timings_ms': timings,
+    }
+
+def run_ocr_pipeline(data, filename, engine, max_side=2000, decoder=None):
+    """
+    Full OCR pipeline; runs in an OCR worker process
+
+    Args:
+        data (bytes): Encoded image
+        filename (str): Name used to pick the decoder
+        engine (callable): OCR engine from get_ocr_engine()
+        max_side (int): Long-side bound for the working image
+        decoder (callable): Decoder from get_decoder(), so formats registered
+            after the workers started still decode there
+
+    Returns:
+        dict: text, confidence, skew_angle, sizes and timings_ms per stage
+    """
+    binary, info = prepare_image(data, filename, max_side, decoder)
+    started = time.perf_counter()
+    text, confidence = engine(binary)
+    info['timings_ms']['ocr'] = round((time.perf_counter() - started) * 1000, 2)
+    info.update({'text': text.strip(), 'confidence': confidence})
+    return info
@@ -0,0 +1,286 @@
+"""
+LLM JSON helpers for TradesMate
+Incremental parsing of the JSON objects GPT-4 returns, so fields can be used
+while the completion is still streaming
+"""
+
+import json
+import re
+
+_decoder = json.JSONDecoder()
+_WHITESPACE = ' \t\r\n'
+# Characters that matter inside an object / inside a string
+_OBJECT_SPECIALS = re.compile(r'[{}"]')
+# Rest of a JSON string up to and including its closing quote
+_STRING_TAIL = re.compile(r'(?:[^"\\]|\\.)*"', re.DOTALL)
+# An opening brace that starts a real JSON object rather than prose
+_OBJECT_START = re.compile(r'\{\s*"')
+
+
+class JSONObjectScanner:
+    """
+    Incremental balanced-brace scanner for JSON objects embedded in LLM text
+
+    Braces inside JSON strings are ignored, and prose such as "{this}" that
+    balances but does not decode is skipped, so trailing or leading text with
+    braces cannot swallow the real object the way a greedy regex does.
+
+    Usage:
+        scanner = JSONObjectScanner()
+        for chunk in stream:
+            obj = scanner.feed(chunk)
+            if obj is not None:
+                break
+    """
+
+    def __init__(self):
+        self.buffer = ''
+        self.pos = 0
+        self.start = -1
+        self.depth = 0
+        self.in_string = False
+
+    def feed(self, text):
+        """
+        Add text and return the first complete, decodable object, or None
+
+        Args:
+            text (str): Next chunk of the completion
+
+        Returns:
+            dict: Decoded object once its closing brace has arrived
+        """
+        self.buffer += text
+        buffer = self.buffer
+        while True:
+            if self.start < 0:
+                # Between objects only an opening brace matters
+                self.start = buffer.find('{', self.pos)
+                if self.start < 0:
+                    self.pos = len(buffer)
+                    return None
+                self.pos = self.start + 1
+                self.depth = 1
+                self.in_string = False
+
+            if self.in_string:
+                match = _STRING_TAIL.match(buffer, self.pos)
+                if match is None:
+                    # Closing quote not here yet
+                    return None
+                self.pos = match.end()
+                self.in_string = False
+                continue
+
+            match = _OBJECT_SPECIALS.search(buffer, self.pos)
+            if match is None:
+                self.pos = len(buffer)
+                return None
+            char = match.group()
+            self.pos = match.end()
+
+            if char == '"':
+                self.in_string = True
+            elif char == '{':
+                self.depth += 1
+            else:
+                self.depth -= 1
+                if self.depth == 0:
+                    candidate = buffer[self.start:self.pos]
+                    try:
+                        value = json.loads(candidate)
+                    except ValueError:
+                        value = None
+                    if isinstance(value, dict):
+                        self.start = -1
+                        return value
+                    # Balanced but not JSON (prose braces); retry from the next brace inside it
+                    self.pos = self.start + 1
+                    self.start = -1
+
+    def abandon_start(self):
+        """
+        Give up on an unclosed prose brace and rescan after it
+
+        An unclosed candidate that starts like a JSON object is a truncated
+        reply; its nested objects (materials lines) are not the answer.
+
+        Returns:
+            bool: False when there is nothing to rescan
+        """
+        if self.start < 0 or _OBJECT_START.match(self.buffer, self.start):
+            return False
+        self.pos = self.start + 1
+        self.start = -1
+        return True
+
+
+def extract_json_object(text):
+    """
+    Find the first decodable JSON object in LLM output
+
+    Args:
+        text (str): Completion text, possibly with prose or code fences
+
+    Returns:
+        dict: The decoded object
+
+    Raises:
+        json.JSONDecodeError: If the text contains no complete JSON object
+    """
+    # Fast path: the reply usually starts its JSON at the first brace
+    start = text.find('{')
+    if start >= 0:
+        try:
+            value, _ = _decoder.raw_decode(text, start)
+        except ValueError:
+            value = None
+        if isinstance(value, dict):
+            return value
+
+    scanner = JSONObjectScanner()
+    value = scanner.feed(text)
+    # An unclosed prose brace before the object leaves the scanner mid-candidate
+    while value is None and scanner.abandon_start():
+        value = scanner.feed('')
+    if value is None:
+        raise json.JSONDecodeError('No complete JSON object found', text, 0)
+    return value
+
+
+class IncrementalFieldParser:
+    """
+    Emit top-level fields of a streamed JSON object as soon as each is complete
+
+    Text before the opening brace (prose, code fences) is skipped. Elements of
+    the `itemized` array fields are emitted one by one as they complete.
+
+    Usage:
+        parser = IncrementalFieldParser(itemized=('materials',))
+        for chunk in stream:
+            for kind, payload in parser.feed(chunk):
+                ...
+    """
+
+    def __init__(self, itemized=()):
+        self.itemized = frozenset(itemized)
+        self.buffer = ''
+        self.pos = 0
+        self.state = 'seek_object'
+        self.key = None
+        self.index = 0
+        self.fields = {}
+
+    @property
+    def done(self):
+        """True once the closing brace of the object has been seen"""
+        return self.state == 'done'
+
+    def feed(self, text):
+        """
+        Add streamed text and return newly completed fields
+
+        Args:
+            text (str): Next chunk of the completion
+
+        Returns:
+            list: ('field', {'name', 'value'}) and ('item', {'name', 'index', 'value'}) events
+        """
+        self.buffer += text
+        events = []
+        while self.state != 'done' and self._step(events):
+            pass
+        return events
+
+    def _skip(self, chars):
+        while self.pos < len(self.buffer) and self.buffer[self.pos] in chars:
+            self.pos += 1
+        return self.buffer[self.pos] if self.pos < len(self.buffer) else None
+
+    def _decode(self, followers=',}]'):
+        """
+        Decode the value at pos once it is provably complete
+
+        A value only counts as complete once the delimiter after it has
+        arrived, so '12' or '3.' are not emitted before '12.5,' does.
+        """
+        try:
+            value, end = _decoder.raw_decode(self.buffer, self.pos)
+        except ValueError:
+            return False, None
+        follow = end
+        while follow < len(self.buffer) and self.buffer[follow] in _WHITESPACE:
+            follow += 1
+        if follow >= len(self.buffer) or self.buffer[follow] not in followers:
+            return False, None
+        self.pos = end
+        return True, value
+
+    def _step(self, events):
+        """Advance one token; returns False when more input is needed"""
+        if self.state == 'seek_object':
+            start = self.buffer.find('{', self.pos)
+            if start < 0:
+                self.pos = len(self.buffer)
+                return False
+            self.pos = start + 1
+            self.state = 'seek_key'
+            return True
+
+        if self.state == 'seek_key':
+            char = self._skip(_WHITESPACE + ',')
+            if char is None:
+                return False
+            if char == '}':
+                self.pos += 1
+                self.state = 'done'
+                return True
+            if char != '"':
+                # Malformed; stop emitting and leave it to the final parse
+                self.state = 'done'
+                return True
+            complete, key = self._decode(followers=':')
+            if not complete:
+                return False
+            self._skip(_WHITESPACE)
+            self.pos += 1
+            self.key = key
+            self.state = 'value'
+            return True
+
+        if self.state == 'value':
+            char = self._skip(_WHITESPACE)
+            if char is None:
+                return False
+            if char == '[' and self.key in self.itemized:
+                self.pos += 1
+                self.index = 0
+                self.fields[self.key] = []
+                self.state = 'items'
+                return True
+            complete, value = self._decode()
+            if not complete:
+                return False
+            self.fields[self.key] = value
+            events.append(('field', {'name': self.key, 'value': value}))
+            self.state = 'seek_key'
+            return True
+
+        if self.state == 'items':
+            char = self._skip(_WHITESPACE + ',')
+            if char is None:
+                return False
+            if char == ']':
+                self.pos += 1
+                events.append(('field', {'name': self.key, 'value': self.fields[self.key]}))
+                self.state = 'seek_key'
+                return True
+            complete, value = self._decode()
+            if not complete:
+                return False
+            self.fields[self.key].append(value)
+            events.append(('item', {'name': self.key, 'index': self.index, 'value': value}))
+            self.index += 1
+            return True
+
+        return False
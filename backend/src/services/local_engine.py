@@ -0,0 +1,293 @@
+"""
+Local AI Engine for TradesMate
+Deterministic stand-in for Whisper and GPT-4 with the same client surface
+(client.audio.transcriptions.create / client.chat.completions.create), so
+the full voice -> quote pipeline, including resilience, caching and
+parsing, can be load-tested offline with realistic latency and failures
+"""
+
+import hashlib
+import json
+import os
+import random
+import re
+import threading
+import time
+import wave
+from types import SimpleNamespace
+import httpx
+import openai
+
+# Latency model per call: base + per-unit cost, scaled by a lognormal jitter.
+# Errors are injected at error_rate, as a mix of 429, 5xx and timeouts.
+PROFILES = {
+    'instant': {
+        'transcribe_base_ms': 0, 'transcribe_ms_per_second': 0,
+        'chat_first_token_ms': 0, 'chat_ms_per_token': 0,
+        'jitter': 0.0, 'error_rate': 0.0,
+    },
+    # Roughly what the OpenAI API does on a good day
+    'realistic': {
+        'transcribe_base_ms': 600, 'transcribe_ms_per_second': 50,
+        'chat_first_token_ms': 800, 'chat_ms_per_token': 25,
+        'jitter': 0.3, 'error_rate': 0.01,
+    },
+    'degraded': {
+        'transcribe_base_ms': 2000, 'transcribe_ms_per_second': 150,
+        'chat_first_token_ms': 3000, 'chat_ms_per_token': 60,
+        'jitter': 0.6, 'error_rate': 0.15,
+    },
+    'outage': {
+        'transcribe_base_ms': 200, 'transcribe_ms_per_second': 0,
+        'chat_first_token_ms': 200, 'chat_ms_per_token': 0,
+        'jitter': 0.0, 'error_rate': 1.0,
+    },
+}
+
+# (weight, kind) of injected failures
+_ERRORS = ((4, 'rate_limit'), (3, 'server_error'), (2, 'unavailable'), (1, 'timeout'))
+
+# Transcripts returned for audio, chosen by the audio's hash
+TRANSCRIPTS = (
+    "Quote for Mrs Patel at 14 Elm Road. Replace six double sockets in the kitchen and add a fused spur "
+    "for the extractor. Probably a day's work, materials about a hundred and twenty pounds.",
+    "Job for Mr Hughes, bathroom extractor fan not working, needs replacing with a humidistat fan. "
+    "Two hours or so, fan is around sixty pounds.",
+    "Emergency call for Sarah Collins, 07700 900123. Consumer unit tripping, no power upstairs. "
+    "Needs a new RCBO board, about six hours, board and breakers around three hundred pounds.",
+    "Quote for Dave at the flats on Mill Lane. Fit four outside lights with PIR sensors and a new "
+    "outdoor socket. Half a day, lights about forty pounds each.",
+    "For Mrs Green, leaking tap in the kitchen and the toilet cistern keeps running. Replace the tap "
+    "cartridge and the fill valve, an hour and a half, parts about thirty five pounds.",
+    "Job for Tom Baker, 22 High Street. Rewire the garage with a new sub-board, four sockets and two "
+    "LED battens. Two days, materials about four hundred and fifty pounds, not urgent.",
+)
+
+# (keywords, job_type, hours range, materials), most specific first
+_JOBS = (
+    (('rewire', 'sub-board'), 'Electrical', (12, 16), [('Sub-board', 1, 95.0), ('Double socket', 4, 8.5), ('LED batten', 2, 24.0)]),
+    (('consumer unit', 'rcbo', 'tripping'), 'Emergency', (5, 7), [('RCBO consumer unit', 1, 185.0), ('RCBO', 8, 17.5)]),
+    (('tap', 'cistern', 'toilet', 'leak'), 'Plumbing', (1, 2), [('Tap cartridge', 1, 18.0), ('Fill valve', 1, 16.5)]),
+    (('outside light', 'pir'), 'Electrical', (3, 5), [('PIR outdoor light', 4, 39.0), ('Outdoor socket IP66', 1, 22.0)]),
+    (('kitchen', 'socket'), 'Kitchen', (4, 8), [('Double socket', 6, 8.5), ('Fused spur', 1, 12.0), ('2.5mm T&E cable (m)', 20, 1.1)]),
+    (('bathroom', 'extractor', 'fan'), 'Bathroom', (2, 4), [('Humidistat extractor fan', 1, 62.0), ('Ducting kit', 1, 14.5)]),
+)
+
+
+class LocalEngine:
+    """
+    OpenAI-compatible client that answers locally
+
+    Outputs depend only on the input (same audio -> same transcript, same
+    transcript -> same quote). Latency and injected failures are drawn from
+    a generator seeded by the input and how many times it has been seen, so
+    a given sequence of calls always behaves the same way, and a retry of a
+    failed call can still succeed.
+    """
+
+    def __init__(self, profile='realistic', seed=0, latency_scale=1.0, error_rate=None):
+        if profile not in PROFILES:
+            raise ValueError(f'Unknown local AI profile {profile!r}; choose from {", ".join(PROFILES)}')
+        self.profile = profile
+        self.settings = dict(PROFILES[profile])
+        if error_rate is not None:
+            self.settings['error_rate'] = error_rate
+        self.seed = seed
+        self.latency_scale = latency_scale
+        self._attempts = {}
+        self._lock = threading.Lock()
+        self.calls = {'transcribe': 0, 'chat': 0}
+        self.errors = {}
+
+        # Same attribute paths as the OpenAI SDK
+        self.audio = SimpleNamespace(transcriptions=SimpleNamespace(create=self._transcribe))
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._chat))
+
+    @classmethod
+    def from_env(cls):
+        """Engine configured from LOCAL_AI_* env vars"""
+        error_rate = os.getenv('LOCAL_AI_ERROR_RATE')
+        return cls(
+            profile=os.getenv('LOCAL_AI_PROFILE', 'realistic'),
+            seed=int(os.getenv('LOCAL_AI_SEED', 0)),
+            latency_scale=float(os.getenv('LOCAL_AI_LATENCY_SCALE', 1.0)),
+            error_rate=float(error_rate) if error_rate else None
+        )
+
+    def _rng(self, kind, digest):
+        """Generator seeded by the input and its attempt number"""
+        key = f'{kind}:{digest}'
+        with self._lock:
+            attempt = self._attempts.get(key, 0)
+            if len(self._attempts) > 10000:
+                self._attempts.clear()
+            self._attempts[key] = attempt + 1
+            self.calls[kind] += 1
+        return random.Random(f'{self.seed}:{key}:{attempt}')
+
+    def _latency(self, rng, base_ms, units=0.0, ms_per_unit=0.0):
+        """Seconds for one call, with lognormal jitter"""
+        jitter = rng.lognormvariate(0, self.settings['jitter']) if self.settings['jitter'] else 1.0
+        return (base_ms + units * ms_per_unit) * jitter * self.latency_scale / 1000
+
+    def _maybe_fail(self, rng, kind, timeout):
+        """Raise an injected provider error, after the delay a real one would take"""
+        if rng.random() >= self.settings['error_rate']:
+            return
+        error = rng.choices([name for _, name in _ERRORS], weights=[weight for weight, _ in _ERRORS])[0]
+        with self._lock:
+            self.errors[error] = self.errors.get(error, 0) + 1
+
+        request = httpx.Request('POST', f'https://local.invalid/v1/{kind}')
+        if error == 'timeout':
+            time.sleep(min(timeout or 1.0, 5.0) * self.latency_scale)
+            raise openai.APITimeoutError(request=request)
+        time.sleep(self._latency(rng, 100))
+        status, cls = {
+            'rate_limit': (429, openai.RateLimitError),
+            'server_error': (500, openai.InternalServerError),
+            'unavailable': (503, openai.InternalServerError),
+        }[error]
+        raise cls(f'Injected {error} ({status})', response=httpx.Response(status, request=request), body=None)
+
+    def _sleep(self, seconds, timeout):
+        """Sleep for a simulated call, raising a timeout when it would exceed the caller's"""
+        if timeout is not None and seconds > timeout:
+            time.sleep(timeout)
+            raise openai.APITimeoutError(request=httpx.Request('POST', 'https://local.invalid/v1'))
+        time.sleep(seconds)
+
+    def _transcribe(self, model=None, file=None, response_format=None, language=None, timeout=None, **kwargs):
+        """Stand-in for client.audio.transcriptions.create"""
+        name, stream = (file[0], file[1]) if isinstance(file, tuple) else (getattr(file, 'name', ''), file)
+        digest = hashlib.sha256()
+        size = 0
+        # Read like the real upload would
+        for chunk in iter(lambda: stream.read(1024 * 1024), b''):
+            digest.update(chunk)
+            size += len(chunk)
+        digest = digest.hexdigest()
+        duration = self._duration(stream, str(name), size)
+
+        rng = self._rng('transcribe', digest)
+        self._maybe_fail(rng, 'audio/transcriptions', timeout)
+        self._sleep(self._latency(
+            rng, self.settings['transcribe_base_ms'], duration, self.settings['transcribe_ms_per_second']
+        ), timeout)
+
+        text = TRANSCRIPTS[int(digest[:8], 16) % len(TRANSCRIPTS)]
+        sentences = [sentence for sentence in re.split(r'(?<=\.)\s+', text) if sentence]
+        segments = []
+        position = 0.0
+        for index, sentence in enumerate(sentences):
+            length = duration * len(sentence) / len(text)
+            segments.append({
+                'id': index, 'seek': 0, 'start': round(position, 2), 'end': round(position + length, 2),
+                'text': ' ' + sentence, 'avg_logprob': -0.2, 'no_speech_prob': 0.01
+            })
+            position += length
+        return SimpleNamespace(text=text, language='english', duration=duration, segments=segments)
+
+    def _duration(self, stream, name, size):
+        """Audio length from the WAV header, else estimated from size"""
+        if name.lower().endswith('.wav') and hasattr(stream, 'seek'):
+            try:
+                stream.seek(0)
+                with wave.open(stream, 'rb') as reader:
+                    return round(reader.getnframes() / float(reader.getframerate() or 1), 2)
+            except (wave.Error, EOFError, OSError):
+                pass
+        return round(size / 16000, 2)  # ~128 kbps compressed audio
+
+    def _chat(self, model=None, messages=None, temperature=None, max_tokens=None, stream=False, timeout=None, **kwargs):
+        """Stand-in for client.chat.completions.create"""
+        messages = messages or []
+        system = next((m['content'] for m in messages if m.get('role') == 'system'), '')
+        user = next((m['content'] for m in reversed(messages) if m.get('role') == 'user'), '')
+        digest = hashlib.sha256(f'{system}\n{user}'.encode('utf-8')).hexdigest()
+
+        rng = self._rng('chat', digest)
+        self._maybe_fail(rng, 'chat/completions', timeout)
+        content = self._quote_reply(user, system, random.Random(digest))
+        tokens = max(1, len(content) // 4)
+
+        if not stream:
+            self._sleep(self._latency(
+                rng, self.settings['chat_first_token_ms'], tokens, self.settings['chat_ms_per_token']
+            ), timeout)
+            return SimpleNamespace(
+                choices=[SimpleNamespace(index=0, message=SimpleNamespace(role='assistant', content=content),
+                                         finish_reason='stop')],
+                usage=SimpleNamespace(prompt_tokens=len(system + user) // 4, completion_tokens=tokens)
+            )
+
+        first_token = self._latency(rng, self.settings['chat_first_token_ms'])
+        self._sleep(first_token, timeout)
+        per_token = self._latency(rng, self.settings['chat_ms_per_token'])
+        return self._stream(content, per_token)
+
+    def _stream(self, content, per_token):
+        """Yield ~4-character deltas at the simulated token rate"""
+        for start in range(0, len(content), 4):
+            if per_token:
+                time.sleep(per_token)
+            yield SimpleNamespace(choices=[SimpleNamespace(
+                index=0, delta=SimpleNamespace(content=content[start:start + 4]), finish_reason=None
+            )])
+
+    def _quote_reply(self, text, system, rng):
+        """A GPT-4 style quote reply derived from the text, sometimes wrapped in prose or a code fence"""
+        lower = text.lower()
+        rate_match = re.search(r'hourly rate: £([\d.]+)', system)
+        hourly_rate = float(rate_match.group(1)) if rate_match else 45.0
+        keywords, job_type, (low, high), materials = next(
+            (job for job in _JOBS if any(word in lower for word in job[0])),
+            ((), 'General', (2, 4), [('Sundries', 1, 25.0)])
+        )
+
+        name_match = re.search(r'\b[Ff]or\s+((?:Mrs?|Ms|Dr)\.?\s+)?([A-Z][a-z]+(?:\s[A-Z][a-z]+)?)', text)
+        phone_match = re.search(r'\b0\d{4}\s?\d{6}\b', text)
+        address_match = re.search(r'\b\d+\s+[A-Z][a-z]+\s+(?:Road|Street|Lane|Avenue|Close)\b', text)
+        urgency = 'emergency' if 'emergency' in lower else 'urgent' if 'urgent' in lower and 'not urgent' not in lower else 'normal'
+        lines = [
+            {'item': item, 'quantity': quantity, 'unit_price': price, 'total': round(quantity * price, 2)}
+            for item, quantity, price in materials
+        ]
+        labour_hours = round(rng.uniform(low, high) * 2) / 2
+        materials_cost = round(sum(line['total'] for line in lines), 2)
+        subtotal = labour_hours * hourly_rate + materials_cost
+        quote = {
+            'customer_name': ''.join(name_match.groups('')).strip() if name_match else 'Unknown Customer',
+            'customer_phone': phone_match.group() if phone_match else None,
+            'customer_address': address_match.group() if address_match else None,
+            'job_description': text.split(': ', 1)[-1][:300],
+            'job_type': job_type,
+            'urgency': urgency,
+            'labour_hours': labour_hours,
+            'labour_rate': hourly_rate,
+            'materials': lines,
+            'materials_cost': materials_cost,
+            'subtotal': round(subtotal, 2),
+            'vat_amount': round(subtotal * 0.2, 2),
+            'total_amount': round(subtotal * 1.2, 2),
+            'confidence': round(rng.uniform(0.75, 0.95), 2),
+            'scheduling_suggestion': f'Allow {labour_hours:g} hours on site.',
+            'notes': 'Generated by the local AI engine.'
+        }
+        body = json.dumps(quote, indent=2)
+        wrapping = rng.random()
+        if wrapping < 0.15:
+            return f'```json\n{body}\n```'
+        if wrapping < 0.25:
+            return f'Here is the quote based on the transcript:\n\n{body}\n\nLet me know if you need changes.'
+        return body
+
+    def stats(self):
+        with self._lock:
+            return {
+                'profile': self.profile,
+                'latency_scale': self.latency_scale,
+                'error_rate': self.settings['error_rate'],
+                'calls': dict(self.calls),
+                'injected_errors': dict(self.errors),
+            }
@@ -0,0 +1,87 @@
+"""
+Number Allocation Service for TradesMate
+Hands out collision-free quote numbers from per-day DB counters
+"""
+
+import os
+import threading
+from datetime import datetime
+from sqlalchemy import insert, select, update
+from sqlalchemy.exc import IntegrityError
+try:
+    from ..database import db
+    from ..models.sequence import NumberSequence
+except ImportError:
+    from database import db
+    from models.sequence import NumberSequence
+
+class NumberAllocator:
+    """
+    Per-day sequence allocator that reserves numbers in blocks
+
+    Each process reserves `block_size` numbers at a time with one atomic
+    UPDATE on the counter row, then hands them out from memory. Numbers are
+    unique across workers and increasing within a worker; a worker that exits
+    leaves a gap rather than a duplicate.
+    """
+
+    def __init__(self, prefix, sequence, block_size=None):
+        """
+        Args:
+            prefix (str): Number prefix, e.g. 'TM' -> TM-20250127-00001
+            sequence (str): Counter name in number_sequences, suffixed with the day
+            block_size (int): Numbers reserved per DB round trip
+        """
+        self.prefix = prefix
+        self.sequence = sequence
+        self.block_size = block_size or int(os.getenv('NUMBER_BLOCK_SIZE', 20))
+        self._lock = threading.Lock()
+        self._blocks = {}
+        self._pid = os.getpid()
+
+    def allocate(self):
+        """Return the next number, e.g. TM-20250127-00042"""
+        day = datetime.utcnow().strftime('%Y%m%d')
+        name = f'{self.sequence}:{day}'
+
+        with self._lock:
+            if self._pid != os.getpid():
+                # Forked after reserving: the parent owns those blocks
+                self._blocks = {}
+                self._pid = os.getpid()
+
+            next_value, end = self._blocks.get(name, (0, 0))
+            if next_value >= end:
+                next_value, end = self._reserve(name, self.block_size)
+            # Drop blocks from previous days
+            self._blocks = {name: (next_value + 1, end)}
+
+        # Five digits never collide with the legacy four-digit random suffixes
+        return f'{self.prefix}-{day}-{next_value:05d}'
+
+    def _reserve(self, name, size):
+        """Atomically reserve [start, end) from the named counter"""
+        table = NumberSequence.__table__
+        for _ in range(3):
+            # Own transaction, so the reservation commits independently of the request
+            with db.engine.begin() as connection:
+                result = connection.execute(
+                    update(table)
+                    .where(table.c.name == name)
+                    .values(next_value=table.c.next_value + size)
+                )
+                if result.rowcount:
+                    end = connection.execute(
+                        select(table.c.next_value).where(table.c.name == name)
+                    ).scalar_one()
+                    return end - size, end
+            try:
+                with db.engine.begin() as connection:
+                    connection.execute(insert(table).values(name=name, next_value=1))
+            except IntegrityError:
+                pass  # Another worker created the counter first
+        raise RuntimeError(f'Could not reserve numbers from sequence {name}')
+
+# Process-wide allocator. Nothing creates invoices yet; give them their own
+# NumberAllocator and sequence name when something does.
+quote_numbers = NumberAllocator('TM', 'quote')
@@ -0,0 +1,82 @@
+"""
+Shared OpenAI Client for TradesMate
+One lazily built client per process, over a pooled keep-alive HTTP
+connection, reused by every AI and voice service
+"""
+
+import os
+import threading
+import httpx
+from openai import OpenAI
+try:
+    from .. import metrics
+except ImportError:
+    import metrics
+
+_client = None
+_client_pid = None
+_lock = threading.Lock()
+_created = 0
+
+def _http_client():
+    """httpx client with pool limits, keep-alive and timeouts from OPENAI_* env vars"""
+    return httpx.Client(
+        limits=httpx.Limits(
+            max_connections=int(os.getenv('OPENAI_MAX_CONNECTIONS', 20)),
+            max_keepalive_connections=int(os.getenv('OPENAI_MAX_KEEPALIVE', 10)),
+            keepalive_expiry=float(os.getenv('OPENAI_KEEPALIVE_EXPIRY', 60))
+        ),
+        timeout=httpx.Timeout(
+            float(os.getenv('OPENAI_TIMEOUT', 60)),
+            connect=float(os.getenv('OPENAI_CONNECT_TIMEOUT', 5))
+        ),
+        follow_redirects=True
+    )
+
+def get_openai_client():
+    """
+    Get this process's shared OpenAI client, creating it on first use
+
+    Returns:
+        OpenAI: Shared client, or None in demo mode (no OPENAI_API_KEY)
+    """
+    global _client, _client_pid, _created
+    # Connections must not be shared with a forked parent
+    if _client is not None and _client_pid == os.getpid():
+        return _client
+
+    api_key = os.getenv('OPENAI_API_KEY')
+    if not api_key or api_key == 'demo-key':
+        return None
+
+    with _lock:
+        if _client is None or _client_pid != os.getpid():
+            _client = OpenAI(
+                api_key=api_key,
+                base_url=os.getenv('OPENAI_API_BASE') or None,
+                # Retries are owned by services/resilience.py; the SDK's own would multiply them
+                max_retries=int(os.getenv('OPENAI_MAX_RETRIES', 0)),
+                http_client=_http_client()
+            )
+            _client_pid = os.getpid()
+            _created += 1
+    return _client
+
+def client_stats():
+    """Pool settings and live connection count of the shared client"""
+    client = _client if _client_pid == os.getpid() else None
+    stats = {
+        'initialized': client is not None,
+        'clients_created': _created,
+        'max_connections': int(os.getenv('OPENAI_MAX_CONNECTIONS', 20)),
+        'max_keepalive_connections': int(os.getenv('OPENAI_MAX_KEEPALIVE', 10)),
+    }
+    if client is not None:
+        # httpcore's pool is internal; report it when the attribute chain exists
+        pool = getattr(getattr(client._client, '_transport', None), '_pool', None)
+        connections = getattr(pool, 'connections', None)
+        if connections is not None:
+            stats['open_connections'] = len(connections)
+    return stats
+
+metrics.register('openai_client', client_stats)
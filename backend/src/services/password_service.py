@@ -0,0 +1,113 @@
+"""
+Password Hashing Service for TradesMate
+Runs pbkdf2 hashing and verification in a bounded process pool so bursts of
+logins and registrations cannot pin every web worker on CPU
+"""
+
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeout
+from werkzeug.security import check_password_hash, generate_password_hash
+try:
+    from .. import metrics
+    from ..metrics import Histogram
+except ImportError:
+    import metrics
+    from metrics import Histogram
+
+class PasswordHasherBusy(Exception):
+    """Raised when the hashing queue is full or a hash timed out; callers should answer 503"""
+
+class PasswordService:
+    """Bounded off-thread pbkdf2 hashing with rehash-on-login support"""
+
+    # Password hashing takes tens to hundreds of ms; bucket accordingly
+    LATENCY_BUCKETS_MS = (10, 25, 50, 100, 250, 500, 1000, 2500)
+
+    def __init__(self):
+        self.iterations = int(os.getenv('PASSWORD_HASH_ITERATIONS', 600000))
+        self.method = f'pbkdf2:sha256:{self.iterations}'
+        # 0 workers hashes inline (scripts, local development)
+        self.workers = int(os.getenv('PASSWORD_HASH_WORKERS', max(1, (os.cpu_count() or 2) // 2)))
+        self.max_pending = int(os.getenv('PASSWORD_HASH_QUEUE', self.workers * 4))
+        self.timeout = float(os.getenv('PASSWORD_HASH_TIMEOUT', 10))
+        self._slots = threading.BoundedSemaphore(max(1, self.max_pending))
+        self._executor = None
+        self._executor_pid = None
+        self._lock = threading.Lock()
+        self.hash_latency = Histogram(self.LATENCY_BUCKETS_MS)
+        self.verify_latency = Histogram(self.LATENCY_BUCKETS_MS)
+        self.rejected = 0
+        self.timed_out = 0
+        self.rehashed = 0
+
+    def _get_executor(self):
+        """Create the pool lazily in each (post-fork) worker process"""
+        with self._lock:
+            if self._executor is None or self._executor_pid != os.getpid():
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context('spawn')
+                )
+                self._executor_pid = os.getpid()
+            return self._executor
+
+    def _run(self, histogram, fn, *args):
+        """Run fn in the pool, shedding load when the queue is full"""
+        start = time.perf_counter()
+        if self.workers <= 0:
+            result = fn(*args)
+        else:
+            if not self._slots.acquire(blocking=False):
+                with self._lock:
+                    self.rejected += 1
+                raise PasswordHasherBusy('Password hashing queue is full')
+            try:
+                future = self._get_executor().submit(fn, *args)
+            except BaseException:
+                self._slots.release()
+                raise
+            # The slot is held until the hash actually finishes, even if we stop waiting for it
+            future.add_done_callback(lambda _: self._slots.release())
+            try:
+                result = future.result(timeout=self.timeout)
+            except FutureTimeout:
+                future.cancel()
+                with self._lock:
+                    self.timed_out += 1
+                raise PasswordHasherBusy(f'Password hashing took longer than {self.timeout:g}s')
+        histogram.observe((time.perf_counter() - start) * 1000)
+        return result
+
+    def hash(self, password):
+        """Hash a password with the configured work factor"""
+        return self._run(self.hash_latency, generate_password_hash, password, self.method)
+
+    def verify(self, password_hash, password):
+        """Check a password against a stored hash"""
+        return self._run(self.verify_latency, check_password_hash, password_hash, password)
+
+    def needs_rehash(self, password_hash):
+        """True when a stored hash was made with a different method or work factor"""
+        return not password_hash.startswith(f'{self.method}$')
+
+    def record_rehash(self):
+        with self._lock:
+            self.rehashed += 1
+
+    def stats(self):
+        with self._lock:
+            counters = {'rejected': self.rejected, 'timed_out': self.timed_out, 'rehashed': self.rehashed}
+        return {
+            'method': self.method,
+            'workers': self.workers,
+            'max_pending': self.max_pending,
+            **counters,
+            'hash_latency': self.hash_latency.to_dict(),
+            'verify_latency': self.verify_latency.to_dict(),
+        }
+
+password_service = PasswordService()
+metrics.register('password_hashing', password_service.stats)
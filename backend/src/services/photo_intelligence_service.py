@@ -3,44 +3,186 @@ Photo Intelligence Service for TradesMate
 Handles OCR and image analysis for handwritten notes
 """
 
+import logging
+import multiprocessing
 import os
-import tempfile
-# For demo purposes, we'll comment out complex dependencies
-# from PIL import Image
-# import pytesseract
+import threading
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeout
+from concurrent.futures.process import BrokenProcessPool
+try:
+    from .. import metrics
+    from .imaging import ImageDecodeError, get_decoder, get_ocr_engine, prepare_image, run_ocr_pipeline
+except ImportError:
+    import metrics
+    from services.imaging import ImageDecodeError, get_decoder, get_ocr_engine, prepare_image, run_ocr_pipeline
+
+log = logging.getLogger(__name__)
+
+OCR_STAGES = ('decode', 'orient', 'grayscale', 'downscale', 'threshold', 'deskew', 'ocr')
+
+# Per-stage latency across every OCR request served by this process
+_stage_timings = {stage: metrics.Histogram((10, 50, 100, 250, 500, 1000, 2500, 5000)) for stage in OCR_STAGES}
+
+_ocr_executor = None
+_ocr_executor_pid = None
+_ocr_lock = threading.Lock()
+
+def _ocr_pool(workers):
+    """
+    Process pool for the CPU-bound OCR pipeline, created lazily per (post-fork) process
+
+    Workers start from a forkserver rather than forking the threaded web
+    process, so they never inherit its locks or database connections.
+    """
+    global _ocr_executor, _ocr_executor_pid
+    with _ocr_lock:
+        if _ocr_executor is None or _ocr_executor_pid != os.getpid():
+            methods = multiprocessing.get_all_start_methods()
+            context = multiprocessing.get_context('forkserver' if 'forkserver' in methods else 'spawn')
+            _ocr_executor = ProcessPoolExecutor(max_workers=workers, mp_context=context)
+            _ocr_executor_pid = os.getpid()
+        return _ocr_executor
+
+def _reset_ocr_pool(broken):
+    """Drop a pool whose worker died so the next request starts a fresh one"""
+    global _ocr_executor
+    with _ocr_lock:
+        if _ocr_executor is broken:
+            _ocr_executor = None
+    broken.shutdown(wait=False, cancel_futures=True)
+
+def ocr_stats():
+    """Engine, pool size and per-stage latency histograms"""
+    engine = get_ocr_engine()
+    return {
+        'engine': engine[0] if engine else None,
+        'workers': PhotoIntelligenceService.workers(),
+        'stages': {stage: histogram.to_dict() for stage, histogram in _stage_timings.items()},
+    }
+
+metrics.register('ocr', ocr_stats)
+
+def _read_image(image_file):
+    """(bytes, filename) from an upload or a file path"""
+    if isinstance(image_file, (str, os.PathLike)):
+        with open(image_file, 'rb') as f:
+            return f.read(), os.fspath(image_file)
+    stream = getattr(image_file, 'stream', image_file)
+    stream.seek(0)
+    return stream.read(), getattr(image_file, 'filename', None) or getattr(image_file, 'name', '')
 
 class PhotoIntelligenceService:
     """Service for photo analysis and text extraction"""
     
     def __init__(self):
-        # Configure Tesseract (you may need to adjust the path)
-        # self.tesseract_cmd = os.getenv('TESSERACT_CMD', '/usr/bin/tesseract')
-        pass
+        # Photos are bounded to this long side before thresholding and OCR
+        self.max_side = int(os.getenv('OCR_MAX_SIDE', 2000))
+        self.timeout = float(os.getenv('OCR_TIMEOUT', 60))
+        # Photos queued or running in the pool; a slot is held until the worker is done
+        self.max_pending = int(os.getenv('OCR_QUEUE', 0)) or self.workers() * 4
+        self._slots = threading.BoundedSemaphore(self.max_pending)
+    
+    @staticmethod
+    def ocr_available():
+        """Whether an OCR engine (OCR_ENGINE or the first installed one) is available"""
+        return get_ocr_engine() is not None
+    
+    @staticmethod
+    def workers():
+        """OCR worker processes (OCR_WORKERS, default one per CPU core)"""
+        return max(1, int(os.getenv('OCR_WORKERS', 0)) or os.cpu_count() or 1)
     
     def extract_text_from_image(self, image_file):
         """
         Extract text from image using OCR
         
+        Decoding, preprocessing and recognition run in a worker process so
+        concurrent requests use every core without blocking the web workers.
+        
         Args:
             image_file: File object or file path
-            
+        
         Returns:
-            dict: Extraction result with text and confidence
+            dict: Extraction result with text, confidence, skew_angle and
+            per-stage timings_ms; on failure success is False, with
+            invalid_image set when the photo itself could not be read,
+            unavailable set when no decoder or OCR engine is installed and
+            busy set when the pool is full or the photo timed out
         """
         try:
-            # For demo purposes, return mock data since Tesseract setup is complex
-            # In production, you would use proper OCR
+            data, filename = _read_image(image_file)
+            decoder = get_decoder(filename)
+            if decoder is None:
+                if self.is_allowed_image_file(filename):
+                    # An accepted format whose decoder is not installed
+                    return {
+                        'success': False,
+                        'error': f'No decoder available for {filename} (install Pillow)',
+                        'unavailable': True
+                    }
+                return {
+                    'success': False,
+                    'error': f'Unsupported image format: {filename}',
+                    'invalid_image': True
+                }
+            engine = get_ocr_engine()
+            if engine is None:
+                return {
+                    'success': False,
+                    'error': 'No OCR engine available (install tesseract or set OCR_ENGINE)',
+                    'unavailable': True
+                }
+            engine_name, engine_fn = engine
+            
+            if not self._slots.acquire(blocking=False):
+                return {
+                    'success': False,
+                    'error': 'Text extraction queue is full',
+                    'busy': True
+                }
+            pool = _ocr_pool(self.workers())
+            try:
+                future = pool.submit(run_ocr_pipeline, data, filename, engine_fn, self.max_side, decoder)
+            except BaseException:
+                self._slots.release()
+                raise
+            # A photo that times out keeps its worker busy until it finishes, so keep counting it
+            future.add_done_callback(lambda _: self._slots.release())
+            try:
+                result = future.result(self.timeout)
+            except FutureTimeout:
+                future.cancel()
+                raise
+            except BrokenProcessPool:
+                log.warning('OCR worker died, restarting the pool')
+                _reset_ocr_pool(pool)
+                raise
+            
+            for stage, elapsed in result['timings_ms'].items():
+                if stage in _stage_timings:
+                    _stage_timings[stage].observe(elapsed)
             
             return {
                 'success': True,
-                'text': 'Kitchen tap replacement for Mrs. Johnson, 123 Main St. Materials needed: new tap, washers, sealant. Estimated 2 hours work. Customer phone: 07700 900123',
-                'confidence': 0.85,
-                'method': 'demo_ocr'
+                'text': result['text'],
+                'confidence': result['confidence'],
+                'method': f'ocr:{engine_name}',
+                'skew_angle': result['skew_angle'],
+                'timings_ms': result['timings_ms']
+            }
+        
+        except ImageDecodeError as e:
+            return {
+                'success': False,
+                'error': str(e),
+                'invalid_image': True
+            }
+        except FutureTimeout:
+            return {
+                'success': False,
+                'error': f'Text extraction timed out after {self.timeout:g}s',
+                'busy': True
             }
-            
-            # Production implementation would use Tesseract OCR
-            # See documentation for setup instructions
-            
         except Exception as e:
             return {
                 'success': False,
@@ -51,22 +193,19 @@ class PhotoIntelligenceService:
         """
         Preprocess image for better OCR results
         
+        Runs in the calling process: orientation, grayscale, bounded
+        downscale, adaptive threshold and deskew.
+        
         Args:
-            image_file: PIL Image object
-            
+            image_file: File object or file path
+        
         Returns:
-            PIL Image: Preprocessed image
+            tuple: (binarized uint8 array, info dict with skew_angle and timings_ms)
         """
         try:
-            # Convert to grayscale
-            if image_file.mode != 'L':
-                image_file = image_file.convert('L')
-            
-            # Apply filters to improve OCR accuracy
-            # This would include noise reduction, contrast enhancement, etc.
-            
-            return image_file
-            
+            data, filename = _read_image(image_file)
+            return prepare_image(data, filename, self.max_side)
+        
         except Exception as e:
             raise Exception(f'Image preprocessing failed: {str(e)}')
     
@@ -75,7 +214,7 @@ class PhotoIntelligenceService:
         if not filename:
             return False
         
-        allowed_extensions = ['jpg', 'jpeg', 'png', 'gif', 'bmp', 'tiff']
+        allowed_extensions = ['jpg', 'jpeg', 'png', 'gif', 'bmp', 'tiff', 'pgm', 'ppm', 'pnm']
         extension = filename.rsplit('.', 1)[-1].lower()
         return extension in allowed_extensions
     
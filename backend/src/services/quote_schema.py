@@ -0,0 +1,175 @@
+"""
+Quote Schema for TradesMate
+Validates and normalizes the quote JSON returned by the LLM: coerces numeric
+strings, normalizes materials lines and recomputes every total
+"""
+
+import re
+
+VAT_RATE = 0.20  # UK standard rate
+
+URGENCY_LEVELS = ('emergency', 'urgent', 'normal')
+
+# First number in strings like "£1,250.50", "2.5 hours" or "approx 3"
+_NUMBER = re.compile(r'-?\d[\d,]*(?:\.\d+)?|-?\.\d+')
+
+
+def to_number(value, default=None):
+    """Coerce an int, float or numeric string to float; default when not numeric"""
+    if isinstance(value, bool):
+        return default
+    if isinstance(value, (int, float)):
+        return float(value) if value == value else default  # NaN
+    if isinstance(value, str):
+        match = _NUMBER.search(value)
+        if match:
+            try:
+                return float(match.group().replace(',', ''))
+            except ValueError:
+                return default
+    return default
+
+
+def _text(default):
+    def coerce(value, context):
+        if value is None:
+            return default
+        value = str(value).strip()
+        return value or default
+    return coerce
+
+
+def _optional_text(value, context):
+    if value is None:
+        return None
+    value = str(value).strip()
+    return value if value and value.lower() not in ('null', 'none', 'n/a') else None
+
+
+def _number(default, minimum=0.0):
+    def coerce(value, context):
+        number = to_number(value)
+        if number is None or number < minimum:
+            return default(context) if callable(default) else default
+        return number
+    return coerce
+
+
+def _urgency(value, context):
+    value = str(value or '').strip().lower()
+    for level in URGENCY_LEVELS:
+        if level in value:
+            return level
+    return 'normal'
+
+
+def _confidence(value, context):
+    number = to_number(value)
+    if number is None:
+        return 0.8
+    if 1 < number <= 100:
+        number /= 100  # "85" or "85%"
+    return min(max(number, 0.0), 1.0)
+
+
+def _material(item):
+    """Normalize one materials line to {'item', 'quantity', 'unit_price', 'total'}"""
+    if isinstance(item, str):
+        name = item.strip()
+        return {'item': name, 'quantity': 1.0, 'unit_price': 0.0, 'total': 0.0} if name else None
+    if not isinstance(item, dict):
+        return None
+
+    name = next(
+        (str(item[key]).strip() for key in ('item', 'name', 'description', 'material') if item.get(key)),
+        ''
+    )
+    if not name:
+        return None
+    quantity = to_number(item.get('quantity', item.get('qty')))
+    if quantity is None or quantity <= 0:
+        quantity = 1.0
+    unit_price = to_number(item.get('unit_price', item.get('price')))
+    total = to_number(item.get('total'))
+
+    if unit_price is not None and unit_price >= 0:
+        total = quantity * unit_price
+    elif total is not None and total >= 0:
+        unit_price = total / quantity
+    else:
+        unit_price = total = 0.0
+
+    return {
+        'item': name,
+        'quantity': quantity,
+        'unit_price': round(unit_price, 2),
+        'total': round(total, 2)
+    }
+
+
+def _materials(value, context):
+    if not isinstance(value, list):
+        return []
+    return [line for line in map(_material, value) if line is not None]
+
+
+class QuoteSchema:
+    """
+    Field coercers compiled once; validate() runs them in order and derives totals
+
+    Unknown fields (scheduling_suggestion, notes, ...) are kept unchanged.
+    """
+
+    # (field, coercer) in dependency order; context holds the hourly rate
+    FIELDS = (
+        ('customer_name', _text('Unknown Customer')),
+        ('customer_phone', _optional_text),
+        ('customer_address', _optional_text),
+        ('job_description', _text('Job description not provided')),
+        ('job_type', _text('General')),
+        ('urgency', _urgency),
+        ('labour_hours', _number(2.0)),
+        ('labour_rate', _number(lambda context: context['hourly_rate'])),
+        ('materials', _materials),
+        ('materials_cost', _number(0.0)),
+        ('confidence', _confidence),
+    )
+
+    def __init__(self, fields=FIELDS):
+        self._fields = tuple(fields)
+
+    def validate(self, data, default_hourly_rate):
+        """
+        Normalize an LLM quote dict
+
+        Args:
+            data (dict): Decoded LLM output
+            default_hourly_rate (float): Used when labour_rate is missing
+
+        Returns:
+            dict: Quote with coerced fields and recomputed subtotal, VAT and total
+        """
+        if not isinstance(data, dict):
+            data = {}
+        quote = dict(data)
+        context = {'hourly_rate': float(default_hourly_rate)}
+        for field, coerce in self._fields:
+            quote[field] = coerce(data.get(field), context)
+
+        # Priced lines are authoritative over a stated materials_cost
+        lines_cost = sum(line['total'] for line in quote['materials'])
+        if lines_cost > 0:
+            quote['materials_cost'] = round(lines_cost, 2)
+
+        labour_cost = quote['labour_hours'] * quote['labour_rate']
+        subtotal = labour_cost + quote['materials_cost']
+        vat_amount = subtotal * VAT_RATE
+        quote.update({
+            'subtotal': round(subtotal, 2),
+            'vat_amount': round(vat_amount, 2),
+            'total_amount': round(subtotal + vat_amount, 2)
+        })
+        return quote
+
+
+quote_schema = QuoteSchema()
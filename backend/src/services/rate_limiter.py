@@ -0,0 +1,119 @@
+"""
+Rate Limiting Service for TradesMate
+Token buckets stored in a node-local SQLite file so every gunicorn worker on
+the node enforces the same limit
+"""
+
+import logging
+import os
+import random
+import sqlite3
+import tempfile
+import threading
+import time
+try:
+    from .. import metrics
+except ImportError:
+    import metrics
+
+log = logging.getLogger(__name__)
+
+class TokenBucketStore:
+    """Shared token buckets keyed by arbitrary strings"""
+
+    # Buckets idle this long are full again and can be dropped
+    STALE_AFTER_SECONDS = 86400
+
+    def __init__(self, path=None):
+        self.path = path or os.getenv(
+            'RATE_LIMIT_DB', os.path.join(tempfile.gettempdir(), 'tradesmate_ratelimit.db')
+        )
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self.allowed = {}
+        self.limited = {}
+        self.errors = 0
+
+    def _connection(self):
+        """One connection per thread (and per process after fork)"""
+        connection = getattr(self._local, 'connection', None)
+        if connection is None or self._local.pid != os.getpid():
+            connection = sqlite3.connect(self.path, timeout=1.0, isolation_level=None)
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute('PRAGMA synchronous=NORMAL')
+            connection.execute(
+                'CREATE TABLE IF NOT EXISTS buckets '
+                '(key TEXT PRIMARY KEY, tokens REAL NOT NULL, updated REAL NOT NULL)'
+            )
+            self._local.connection = connection
+            self._local.pid = os.getpid()
+        return connection
+
+    def acquire(self, key, capacity, refill_per_second, cost=1.0):
+        """
+        Take `cost` tokens from the bucket if available
+
+        Args:
+            key (str): Bucket key, e.g. 'login:ip:203.0.113.9'
+            capacity (float): Burst size
+            refill_per_second (float): Sustained rate
+            cost (float): Tokens this request consumes
+
+        Returns:
+            tuple: (allowed, retry_after_seconds)
+        """
+        now = time.time()
+        connection = self._connection()
+        # BEGIN IMMEDIATE takes the write lock up front, serialising workers
+        connection.execute('BEGIN IMMEDIATE')
+        try:
+            row = connection.execute(
+                'SELECT tokens, updated FROM buckets WHERE key = ?', (key,)
+            ).fetchone()
+            if row is None:
+                tokens = capacity
+            else:
+                tokens = min(capacity, row[0] + max(0.0, now - row[1]) * refill_per_second)
+
+            if tokens >= cost:
+                tokens -= cost
+                allowed, retry_after = True, 0.0
+            else:
+                allowed = False
+                retry_after = (cost - tokens) / refill_per_second if refill_per_second > 0 else 60.0
+
+            connection.execute(
+                'INSERT INTO buckets (key, tokens, updated) VALUES (?, ?, ?) '
+                'ON CONFLICT(key) DO UPDATE SET tokens = excluded.tokens, updated = excluded.updated',
+                (key, tokens, now)
+            )
+            if random.random() < 0.001:
+                connection.execute(
+                    'DELETE FROM buckets WHERE updated < ?', (now - self.STALE_AFTER_SECONDS,)
+                )
+            connection.execute('COMMIT')
+        except Exception:
+            connection.execute('ROLLBACK')
+            raise
+        return allowed, retry_after
+
+    def record(self, name, allowed):
+        with self._lock:
+            counter = self.allowed if allowed else self.limited
+            counter[name] = counter.get(name, 0) + 1
+
+    def record_error(self):
+        with self._lock:
+            self.errors += 1
+
+    def stats(self):
+        with self._lock:
+            return {
+                'store': self.path,
+                'allowed': dict(self.allowed),
+                'limited': dict(self.limited),
+                'errors': self.errors,
+            }
+
+bucket_store = TokenBucketStore()
+metrics.register('rate_limits', bucket_store.stats)
@@ -0,0 +1,269 @@
+"""
+Outbound Call Resilience for TradesMate
+Bulkhead, deadline, jittered retry and circuit breaker around calls to
+external AI providers, so a provider slowdown fails fast instead of hanging
+every web worker
+"""
+
+import logging
+import os
+import random
+import threading
+import time
+import openai
+try:
+    from .. import metrics
+    from ..metrics import Histogram
+except ImportError:
+    import metrics
+    from metrics import Histogram
+
+log = logging.getLogger(__name__)
+
+class ServiceUnavailable(Exception):
+    """Base for calls refused or abandoned by a guard; callers may fall back"""
+
+class CircuitOpen(ServiceUnavailable):
+    """The breaker is open after repeated failures"""
+
+class BulkheadFull(ServiceUnavailable):
+    """Too many calls to this provider are already in flight"""
+
+class DeadlineExceeded(ServiceUnavailable):
+    """The call (including retries) ran past its deadline"""
+
+class RetriesExhausted(ServiceUnavailable):
+    """Every attempt failed with a retryable error"""
+
+# 408 timeout, 409 conflict, 429 rate limit and 5xx are worth retrying;
+# other 4xx (bad request, auth, quota) will fail the same way again.
+RETRYABLE_STATUS_CODES = frozenset({408, 409, 429, 500, 502, 503, 504})
+
+def is_retryable(error):
+    """True for transient provider errors (timeouts, connection drops, 429/5xx)"""
+    if isinstance(error, openai.APIConnectionError):  # includes APITimeoutError
+        return True
+    if isinstance(error, openai.APIStatusError):
+        return error.status_code in RETRYABLE_STATUS_CODES or error.status_code >= 500
+    return isinstance(error, (TimeoutError, ConnectionError))
+
+def _env(prefix, name, default):
+    return float(os.getenv(f'{prefix}_{name}', os.getenv(f'AI_{name}', default)))
+
+class CallGuard:
+    """
+    Per-process bulkhead, deadline, retry policy and circuit breaker for one provider call type
+
+    States: closed (normal), open (fail fast for reset_timeout seconds) and
+    half_open (one probe call decides whether to close or re-open).
+    """
+
+    LATENCY_BUCKETS_MS = (250, 500, 1000, 2500, 5000, 10000, 30000, 60000)
+
+    def __init__(self, name, max_concurrent=8, acquire_timeout=1.0, deadline=45.0, retries=2,
+                 backoff_base=0.5, backoff_max=8.0, failure_threshold=5, reset_timeout=30.0):
+        self.name = name
+        self.max_concurrent = int(max_concurrent)
+        self.acquire_timeout = acquire_timeout
+        self.deadline = deadline
+        self.retries = int(retries)
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.failure_threshold = int(failure_threshold)
+        self.reset_timeout = reset_timeout
+        self._slots = threading.BoundedSemaphore(max(1, self.max_concurrent))
+        self._lock = threading.Lock()
+        self.state = 'closed'
+        self.opened_at = 0.0
+        self.consecutive_failures = 0
+        self.probe_in_flight = False
+        self.in_flight = 0
+        self.transitions = {}
+        self.counters = dict.fromkeys(
+            ('calls', 'successes', 'failures', 'retries', 'rejected', 'short_circuited', 'deadline_exceeded'), 0
+        )
+        self.latency = Histogram(self.LATENCY_BUCKETS_MS)
+
+    @classmethod
+    def from_env(cls, name, prefix, **defaults):
+        """Build a guard from PREFIX_* env vars, falling back to AI_* and then defaults"""
+        settings = {
+            'max_concurrent': _env(prefix, 'MAX_CONCURRENT', defaults.get('max_concurrent', 8)),
+            'acquire_timeout': _env(prefix, 'ACQUIRE_TIMEOUT', defaults.get('acquire_timeout', 1.0)),
+            'deadline': _env(prefix, 'DEADLINE', defaults.get('deadline', 45.0)),
+            'retries': _env(prefix, 'RETRIES', defaults.get('retries', 2)),
+            'backoff_base': _env(prefix, 'BACKOFF_BASE', defaults.get('backoff_base', 0.5)),
+            'backoff_max': _env(prefix, 'BACKOFF_MAX', defaults.get('backoff_max', 8.0)),
+            'failure_threshold': _env(prefix, 'BREAKER_FAILURES', defaults.get('failure_threshold', 5)),
+            'reset_timeout': _env(prefix, 'BREAKER_RESET', defaults.get('reset_timeout', 30.0)),
+        }
+        return cls(name, **settings)
+
+    def _count(self, counter):
+        with self._lock:
+            self.counters[counter] += 1
+
+    def _transition(self, new_state):
+        """Change breaker state; caller holds _lock"""
+        if new_state == self.state:
+            return
+        key = f'{self.state}_to_{new_state}'
+        self.transitions[key] = self.transitions.get(key, 0) + 1
+        log.warning(f"AI circuit '{self.name}' {self.state} -> {new_state}")
+        self.state = new_state
+        if new_state == 'open':
+            self.opened_at = time.monotonic()
+
+    def _admit(self):
+        """Check the breaker and take a bulkhead slot, or raise"""
+        with self._lock:
+            self.counters['calls'] += 1
+            if self.state == 'open':
+                if time.monotonic() - self.opened_at < self.reset_timeout:
+                    self.counters['short_circuited'] += 1
+                    raise CircuitOpen(f'{self.name} circuit is open')
+                self._transition('half_open')
+            if self.state == 'half_open':
+                if self.probe_in_flight:
+                    self.counters['short_circuited'] += 1
+                    raise CircuitOpen(f'{self.name} circuit is half-open, probe in flight')
+                self.probe_in_flight = True
+        if not self._slots.acquire(timeout=self.acquire_timeout):
+            with self._lock:
+                self.probe_in_flight = False
+                self.counters['rejected'] += 1
+            raise BulkheadFull(f'Too many concurrent {self.name} calls')
+        with self._lock:
+            self.in_flight += 1
+
+    def _release(self):
+        with self._lock:
+            self.in_flight -= 1
+            self.probe_in_flight = False
+        self._slots.release()
+
+    def _record_success(self):
+        with self._lock:
+            self.counters['successes'] += 1
+            self.consecutive_failures = 0
+            self._transition('closed')
+
+    def _record_failure(self):
+        """Count a provider failure toward opening the breaker"""
+        with self._lock:
+            self.counters['failures'] += 1
+            self.consecutive_failures += 1
+            if self.state == 'half_open' or self.consecutive_failures >= self.failure_threshold:
+                self._transition('open')
+
+    def _attempts(self, fn, deadline_at):
+        """Call fn(timeout=...) until success, a non-retryable error, or the deadline"""
+        attempt = 0
+        while True:
+            remaining = deadline_at - time.monotonic()
+            if remaining <= 0:
+                self._count('deadline_exceeded')
+                raise DeadlineExceeded(f'{self.name} call exceeded its {self.deadline:.0f}s deadline')
+            try:
+                return fn(timeout=remaining)
+            except Exception as e:
+                if not is_retryable(e):
+                    raise
+                if attempt >= self.retries:
+                    raise RetriesExhausted(f'{self.name} failed after {attempt + 1} attempts: {e}') from e
+                # Full jitter keeps retrying workers from synchronising
+                delay = random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+                if time.monotonic() + delay >= deadline_at:
+                    self._count('deadline_exceeded')
+                    raise DeadlineExceeded(f'{self.name} call exceeded its {self.deadline:.0f}s deadline') from e
+                attempt += 1
+                self._count('retries')
+                time.sleep(delay)
+
+    def call(self, fn):
+        """
+        Run fn under the guard
+
+        Args:
+            fn (callable): Takes a `timeout` keyword (seconds left before the
+                deadline) and performs one attempt
+
+        Returns:
+            Whatever fn returns
+
+        Raises:
+            ServiceUnavailable: Breaker open, bulkhead full, deadline passed or retries exhausted
+            Exception: Non-retryable errors from fn, unchanged
+        """
+        self._admit()
+        start = time.monotonic()
+        try:
+            result = self._attempts(fn, start + self.deadline)
+        except ServiceUnavailable:
+            self._record_failure()
+            raise
+        except Exception:
+            # Request errors (bad input, auth) say nothing about provider health
+            with self._lock:
+                self.probe_in_flight = False
+            raise
+        finally:
+            self.latency.observe((time.monotonic() - start) * 1000)
+            self._release()
+        self._record_success()
+        return result
+
+    def stream(self, fn):
+        """
+        Like call(), for fn returning an iterable stream; yields its items
+
+        Retries only cover opening the stream. The bulkhead slot is held until
+        the stream is exhausted or closed, and the deadline also bounds reading.
+        """
+        self._admit()
+        start = time.monotonic()
+        deadline_at = start + self.deadline
+        try:
+            try:
+                stream = self._attempts(fn, deadline_at)
+                for item in stream:
+                    if time.monotonic() > deadline_at:
+                        self._count('deadline_exceeded')
+                        raise DeadlineExceeded(f'{self.name} stream exceeded its {self.deadline:.0f}s deadline')
+                    yield item
+            except ServiceUnavailable:
+                self._record_failure()
+                raise
+            except Exception as e:
+                if is_retryable(e):
+                    self._record_failure()
+                raise
+            self._record_success()
+        finally:
+            self.latency.observe((time.monotonic() - start) * 1000)
+            self._release()
+
+    def stats(self):
+        with self._lock:
+            return {
+                'state': self.state,
+                'consecutive_failures': self.consecutive_failures,
+                'in_flight': self.in_flight,
+                'max_concurrent': self.max_concurrent,
+                'deadline_seconds': self.deadline,
+                'transitions': dict(self.transitions),
+                **self.counters,
+                'latency': self.latency.to_dict(),
+            }
+
+chat_guard = CallGuard.from_env('openai_chat', 'AI_CHAT', deadline=45.0)
+transcribe_guard = CallGuard.from_env('openai_transcribe', 'AI_TRANSCRIBE', deadline=120.0, max_concurrent=4)
+# Chunks of long recordings get their own slots, sized to the chunk pool, so one long
+# recording neither starves single-shot transcriptions nor loses chunks to them
+transcribe_chunk_guard = CallGuard.from_env(
+    'openai_transcribe_chunk', 'AI_TRANSCRIBE_CHUNK', deadline=120.0,
+    max_concurrent=int(os.getenv('TRANSCRIBE_CONCURRENCY', 4)), acquire_timeout=30.0
+)
+metrics.register('ai_resilience', lambda: {
+    guard.name: guard.stats() for guard in (chat_guard, transcribe_guard, transcribe_chunk_guard)
+})
@@ -3,68 +3,171 @@ Voice Service for TradesMate
 Handles audio recording, transcription, and voice-to-quote processing
 """
 
+import hashlib
+import logging
 import os
 import tempfile
-from openai import OpenAI
+import threading
+import time
+import wave
+from concurrent.futures import FIRST_EXCEPTION, ThreadPoolExecutor, wait
 from werkzeug.utils import secure_filename
+try:
+    from ..cache import SQLiteCache, TTLCache, TwoTierCache
+    from .. import metrics
+    from .ai_backends import backend_name, get_ai_client
+    from .resilience import transcribe_chunk_guard, transcribe_guard
+    from .audio import (
+        AudioDecodeError, analyze_signal, can_decode, chunk_bounds, decode_audio, to_whisper_format, trim_silence
+    )
+except ImportError:
+    from cache import SQLiteCache, TTLCache, TwoTierCache
+    import metrics
+    from services.ai_backends import backend_name, get_ai_client
+    from services.resilience import transcribe_chunk_guard, transcribe_guard
+    from services.audio import (
+        AudioDecodeError, analyze_signal, can_decode, chunk_bounds, decode_audio, to_whisper_format, trim_silence
+    )
+
+# Formats Whisper accepts, keyed by the extension it uses to detect them
+AUDIO_MIME_TYPES = {
+    'mp3': 'audio/mpeg',
+    'mp4': 'audio/mp4',
+    'm4a': 'audio/mp4',
+    'mpeg': 'audio/mpeg',
+    'mpga': 'audio/mpeg',
+    'wav': 'audio/wav',
+    'webm': 'audio/webm',
+    'ogg': 'audio/ogg',
+    'oga': 'audio/ogg',
+    'flac': 'audio/flac',
+}
+
+log = logging.getLogger(__name__)
+
+# Bump whenever the Whisper model or request options change so cached transcripts are not reused
+TRANSCRIBE_VERSION = 'whisper-1/en/verbose_json-v1'
+
+# Resubmitted recordings (flaky mobile uploads, retries) are served from here instead of Whisper
+transcript_cache = TwoTierCache(
+    memory=TTLCache(
+        maxsize=int(os.getenv('TRANSCRIBE_CACHE_MEMORY_SIZE', 128)),
+        ttl=float(os.getenv('TRANSCRIBE_CACHE_TTL', 30 * 86400))
+    ),
+    disk=SQLiteCache(
+        os.getenv('TRANSCRIBE_CACHE_DB', os.path.join(tempfile.gettempdir(), 'tradesmate_transcripts.db')),
+        ttl=float(os.getenv('TRANSCRIBE_CACHE_TTL', 30 * 86400)),
+        max_entries=int(os.getenv('TRANSCRIBE_CACHE_MAX_ENTRIES', 5000))
+    )
+)
+metrics.register('transcript_cache', transcript_cache.stats)
+
+# Per-digest locks so concurrent resubmissions wait for the first transcription
+_digest_locks = {}
+_digest_locks_guard = threading.Lock()
+
+def audio_digest(stream, chunk_size=1024 * 1024):
+    """
+    SHA-256 of a stream's remaining bytes, read in chunks so the upload is never copied whole
+    
+    The stream position is restored afterwards.
+    """
+    position = stream.tell()
+    digest = hashlib.sha256()
+    try:
+        while True:
+            chunk = stream.read(chunk_size)
+            if not chunk:
+                break
+            digest.update(chunk)
+    finally:
+        stream.seek(position)
+    return digest.hexdigest()
+
+# Whisper API upload limit
+WHISPER_MAX_BYTES = 25 * 1024 * 1024
+
+_chunk_executor = None
+_chunk_executor_pid = None
+_chunk_executor_workers = None
+_chunk_lock = threading.Lock()
+
+def _chunk_pool(workers):
+    """
+    Thread pool for concurrent chunk uploads, created lazily per (post-fork) process
+    
+    A request for a different worker count replaces the pool; chunks already
+    queued on the old one still finish.
+    """
+    global _chunk_executor, _chunk_executor_pid, _chunk_executor_workers
+    with _chunk_lock:
+        if _chunk_executor is None or _chunk_executor_pid != os.getpid() or _chunk_executor_workers != workers:
+            if _chunk_executor is not None and _chunk_executor_pid == os.getpid():
+                _chunk_executor.shutdown(wait=False)
+            _chunk_executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='whisper-chunk')
+            _chunk_executor_pid = os.getpid()
+            _chunk_executor_workers = workers
+        return _chunk_executor
 
 class VoiceService:
     """Service for voice recording and transcription"""
     
     def __init__(self):
-        self.client = OpenAI(
-            api_key=os.getenv('OPENAI_API_KEY'),
-            base_url=os.getenv('OPENAI_API_BASE')
-        )
         self.allowed_extensions = os.getenv('ALLOWED_AUDIO_EXTENSIONS', 'mp3,wav,m4a,webm,ogg,flac').split(',')
         self.max_file_size = int(os.getenv('MAX_CONTENT_LENGTH', 26214400))  # 25MB
+        # Recordings longer than this are split on pauses and transcribed in parallel
+        self.chunk_seconds = float(os.getenv('TRANSCRIBE_CHUNK_SECONDS', 300))
+        self.chunk_concurrency = max(1, int(os.getenv('TRANSCRIBE_CONCURRENCY', 4)))
+        # Compressed uploads smaller than this are sent whole without decoding
+        self.chunk_min_bytes = int(os.getenv('TRANSCRIBE_CHUNK_MIN_BYTES', 4 * 1024 * 1024))
+        # Opt-in: downmix, resample to 16 kHz and trim silence before uploading
+        self.preprocess = os.getenv('TRANSCRIBE_PREPROCESS', 'false').lower() == 'true'
+        self.trim_pad_ms = int(os.getenv('TRANSCRIBE_TRIM_PAD_MS', 250))
+        self.cache_enabled = os.getenv('TRANSCRIBE_CACHE', 'true').lower() == 'true'
+        # Recordings failing these checks are rejected before any paid API call
+        self.quality_gate = os.getenv('AUDIO_QUALITY_GATE', 'true').lower() == 'true'
+        self.min_duration = float(os.getenv('AUDIO_MIN_SECONDS', 1.0))
+        self.silence_dbfs = float(os.getenv('AUDIO_SILENCE_DBFS', -45.0))
+        self.max_silence_ratio = float(os.getenv('AUDIO_MAX_SILENCE_RATIO', 0.9))
+        self.max_clipping_ratio = float(os.getenv('AUDIO_MAX_CLIPPING_RATIO', 0.01))
+        # Noisier recordings get a recommendation, not a rejection
+        self.min_snr_db = float(os.getenv('AUDIO_MIN_SNR_DB', 10.0))
+    
+    @property
+    def client(self):
+        """Client from the configured transcription backend (AI_BACKEND), or None when no API key is set"""
+        return get_ai_client('transcribe')
     
-    def transcribe_audio(self, audio_file):
+    def transcribe_audio(self, audio_file, preprocess=None):
         """
         Transcribe audio file using OpenAI Whisper
         
         Args:
             audio_file: File object or file path
+            preprocess (bool): Downmix, resample and trim silence first
+                (see preprocess_audio); defaults to TRANSCRIBE_PREPROCESS
             
         Returns:
-            dict: Transcription result with text and metadata
+            dict: Transcription result with text and metadata, plus
+            'preprocessing' stats when the stage ran
         """
+        if preprocess is None:
+            preprocess = self.preprocess
         try:
-            # If it's a file object, save it temporarily
+            if self.client is None:
+                return {
+                    'success': False,
+                    'error': 'Transcription unavailable: OPENAI_API_KEY is not set'
+                }
+            
             if hasattr(audio_file, 'read'):
-                with tempfile.NamedTemporaryFile(delete=False, suffix='.wav') as temp_file:
-                    audio_file.seek(0)
-                    temp_file.write(audio_file.read())
-                    temp_file_path = temp_file.name
-                
-                try:
-                    with open(temp_file_path, 'rb') as audio_data:
-                        transcript = self.client.audio.transcriptions.create(
-                            model="whisper-1",
-                            file=audio_data,
-                            response_format="verbose_json",
-                            language="en"
-                        )
-                finally:
-                    # Clean up temporary file
-                    os.unlink(temp_file_path)
-            else:
-                # If it's a file path
-                with open(audio_file, 'rb') as audio_data:
-                    transcript = self.client.audio.transcriptions.create(
-                        model="whisper-1",
-                        file=audio_data,
-                        response_format="verbose_json",
-                        language="en"
-                    )
+                filename, content_type = self.upload_name_and_type(audio_file)
+                return self._transcribe_cached(getattr(audio_file, 'stream', audio_file), filename, content_type, preprocess)
             
-            return {
-                'success': True,
-                'text': transcript.text,
-                'language': getattr(transcript, 'language', 'en'),
-                'duration': getattr(transcript, 'duration', None),
-                'segments': getattr(transcript, 'segments', [])
-            }
+            # If it's a file path
+            filename, content_type = self.upload_name_and_type(None, audio_file)
+            with open(audio_file, 'rb') as audio_data:
+                return self._transcribe_cached(audio_data, filename, content_type, preprocess)
             
         except Exception as e:
             return {
@@ -72,62 +175,297 @@ class VoiceService:
                 'error': f'Transcription failed: {str(e)}'
             }
     
+    def _transcribe_cached(self, stream, filename, content_type, preprocess):
+        """
+        Serve identical audio from the transcript cache, keyed on the SHA-256 of its bytes
+        
+        Concurrent submissions of the same recording in this process wait
+        for the first one instead of calling Whisper again.
+        """
+        if not self.cache_enabled or not getattr(stream, 'seekable', lambda: False)():
+            return self._transcribe_file(stream, filename, content_type, preprocess)
+        
+        options = f'trim{self.trim_pad_ms}' if preprocess else 'raw'
+        # Keyed per backend, so local-engine transcripts are never served as Whisper's
+        key = f'{TRANSCRIBE_VERSION}:{backend_name("transcribe")}:{options}:{audio_digest(stream)}'
+        with _digest_locks_guard:
+            entry = _digest_locks.setdefault(key, [threading.Lock(), 0])
+            entry[1] += 1
+        try:
+            with entry[0]:
+                cached = transcript_cache.get(key)
+                if cached is not None:
+                    cached['cached'] = True
+                    return cached
+                result = self._transcribe_file(stream, filename, content_type, preprocess)
+                if result.get('success'):
+                    transcript_cache.set(key, result)
+                return result
+        finally:
+            with _digest_locks_guard:
+                entry[1] -= 1
+                if not entry[1]:
+                    del _digest_locks[key]
+    
+    def _transcribe_file(self, stream, filename, content_type, preprocess=False):
+        """Transcribe in one request, or in parallel chunks when the recording is long"""
+        if preprocess:
+            prepared = self.preprocess_audio(stream, filename)
+            if prepared is not None:
+                return self._transcribe_prepared(*prepared)
+        
+        audio = self._audio_for_chunking(stream, filename)
+        if audio is not None:
+            return self._transcribe_chunked(audio)
+        
+        # Stream the upload straight into the multipart request body
+        return self._transcript_result(self._transcribe_stream(stream, filename, content_type))
+    
+    def _transcript_result(self, transcript):
+        return {
+            'success': True,
+            'text': transcript.text,
+            'language': getattr(transcript, 'language', 'en'),
+            'duration': getattr(transcript, 'duration', None),
+            'segments': self._segments(transcript)
+        }
+    
+    def preprocess_audio(self, stream, filename):
+        """
+        Downmix to mono, resample to 16 kHz and trim silence ahead of transcription
+        
+        Whisper bills per minute and resamples to 16 kHz mono anyway, so dead
+        air and extra channels only add upload time, latency and cost.
+        
+        Args:
+            stream: Seekable binary stream (position is left unchanged)
+            filename (str): Name used to pick the decoder
+            
+        Returns:
+            tuple: (SilenceTrim, stats dict), or None when the format cannot be decoded
+        """
+        if not can_decode(filename) or not getattr(stream, 'seekable', lambda: False)():
+            return None
+        position = stream.tell()
+        size = stream.seek(0, 2) - position
+        stream.seek(position)
+        
+        started = time.perf_counter()
+        try:
+            audio = decode_audio(stream, filename)
+        except AudioDecodeError:
+            return None
+        trim = trim_silence(to_whisper_format(audio), pad_ms=self.trim_pad_ms, silence_dbfs=self.silence_dbfs)
+        
+        processed_bytes = trim.audio.frames * 2 + 44  # 16-bit mono WAV
+        stats = {
+            'original_format': f'{audio.sample_rate} Hz, {audio.channels} channel(s)',
+            'original_bytes': size,
+            'processed_bytes': processed_bytes,
+            'bytes_saved': size - processed_bytes,
+            'original_duration': round(audio.duration, 3),
+            'processed_duration': round(trim.audio.duration, 3),
+            'seconds_removed': round(trim.seconds_removed, 3),
+            'elapsed_ms': round((time.perf_counter() - started) * 1000, 1)
+        }
+        log.info('Preprocessed %s: %.1fs of silence removed, %d bytes saved',
+                 filename, stats['seconds_removed'], stats['bytes_saved'])
+        return trim, stats
+    
+    def _transcribe_prepared(self, trim, stats):
+        """Transcribe preprocessed audio, reporting segment times on the original recording"""
+        audio = trim.audio
+        if audio.frames == 0:
+            result = {'success': True, 'text': '', 'language': 'en', 'segments': []}
+        elif audio.duration > self.chunk_seconds or audio.frames * 2 > WHISPER_MAX_BYTES:
+            result = self._transcribe_chunked(audio)
+        else:
+            result = self._transcript_result(self._transcribe_stream(audio.to_wav(), 'recording.wav', 'audio/wav'))
+        
+        for segment in result['segments']:
+            for key in ('start', 'end'):
+                if isinstance(segment.get(key), (int, float)):
+                    segment[key] = round(trim.source_time(segment[key]), 3)
+        result['duration'] = stats['original_duration']
+        result['preprocessing'] = stats
+        return result
+    
+    def _audio_for_chunking(self, stream, filename):
+        """
+        Decoded audio when the recording should be chunked, otherwise None
+        
+        WAV length is read from the header; compressed formats are only
+        decoded when the upload is large enough to possibly need it.
+        """
+        if not can_decode(filename) or not getattr(stream, 'seekable', lambda: False)():
+            return None
+        position = stream.tell()
+        size = stream.seek(0, 2) - position
+        stream.seek(position)
+        
+        if filename.lower().endswith('.wav'):
+            try:
+                with wave.open(stream, 'rb') as reader:
+                    seconds = reader.getnframes() / float(reader.getframerate() or 1)
+            except (wave.Error, EOFError):
+                return None
+            finally:
+                stream.seek(position)
+            if seconds <= self.chunk_seconds and size <= WHISPER_MAX_BYTES:
+                return None
+        elif size < self.chunk_min_bytes:
+            return None
+        
+        try:
+            audio = decode_audio(stream, filename)
+        except AudioDecodeError:
+            return None
+        if audio.duration <= self.chunk_seconds and size <= WHISPER_MAX_BYTES:
+            return None
+        return audio
+    
+    def _transcribe_chunked(self, audio):
+        """
+        Split on pauses, transcribe chunks concurrently and stitch the results in order
+        
+        Chunk length is also capped so each chunk's WAV stays under Whisper's upload limit.
+        """
+        max_seconds = min(self.chunk_seconds, WHISPER_MAX_BYTES * 0.95 / audio.bytes_per_second)
+        bounds = chunk_bounds(audio, max_seconds)
+        
+        def transcribe_chunk(index, start, end):
+            transcript = self._transcribe_stream(
+                audio.slice(start, end).to_wav(), f'chunk-{index:03d}.wav', 'audio/wav', transcribe_chunk_guard
+            )
+            return transcript, start / audio.sample_rate
+        
+        pool = _chunk_pool(self.chunk_concurrency)
+        futures = [pool.submit(transcribe_chunk, i, start, end) for i, (start, end) in enumerate(bounds)]
+        done, pending = wait(futures, return_when=FIRST_EXCEPTION)
+        failed = next((future for future in futures if future in done and future.exception()), None)
+        if failed is not None:
+            # The recording cannot be stitched without every chunk, so don't send (and pay for) the rest
+            for future in pending:
+                future.cancel()
+            raise failed.exception()
+        # Collect in submission order, so text and segments stay in recording order
+        results = [future.result() for future in futures]
+        
+        texts = []
+        segments = []
+        for transcript, offset in results:
+            text = (transcript.text or '').strip()
+            if text:
+                texts.append(text)
+            for segment in self._segments(transcript):
+                segment = dict(segment)
+                segment['id'] = len(segments)
+                for key in ('start', 'end'):
+                    if isinstance(segment.get(key), (int, float)):
+                        segment[key] = round(segment[key] + offset, 3)
+                if isinstance(segment.get('seek'), int):
+                    segment['seek'] += int(round(offset * 100))  # 10 ms units
+                segments.append(segment)
+        
+        return {
+            'success': True,
+            'text': ' '.join(texts),
+            'language': getattr(results[0][0], 'language', 'en'),
+            'duration': round(audio.duration, 3),
+            'segments': segments,
+            'chunks': len(bounds)
+        }
+    
+    def _segments(self, transcript):
+        """verbose_json segments as plain dicts"""
+        segments = getattr(transcript, 'segments', None) or []
+        return [segment if isinstance(segment, dict) else segment.model_dump() for segment in segments]
+    
+    def _transcribe_stream(self, stream, filename, content_type, guard=transcribe_guard):
+        """
+        Send a file object to Whisper under a transcription guard
+        
+        httpx reads the stream in chunks while encoding the request, so no
+        copy of the audio is made; each retry rewinds to the starting offset.
+        """
+        client = self.client
+        offset = stream.tell() if getattr(stream, 'seekable', lambda: False)() else None
+        
+        def attempt(timeout):
+            if offset is not None:
+                stream.seek(offset)
+            return client.audio.transcriptions.create(
+                model="whisper-1",
+                file=(filename, stream, content_type),
+                response_format="verbose_json",
+                language="en",
+                timeout=timeout
+            )
+        
+        return guard.call(attempt)
+    
+    def upload_name_and_type(self, audio_file, path=None):
+        """
+        Filename and MIME type to send to Whisper, which detects the format from the extension
+        
+        Args:
+            audio_file: Upload (FileStorage) or None
+            path (str): File path when there is no upload object
+            
+        Returns:
+            tuple: (filename, content_type)
+        """
+        original = path or getattr(audio_file, 'filename', None) or getattr(audio_file, 'name', None) or ''
+        filename = secure_filename(os.path.basename(str(original)))
+        extension = filename.rsplit('.', 1)[-1].lower() if '.' in filename else ''
+        
+        content_type = getattr(audio_file, 'mimetype', None)  # without ';codecs=...'
+        if not content_type or content_type == 'application/octet-stream':
+            content_type = AUDIO_MIME_TYPES.get(extension, 'application/octet-stream')
+        
+        if extension not in AUDIO_MIME_TYPES:
+            # Name it after the declared type so Whisper can decode it
+            extension = next(
+                (ext for ext, mime in AUDIO_MIME_TYPES.items() if mime == content_type), 'wav'
+            )
+            filename = f'{filename.rsplit(".", 1)[0] or "audio"}.{extension}'
+        return filename, content_type
+    
     def analyze_audio_quality(self, audio_file):
         """
         Analyze audio file quality and provide recommendations
         
+        Formats with a registered decoder are measured from the signal itself
+        (duration, level, clipping, silence, SNR); others, and files the
+        decoder cannot read, fall back to an estimate from the file size,
+        which never rejects. The stream position is left unchanged.
+        
         Args:
             audio_file: File object
             
         Returns:
-            dict: Quality analysis results
+            dict: Quality analysis results; 'acceptable' is False when the
+            recording is not worth sending for transcription
         """
         try:
-            # Get file size
-            audio_file.seek(0, 2)  # Seek to end
-            file_size = audio_file.tell()
-            audio_file.seek(0)  # Reset to beginning
-            
-            # Basic quality checks
-            quality_score = 1.0
-            recommendations = []
-            
-            # Check file size
-            if file_size > self.max_file_size:
-                quality_score -= 0.3
-                recommendations.append(f"File size ({file_size / 1024 / 1024:.1f}MB) exceeds recommended limit")
-            elif file_size < 10000:  # Less than 10KB
-                quality_score -= 0.4
-                recommendations.append("File size is very small, audio may be too short or low quality")
-            
-            # Estimate duration based on file size (rough estimate)
-            estimated_duration = file_size / 16000  # Rough estimate for compressed audio
-            
-            if estimated_duration < 1:
-                quality_score -= 0.2
-                recommendations.append("Recording appears very short (< 1 second)")
-            elif estimated_duration > 300:  # 5 minutes
-                quality_score -= 0.1
-                recommendations.append("Recording is quite long, consider breaking into smaller segments")
-            
-            # Quality assessment
-            if quality_score >= 0.8:
-                quality_level = "Excellent"
-            elif quality_score >= 0.6:
-                quality_level = "Good"
-            elif quality_score >= 0.4:
-                quality_level = "Fair"
-            else:
-                quality_level = "Poor"
+            stream = getattr(audio_file, 'stream', audio_file)
+            position = stream.tell()
+            file_size = stream.seek(0, 2) - position
+            stream.seek(position)
             
-            return {
-                'success': True,
-                'quality_score': round(quality_score, 2),
-                'quality_level': quality_level,
-                'file_size': file_size,
-                'estimated_duration': round(estimated_duration, 1),
-                'recommendations': recommendations
-            }
+            filename, _ = self.upload_name_and_type(audio_file)
+            if can_decode(filename):
+                try:
+                    audio = decode_audio(stream, filename)
+                except AudioDecodeError as e:
+                    # Only measured signal metrics reject a recording; Whisper may still accept this one
+                    log.info('Quality check could not decode %s, using size estimate: %s', filename, e)
+                    result = self._size_quality(file_size)
+                    result['decode_error'] = str(e)
+                    return result
+                return self._signal_quality(analyze_signal(audio, silence_dbfs=self.silence_dbfs), file_size)
+            
+            return self._size_quality(file_size)
             
         except Exception as e:
             return {
@@ -135,6 +473,114 @@ class VoiceService:
                 'error': f'Quality analysis failed: {str(e)}'
             }
     
+    def _signal_quality(self, metrics, file_size):
+        """Score decoded-signal metrics; any rejection reason makes the recording unacceptable"""
+        quality_score = 1.0
+        recommendations = []
+        rejected = False
+        
+        duration = metrics['duration']
+        if duration < self.min_duration:
+            quality_score -= 0.5
+            rejected = True
+            recommendations.append(f"Recording is too short ({duration:.1f}s), please describe the job in more detail")
+        elif duration > 300:  # 5 minutes
+            quality_score -= 0.1
+            recommendations.append("Recording is quite long, consider breaking into smaller segments")
+        
+        if metrics['silence_ratio'] > self.max_silence_ratio:
+            quality_score -= 0.5
+            rejected = True
+            recommendations.append("Recording is almost entirely silent, check the microphone")
+        elif metrics['silence_ratio'] > 0.5:
+            quality_score -= 0.1
+            recommendations.append("Recording contains long pauses")
+        
+        if metrics['rms_dbfs'] < self.silence_dbfs:
+            quality_score -= 0.4
+            rejected = True
+            recommendations.append("Recording level is too low, speak closer to the microphone")
+        elif metrics['rms_dbfs'] < -35:
+            quality_score -= 0.1
+            recommendations.append("Recording level is quiet, speak closer to the microphone")
+        
+        if metrics['clipping_ratio'] > self.max_clipping_ratio:
+            quality_score -= 0.4
+            rejected = True
+            recommendations.append("Recording is heavily distorted (clipping), hold the phone further away")
+        elif metrics['clipping_ratio'] > 0.001:
+            quality_score -= 0.1
+            recommendations.append("Some distortion detected, hold the phone a little further away")
+        
+        # SNR is meaningless for silent or near-silent recordings, already reported above,
+        # and unknown without pauses to measure the noise in. The estimate is rough, so it
+        # only lowers the score and never rejects the recording on its own
+        snr_db = metrics.get('snr_db')
+        audible = metrics['silence_ratio'] <= self.max_silence_ratio and metrics['rms_dbfs'] >= self.silence_dbfs
+        if audible and snr_db is not None and snr_db < self.min_snr_db:
+            quality_score -= 0.2
+            recommendations.append("Background noise is drowning out speech, move somewhere quieter")
+        elif audible and snr_db is not None and snr_db < 20:
+            quality_score -= 0.1
+            recommendations.append("Background noise is noticeable, move somewhere quieter if possible")
+        
+        quality_score = max(quality_score, 0.0)
+        return {
+            'success': True,
+            'method': 'signal',
+            'acceptable': not rejected,
+            'quality_score': round(quality_score, 2),
+            'quality_level': self._quality_level(quality_score),
+            'file_size': file_size,
+            'duration': duration,
+            'estimated_duration': round(duration, 1),
+            'metrics': metrics,
+            'recommendations': recommendations
+        }
+    
+    def _size_quality(self, file_size):
+        """Rough quality estimate from file size, for formats that cannot be decoded here"""
+        quality_score = 1.0
+        recommendations = []
+        
+        # Check file size
+        if file_size > self.max_file_size:
+            quality_score -= 0.3
+            recommendations.append(f"File size ({file_size / 1024 / 1024:.1f}MB) exceeds recommended limit")
+        elif file_size < 10000:  # Less than 10KB
+            quality_score -= 0.4
+            recommendations.append("File size is very small, audio may be too short or low quality")
+        
+        # Estimate duration based on file size (rough estimate)
+        estimated_duration = file_size / 16000  # Rough estimate for compressed audio
+        
+        if estimated_duration < 1:
+            quality_score -= 0.2
+            recommendations.append("Recording appears very short (< 1 second)")
+        elif estimated_duration > 300:  # 5 minutes
+            quality_score -= 0.1
+            recommendations.append("Recording is quite long, consider breaking into smaller segments")
+        
+        return {
+            'success': True,
+            'method': 'size_estimate',
+            'acceptable': True,  # too uncertain to reject on
+            'quality_score': round(quality_score, 2),
+            'quality_level': self._quality_level(quality_score),
+            'file_size': file_size,
+            'estimated_duration': round(estimated_duration, 1),
+            'recommendations': recommendations
+        }
+    
+    def _quality_level(self, quality_score):
+        if quality_score >= 0.8:
+            return "Excellent"
+        elif quality_score >= 0.6:
+            return "Good"
+        elif quality_score >= 0.4:
+            return "Fair"
+        return "Poor"
+    
     def is_allowed_file(self, filename):
         """Check if file extension is allowed"""
         if not filename:
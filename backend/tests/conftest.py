@@ -0,0 +1,78 @@
+"""
+Shared fixtures for the TradesMate backend tests
+
+Run from the backend directory:
+    python -m pytest -q
+"""
+
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+# Keep limiter buckets and AI caches out of the shared temp files, hash
+# passwords inline and cheaply, and never call OpenAI. Set before any src
+# import, since these are read at import time.
+_state_dir = tempfile.mkdtemp(prefix='tradesmate-tests-')
+os.environ.update({
+    'RATE_LIMIT_DB': os.path.join(_state_dir, 'ratelimit.db'),
+    'AI_CACHE_DB': os.path.join(_state_dir, 'ai_cache.db'),
+    'TRANSCRIBE_CACHE_DB': os.path.join(_state_dir, 'transcripts.db'),
+    'PASSWORD_HASH_WORKERS': '0',
+    'PASSWORD_HASH_ITERATIONS': '1000',
+    'AI_BACKEND': 'local',
+    'LOCAL_AI_PROFILE': 'instant',
+})
+
+# Add the backend directory to Python path so `src` imports as a package
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import pytest
+
+
+@pytest.fixture
+def app(tmp_path):
+    from src.main import create_app
+    from src.database import db
+    from src.services.identity import identity_cache
+    from src.services.numbering import quote_numbers
+    from src.services.rate_limiter import bucket_store
+
+    # Cached profiles and reserved number blocks are per process, but each test gets a fresh database
+    identity_cache.clear()
+    bucket_store._connection().execute('DELETE FROM buckets')
+    quote_numbers._blocks.clear()
+    app = create_app({
+        'TESTING': True,
+        'SQLALCHEMY_DATABASE_URI': f'sqlite:///{tmp_path / "test.db"}',
+    })
+    yield app
+    with app.app_context():
+        db.session.remove()
+        db.engine.dispose()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def user(app):
+    from src.database import db
+    from src.models.user import User
+
+    with app.app_context():
+        user = User(name='Test Trader', email='trader@example.com', trade_type='Electrician', hourly_rate=50.0)
+        user.set_password('correct horse')
+        db.session.add(user)
+        db.session.commit()
+        return user.id
+
+
+@pytest.fixture
+def auth_client(client, user):
+    """Test client signed in as the test user (the register route is rate limited per IP)"""
+    with client.session_transaction() as session:
+        session['user_id'] = user
+    return client
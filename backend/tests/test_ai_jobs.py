@@ -0,0 +1,135 @@
+import threading
+import time
+from datetime import datetime, timedelta
+
+import pytest
+
+from src.database import db
+from src.models.ai_job import AIJob
+from src.services import ai_jobs as ai_jobs_module
+from src.services.ai_jobs import AIJobFailed, AIJobQueueFull, AIJobRunner
+
+
+@pytest.fixture
+def runner(monkeypatch):
+    monkeypatch.setenv('AI_JOB_WORKERS', '1')
+    monkeypatch.setenv('AI_JOB_QUEUE', '2')
+    runner = AIJobRunner()
+    yield runner
+    if runner._executor is not None:
+        runner._executor.shutdown(wait=True)
+
+
+def submit(app, runner, user, fn, *args):
+    with app.test_request_context():
+        return runner.submit('voice_to_quote', user, fn, *args).id
+
+
+def wait_idle(runner, timeout=5):
+    deadline = time.monotonic() + timeout
+    while runner.pending and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert runner.pending == 0
+
+
+def test_submit_then_poll_for_the_result(app, auth_client, user, runner):
+    job_id = submit(app, runner, user, lambda value: {'success': True, 'pending': runner.pending, 'value': value}, 7)
+    wait_idle(runner)
+
+    job = auth_client.get(f'/api/jobs/{job_id}').get_json()['job']
+    assert job['status'] == 'succeeded' and job['started_at'] and job['finished_at']
+    # Counted as pending before the worker could pick it up
+    assert job['result'] == {'success': True, 'pending': 1, 'value': 7}
+    assert runner.stats()['succeeded'] == 1 and runner.stats()['submitted'] == 1
+
+
+def test_failed_job_reports_its_error(app, auth_client, user, runner):
+    def fail():
+        raise AIJobFailed('Transcript too short', 400)
+
+    job_id = submit(app, runner, user, fail)
+    wait_idle(runner)
+    job = auth_client.get(f'/api/jobs/{job_id}').get_json()['job']
+    assert job['status'] == 'failed' and job['error'] == 'Transcript too short'
+    assert runner.failed == 1
+
+
+def test_jobs_are_visible_to_their_owner_only(app, client, user, runner):
+    job_id = submit(app, runner, user, dict)
+    wait_idle(runner)
+    assert client.get(f'/api/jobs/{job_id}').status_code == 401
+
+    with app.app_context():
+        db.session.add(AIJob(id='f' * 32, user_id=user + 1, kind='voice_to_quote', status='queued'))
+        db.session.commit()
+    with client.session_transaction() as session:
+        session['user_id'] = user
+    assert client.get(f'/api/jobs/{job_id}').status_code == 200
+    assert client.get(f'/api/jobs/{"f" * 32}').status_code == 404
+    assert client.get('/api/jobs/missing').status_code == 404
+
+
+def test_full_queue_rejects_and_frees_slots(app, user, runner):
+    release = threading.Event()
+    for _ in range(2):
+        submit(app, runner, user, release.wait)
+    with pytest.raises(AIJobQueueFull):
+        submit(app, runner, user, release.wait)
+    assert runner.rejected == 1 and runner.pending == 2
+
+    release.set()
+    wait_idle(runner)
+    submit(app, runner, user, dict)
+    wait_idle(runner)
+    assert runner.stats()['submitted'] == 3
+
+
+def test_failed_scheduling_returns_the_slot(app, user, runner, monkeypatch):
+    class BrokenPool:
+        def submit(self, *args):
+            raise RuntimeError('pool shut down')
+
+    monkeypatch.setattr(runner, '_get_executor', lambda: BrokenPool())
+    with pytest.raises(RuntimeError):
+        submit(app, runner, user, dict)
+    assert runner.pending == 0 and runner.submitted == 0
+    assert runner._slots.acquire(blocking=False) and runner._slots.acquire(blocking=False)
+
+
+def test_poll_expires_jobs_past_the_deadline(app, auth_client, user, monkeypatch):
+    monkeypatch.setattr(ai_jobs_module.ai_jobs, 'expired', 0)
+    with app.app_context():
+        old = datetime.utcnow() - ai_jobs_module.ai_jobs.deadline - timedelta(seconds=1)
+        db.session.add_all([
+            AIJob(id='a' * 32, user_id=user, kind='voice_to_quote', status='running', created_at=old),
+            AIJob(id='b' * 32, user_id=user, kind='voice_to_quote', status='queued'),
+        ])
+        db.session.commit()
+
+    stale = auth_client.get(f'/api/jobs/{"a" * 32}')
+    assert stale.get_json()['job']['status'] == 'failed' and 'Retry-After' not in stale.headers
+    assert 'did not finish in time' in stale.get_json()['job']['error']
+    fresh = auth_client.get(f'/api/jobs/{"b" * 32}')
+    assert fresh.get_json()['job']['status'] == 'queued' and fresh.headers['Retry-After']
+    assert ai_jobs_module.ai_jobs.expired == 1
+
+
+def test_late_result_of_an_expired_job_is_discarded(app, user, runner):
+    started, release = threading.Event(), threading.Event()
+
+    def slow():
+        started.set()
+        release.wait()
+        return {'success': True}
+
+    job_id = submit(app, runner, user, slow)
+    assert started.wait(5)
+    runner.deadline = timedelta(0)
+    with app.app_context():
+        assert runner.expire_if_stale(db.session.get(AIJob, job_id))
+
+    release.set()
+    wait_idle(runner)
+    with app.app_context():
+        assert db.session.get(AIJob, job_id).status == 'failed'
+    assert runner.expired == 1 and runner.succeeded == 0
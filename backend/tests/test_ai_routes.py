@@ -0,0 +1,72 @@
+import io
+import logging
+
+import pytest
+
+from src.database import db
+from src.models.user import User
+
+TRANSCRIPT = 'Replace the consumer unit in a three bed semi and add two double sockets in the kitchen'
+
+
+def test_ai_routes_are_mounted(app):
+    rules = {rule.rule for rule in app.url_map.iter_rules()}
+    assert {'/api/voice/transcribe', '/api/voice/voice-to-quote', '/api/voice/voice-to-quote/stream',
+            '/api/photo/analyze-note', '/api/photo/analyze-note/async'} <= rules
+
+
+def test_ai_routes_share_a_per_user_rate_limit(auth_client):
+    for _ in range(5):
+        response = auth_client.post('/api/voice/test-transcript', json={'transcript': TRANSCRIPT})
+        assert response.status_code == 200, response.get_json()
+    limited = auth_client.post('/api/voice/test-transcript', json={'transcript': TRANSCRIPT})
+    assert limited.status_code == 429
+    assert int(limited.headers['Retry-After']) >= 1
+    # The photo routes draw from the same 'ai' bucket
+    assert auth_client.post('/api/photo/analyze-note').status_code == 429
+
+
+@pytest.mark.parametrize('path', [
+    '/api/voice/transcribe', '/api/voice/voice-to-quote', '/api/voice/voice-to-quote/async',
+    '/api/voice/voice-to-quote/stream', '/api/voice/test-transcript',
+    '/api/photo/analyze-note', '/api/photo/analyze-note/async',
+])
+def test_ai_routes_require_authentication(client, user, path):
+    assert client.post(path, json={'transcript': TRANSCRIPT}).status_code == 401
+
+
+def test_ai_routes_use_the_signed_in_users_settings(app, client, user):
+    with app.app_context():
+        other = User(name='Other Trader', email='other@example.com', trade_type='Plumber', hourly_rate=80.0)
+        other.set_password('correct horse')
+        db.session.add(other)
+        db.session.commit()
+        other_id = other.id
+    with client.session_transaction() as session:
+        session['user_id'] = other_id
+
+    response = client.post('/api/voice/test-transcript', json={'transcript': TRANSCRIPT})
+    assert response.status_code == 200
+    assert response.get_json()['quote_data']['labour_rate'] == 80.0
+
+
+def test_test_transcript_is_hidden_outside_debug_and_testing(app, auth_client):
+    app.testing = False
+    assert auth_client.post('/api/voice/test-transcript', json={'transcript': TRANSCRIPT}).status_code == 404
+
+
+def test_photo_note_without_an_ocr_engine_is_unavailable(auth_client, monkeypatch):
+    monkeypatch.setenv('OCR_ENGINE', 'not-installed')
+    response = auth_client.post('/api/photo/analyze-note',
+                                data={'photo': (io.BytesIO(b'P5\n1 1\n255\n\x00'), 'note.pgm')})
+    assert response.status_code == 503
+    assert 'No OCR engine available' in response.get_json()['error']
+
+
+def test_missing_ocr_engine_is_logged_at_startup(tmp_path, monkeypatch, caplog):
+    from src.main import create_app
+
+    monkeypatch.setenv('OCR_ENGINE', 'not-installed')
+    with caplog.at_level(logging.WARNING, logger='src.main'):
+        create_app({'TESTING': True, 'SQLALCHEMY_DATABASE_URI': f'sqlite:///{tmp_path / "test.db"}'})
+    assert [record for record in caplog.records if 'No OCR engine available' in record.getMessage()]
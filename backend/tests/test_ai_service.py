@@ -0,0 +1,38 @@
+from src.cache import SQLiteCache, TTLCache, TwoTierCache
+from src.services import ai_service
+from src.services.ai_service import quote_cache_key
+
+
+def test_quote_cache_key_normalizes_input():
+    key = quote_cache_key('transcript', 'Replace  the\nFuse box', 'Electrician', 45)
+    assert key == quote_cache_key('transcript', 'replace the fuse box ', 'electrician', 45.0)
+    assert key != quote_cache_key('transcript', 'replace the fuse box', 'electrician', 50)
+    assert key != quote_cache_key('photo', 'replace the fuse box', 'electrician', 45)
+
+
+def test_quote_cache_key_includes_chat_backend(monkeypatch):
+    monkeypatch.setenv('AI_BACKEND', 'local')
+    local = quote_cache_key('transcript', 'replace the fuse box', 'electrician', 45)
+    monkeypatch.setenv('AI_BACKEND', 'openai')
+    assert quote_cache_key('transcript', 'replace the fuse box', 'electrician', 45) != local
+    monkeypatch.setenv('AI_CHAT_BACKEND', 'local')
+    assert quote_cache_key('transcript', 'replace the fuse box', 'electrician', 45) == local
+
+
+def test_quote_cache_key_includes_prompt_version(monkeypatch):
+    key = quote_cache_key('transcript', 'replace the fuse box', 'electrician', 45)
+    monkeypatch.setattr(ai_service, 'PROMPT_VERSION', 'gpt-4/next')
+    assert quote_cache_key('transcript', 'replace the fuse box', 'electrician', 45) != key
+
+
+def test_repeat_transcript_is_served_from_the_cache(monkeypatch):
+    monkeypatch.setattr(ai_service, 'quote_cache', TwoTierCache(
+        memory=TTLCache(), disk=SQLiteCache(':memory:')
+    ))
+    service = ai_service.AIService()
+    transcript = 'Fit two double sockets in the kitchen and replace the cooker switch'
+    first = service.generate_quote_from_transcript(transcript, 'Electrician', 50)
+    repeat = service.generate_quote_from_transcript(transcript, 'electrician', 50.0)
+    assert not first.get('cached') and repeat.get('cached')
+    assert repeat['quote_data'] == first['quote_data']
+    assert not service.generate_quote_from_transcript(transcript, 'Electrician', 50, use_cache=False).get('cached')
@@ -0,0 +1,131 @@
+import io
+import struct
+
+import numpy as np
+import pytest
+
+from src.services.audio import (
+    WAVE_FORMAT_EXTENSIBLE, WAVE_FORMAT_IEEE_FLOAT, WAVE_FORMAT_PCM,
+    AudioDecodeError, PCMAudio, analyze_signal, chunk_bounds, decode_wav, trim_silence
+)
+
+RATE = 16000
+
+
+def wav_bytes(payload, tag, channels, bits, rate=RATE, extensible=False):
+    """Hand-built RIFF/WAVE file; the wave module cannot write 24-bit, float or extensible headers"""
+    block_align = channels * bits // 8
+    fmt = struct.pack('<HHIIHH', WAVE_FORMAT_EXTENSIBLE if extensible else tag,
+                      channels, rate, rate * block_align, block_align, bits)
+    if extensible:
+        # cbSize, valid bits, channel mask, then the sub-format GUID starting with the real tag
+        fmt += struct.pack('<HHI', 22, bits, 0) + struct.pack('<H', tag) + bytes(14)
+    chunks = b'fmt ' + struct.pack('<I', len(fmt)) + fmt + b'data' + struct.pack('<I', len(payload)) + payload
+    return b'RIFF' + struct.pack('<I', 4 + len(chunks)) + b'WAVE' + chunks
+
+
+def tone(seconds=0.5, amplitude=0.5, frequency=440):
+    t = np.arange(int(RATE * seconds)) / RATE
+    return amplitude * np.sin(2 * np.pi * frequency * t)
+
+
+def test_pcm16_round_trip():
+    samples = (tone() * 32767).astype(np.int16)
+    audio = decode_wav(PCMAudio(samples, RATE).to_wav())
+    assert audio.sample_rate == RATE and audio.channels == 1
+    assert np.array_equal(audio.samples[:, 0], samples)
+
+
+def test_pcm24_keeps_top_sixteen_bits():
+    values = (tone() * (2 ** 23 - 1)).astype(np.int32)
+    payload = b''.join(int(v).to_bytes(3, 'little', signed=True) for v in values)
+    audio = decode_wav(io.BytesIO(wav_bytes(payload, WAVE_FORMAT_PCM, 1, 24)))
+    assert np.array_equal(audio.samples[:, 0], (values >> 8).astype(np.int16))
+
+
+@pytest.mark.parametrize('extensible', [False, True])
+def test_float32_stereo(extensible):
+    left, right = tone(), -tone(amplitude=1.5)  # right channel overdriven, clipped on decode
+    payload = np.column_stack([left, right]).astype('<f4').tobytes()
+    audio = decode_wav(io.BytesIO(wav_bytes(payload, WAVE_FORMAT_IEEE_FLOAT, 2, 32, extensible=extensible)))
+    assert audio.channels == 2 and audio.frames == len(left)
+    assert np.abs(audio.samples[:, 0] - left * 32767).max() <= 1
+    assert audio.samples[:, 1].min() == -32767 and audio.samples[:, 1].max() == 32767
+
+
+def test_unset_data_size_reads_to_end_of_file():
+    samples = (tone() * 32767).astype('<i2')
+    data = bytearray(wav_bytes(samples.tobytes(), WAVE_FORMAT_PCM, 1, 16))
+    data[40:44] = bytes(4)  # streaming recorders leave the data size at zero
+    assert decode_wav(io.BytesIO(bytes(data))).frames == len(samples)
+
+
+@pytest.mark.parametrize('data', [
+    b'',
+    b'ID3\x04 not a wav at all',
+    b'RIFF\x04\x00\x00\x00WAVE',
+    wav_bytes(bytes(64), 0x0055, 1, 16),  # MP3 in a WAV wrapper
+])
+def test_undecodable_wav_raises(data):
+    with pytest.raises(AudioDecodeError):
+        decode_wav(io.BytesIO(data))
+
+
+def speech_with_pauses(pattern):
+    """Noise bursts for truthy seconds, near-silence for the rest"""
+    rng = np.random.default_rng(0)
+    parts = [rng.normal(0, 8000 if loud else 30, RATE) for loud in pattern]
+    return PCMAudio(np.clip(np.concatenate(parts), -32768, 32767).astype(np.int16), RATE)
+
+
+def test_chunk_bounds_short_recording_is_one_chunk():
+    audio = speech_with_pauses([1, 1, 1])
+    assert chunk_bounds(audio, 10) == [(0, audio.frames)]
+
+
+def test_chunk_bounds_cover_recording_and_cut_in_pauses():
+    pattern = [1, 1, 1, 1, 1, 1, 0, 1, 1, 1, 1, 1, 0, 1, 1, 1, 1, 1, 0, 1, 1, 1, 1]
+    audio = speech_with_pauses(pattern)
+    bounds = chunk_bounds(audio, 8)
+    assert bounds[0][0] == 0 and bounds[-1][1] == audio.frames
+    assert all(end == next_start for (_, end), (next_start, _) in zip(bounds, bounds[1:]))
+    assert all(end - start <= 8 * RATE for start, end in bounds)
+    for _, cut in bounds[:-1]:
+        assert pattern[cut // RATE] == 0, f'cut at {cut / RATE:.2f}s is inside speech'
+
+
+def test_trim_silence_shortens_pauses_and_maps_back():
+    audio = speech_with_pauses([0, 0, 1, 0, 0, 0, 1, 0, 0])
+    trim = trim_silence(audio, pad_ms=250)
+    # 2 s of speech plus at most 250 ms either side of each burst
+    assert 2.0 <= trim.audio.duration <= 3.1
+    assert trim.seconds_removed == pytest.approx(audio.duration - trim.audio.duration)
+    # The first kept sample is just before the first burst; later times map into the second burst
+    assert 1.7 <= trim.source_time(0.0) <= 2.0
+    assert 6.0 <= trim.source_time(trim.audio.duration - 0.3) <= 7.25
+    assert trim.source_time(1e6) == pytest.approx(audio.duration)
+
+
+def test_trim_silence_of_empty_audio():
+    trim = trim_silence(PCMAudio(np.zeros(0, dtype=np.int16), RATE))
+    assert trim.audio.frames == 0 and trim.source_time(1.0) == 0.0
+
+
+def tone_over_noise(pattern, noise=300):
+    """A 440 Hz tone for truthy seconds over steady background noise throughout"""
+    rng = np.random.default_rng(0)
+    signal = np.concatenate([tone(1.0, 0.3 if on else 0.0) for on in pattern]) * 32768
+    signal += rng.normal(0, noise, len(signal))
+    return PCMAudio(np.clip(signal, -32768, 32767).astype(np.int16), RATE)
+
+
+def test_snr_measures_noise_in_the_pauses():
+    # Tone RMS 0.3 / sqrt(2) against noise RMS 300 / 32768: about 27 dB
+    metrics = analyze_signal(tone_over_noise([0, 1, 1, 0, 1]))
+    assert metrics['snr_db'] == pytest.approx(27.3, abs=1.0)
+
+
+def test_snr_is_unknown_without_pauses():
+    # A steady tone has no dynamic range; that is not evidence of noise
+    assert analyze_signal(tone_over_noise([1, 1, 1]))['snr_db'] is None
+    assert analyze_signal(PCMAudio(np.zeros(0, dtype=np.int16), RATE))['snr_db'] is None
@@ -0,0 +1,46 @@
+from src.cache import SQLiteCache, TTLCache, TwoTierCache
+
+
+def two_tier(tmp_path, ttl=60):
+    return TwoTierCache(memory=TTLCache(maxsize=8, ttl=ttl), disk=SQLiteCache(str(tmp_path / 'cache.db'), ttl=ttl))
+
+
+def test_miss_then_memory_hit(tmp_path):
+    cache = two_tier(tmp_path)
+    assert cache.get('quote') is None
+    cache.set('quote', {'total': 120.5, 'materials': ['cable']})
+    assert cache.get('quote') == {'total': 120.5, 'materials': ['cable']}
+
+    stats = cache.stats()
+    assert stats['memory']['hits'] == 1 and stats['memory']['misses'] == 1
+    assert stats['disk']['hits'] == 0 and stats['disk']['misses'] == 1
+    assert stats['hit_rate'] == 0.5
+
+
+def test_disk_hit_refills_memory(tmp_path):
+    writer = two_tier(tmp_path)
+    writer.set('quote', {'total': 99})
+
+    # Another worker on the node: empty memory tier, same SQLite file
+    reader = two_tier(tmp_path)
+    assert reader.get('quote') == {'total': 99}
+    assert reader.stats()['disk']['hits'] == 1
+    assert reader.get('quote') == {'total': 99}
+    assert reader.stats()['memory']['hits'] == 1 and reader.stats()['disk']['hits'] == 1
+    assert reader.stats()['hit_rate'] == 1.0
+
+
+def test_callers_get_independent_copies(tmp_path):
+    cache = two_tier(tmp_path)
+    value = {'materials': ['cable']}
+    cache.set('quote', value)
+    value['materials'].append('box')
+    cache.get('quote')['materials'].append('socket')
+    assert cache.get('quote') == {'materials': ['cable']}
+
+
+def test_expired_entries_miss_in_both_tiers(tmp_path):
+    cache = two_tier(tmp_path, ttl=0)
+    cache.set('quote', {'total': 1})
+    assert cache.get('quote') is None
+    assert cache.stats()['memory']['expirations'] == 1
@@ -0,0 +1,24 @@
+import pytest
+
+from check_query_plans import check_query_plans, full_scan
+
+TABLES = {'quotes', 'jobs', 'users'}
+
+
+@pytest.mark.parametrize('line, expected', [
+    ('SCAN quotes', 'full table scan of quotes'),
+    ('SCAN TABLE quotes', 'full table scan of quotes'),
+    ('SCAN quotes USING INDEX ix_quotes_created_at', 'full scan of quotes in ix_quotes_created_at order'),
+    ('SCAN TABLE jobs USING COVERING INDEX ix_jobs_user_status', 'full scan of covering index ix_jobs_user_status on jobs'),
+    ('SEARCH quotes USING INDEX ix_quotes_user_created (user_id=?)', None),
+    ('SEARCH TABLE users USING INTEGER PRIMARY KEY (rowid=?)', None),
+    ('SCAN CONSTANT ROW', None),
+    ('SCAN anon_1', None),
+    ('USE TEMP B-TREE FOR ORDER BY', None),
+])
+def test_full_scan(line, expected):
+    assert full_scan(line, TABLES) == expected
+
+
+def test_route_queries_use_indexes():
+    assert check_query_plans() == 0
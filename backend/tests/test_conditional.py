@@ -0,0 +1,36 @@
+import pytest
+
+QUOTE = {'customer_name': 'Ann Smith', 'job_description': 'Replace consumer unit', 'labour_hours': 4, 'labour_rate': 50}
+FUTURE = 'Wed, 01 Jan 2099 00:00:00 GMT'
+
+
+def test_profile_answers_if_modified_since(auth_client):
+    response = auth_client.get('/api/auth/me')
+    assert response.status_code == 200
+    last_modified = response.headers['Last-Modified']
+
+    cached = auth_client.get('/api/auth/me', headers={'If-Modified-Since': last_modified})
+    assert cached.status_code == 304 and cached.headers['ETag'] == response.headers['ETag']
+    older = auth_client.get('/api/auth/me', headers={'If-Modified-Since': 'Mon, 01 Jan 2001 00:00:00 GMT'})
+    assert older.status_code == 200
+    # If-None-Match wins over If-Modified-Since
+    assert auth_client.get('/api/auth/me', headers={'If-None-Match': '"other"', 'If-Modified-Since': last_modified}).status_code == 200
+
+
+@pytest.mark.parametrize('path', ['/api/quotes/', '/api/quotes/stats'])
+def test_collections_revalidate_by_etag_only(auth_client, path):
+    response = auth_client.post('/api/quotes/batch', json={'operations': [{'op': 'create', 'quote': QUOTE}] * 2})
+    _, second = [result['id'] for result in response.get_json()['results']]
+
+    response = auth_client.get(path)
+    assert 'Last-Modified' not in response.headers
+    etag = response.headers['ETag']
+    assert auth_client.get(path, headers={'If-None-Match': etag}).status_code == 304
+
+    # A delete leaves max(updated_at) where it was, so a date cannot validate the collection
+    auth_client.post('/api/quotes/batch', json={'operations': [{'op': 'delete', 'id': second}]})
+    assert auth_client.get(path, headers={'If-None-Match': etag}).status_code == 200
+    refreshed = auth_client.get(path, headers={'If-Modified-Since': FUTURE})
+    assert refreshed.status_code == 200
+    body = refreshed.get_json()
+    assert (body['total'] if 'total' in body else len(body['quotes'])) == 1
@@ -0,0 +1,25 @@
+from sqlalchemy import create_engine
+
+from src.database import InstrumentedQueuePool, pool_stats
+
+
+def test_only_checkouts_that_open_an_overflow_connection_count(tmp_path):
+    engine = create_engine(f'sqlite:///{tmp_path / "pool.db"}', poolclass=InstrumentedQueuePool,
+                           pool_size=1, max_overflow=2)
+    pool_stats.reset()
+    try:
+        first = engine.pool.connect()       # fills the pool
+        second = engine.pool.connect()      # opens an overflow connection
+        assert pool_stats.overflow_checkouts == 1
+
+        # Reused from the pool while the overflow connection is still open
+        second.close()
+        third = engine.pool.connect()
+        assert pool_stats.overflow_checkouts == 1
+        assert pool_stats.wait.to_dict()['count'] == 3
+
+        third.close()
+        first.close()
+    finally:
+        engine.dispose()
+        pool_stats.reset()
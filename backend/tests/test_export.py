@@ -0,0 +1,90 @@
+import csv
+import io
+import json
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import select
+
+from src.database import db
+from src.models.quote import Invoice
+from src.routes import export
+
+QUOTE = {'customer_name': 'Ann Smith', 'job_description': 'Replace consumer unit', 'labour_hours': 4, 'labour_rate': 50}
+
+
+@pytest.fixture
+def quotes(auth_client):
+    names = ['Ann Smith', 'Bob "the builder" Jones', 'Cara, Lee']
+    response = auth_client.post('/api/quotes/batch', json={'operations': [
+        {'op': 'create', 'quote': dict(QUOTE, customer_name=name)} for name in names
+    ]})
+    assert response.get_json()['success']
+    return names
+
+
+@pytest.fixture
+def invoices(app, user):
+    now = datetime.utcnow()
+    with app.app_context():
+        for index, status in enumerate(['pending', 'paid', 'pending']):
+            db.session.add(Invoice(
+                user_id=user, invoice_number=f'INV-TEST-{index}', customer_name=f'Customer {index}',
+                subtotal=100, vat_amount=20, total_amount=120, status=status,
+                created_at=now - timedelta(hours=3 - index)
+            ))
+        db.session.commit()
+
+
+def test_exports_require_authentication(client):
+    assert client.get('/api/quotes/export').status_code == 401
+    assert client.get('/api/invoices/export').status_code == 401
+
+
+def test_export_rejects_unknown_format_and_fields(auth_client):
+    assert auth_client.get('/api/quotes/export?format=xlsx').status_code == 400
+    assert auth_client.get('/api/invoices/export?fields=id,password_hash').status_code == 400
+
+
+def test_quote_export_ndjson_streams_a_line_per_row(auth_client, quotes):
+    response = auth_client.get('/api/quotes/export?fields=summary')
+    assert response.is_streamed
+    assert response.mimetype == 'application/x-ndjson'
+    assert response.headers['Content-Disposition'] == 'attachment; filename=quotes.ndjson'
+
+    chunks = list(response.response)
+    assert len(chunks) == len(quotes)
+    rows = [json.loads(chunk) for chunk in chunks]
+    # Oldest first, with the requested field set
+    assert [row['customer_name'] for row in rows] == quotes
+    assert 'quote_number' in rows[0] and 'materials' not in rows[0]
+
+
+def test_quote_export_csv_quotes_awkward_values(auth_client, quotes):
+    response = auth_client.get('/api/quotes/export?format=csv&fields=customer_name,total_amount')
+    assert response.mimetype == 'text/csv'
+    assert response.headers['Content-Disposition'] == 'attachment; filename=quotes.csv'
+
+    rows = list(csv.reader(io.StringIO(response.get_data(as_text=True))))
+    assert rows[0] == ['id', 'customer_name', 'total_amount']
+    assert [row[1] for row in rows[1:]] == quotes
+    assert float(rows[1][2]) == pytest.approx(240.0)
+
+
+def test_invoice_export_applies_filters(auth_client, invoices):
+    response = auth_client.get('/api/invoices/export?status=pending&format=csv&fields=invoice_number,status')
+    rows = list(csv.reader(io.StringIO(response.get_data(as_text=True))))
+    assert rows == [['id', 'invoice_number', 'status'], ['1', 'INV-TEST-0', 'pending'], ['3', 'INV-TEST-2', 'pending']]
+
+    lines = auth_client.get('/api/invoices/export').get_data(as_text=True).splitlines()
+    assert [json.loads(line)['invoice_number'] for line in lines] == ['INV-TEST-0', 'INV-TEST-1', 'INV-TEST-2']
+
+
+def test_iter_rows_uses_a_streaming_cursor(app, monkeypatch):
+    executed = []
+    with app.app_context():
+        execute = db.session.execute
+        monkeypatch.setattr(db.session, 'execute', lambda statement: executed.append(statement) or execute(statement))
+        assert list(export.iter_rows(select(Invoice.id), batch_size=2)) == []
+    options = executed[0].get_execution_options()
+    assert options['stream_results'] and options['yield_per'] == 2
@@ -0,0 +1,48 @@
+from src.database import db
+from src.models.user import User
+from src.services.identity import identity_cache, load_identity
+
+
+def test_write_invalidates_cached_profile_on_commit_only(app, user):
+    with app.app_context():
+        assert load_identity(user)['name'] == 'Test Trader'
+        record = db.session.get(User, user)
+
+        record.name = 'Renamed'
+        db.session.flush()
+        assert identity_cache.get(user) is not None  # not committed yet
+
+        db.session.rollback()
+        assert identity_cache.get(user)['name'] == 'Test Trader'
+
+        record = db.session.get(User, user)
+        record.is_active = False
+        db.session.commit()
+        assert identity_cache.get(user) is None
+        assert load_identity(user)['is_active'] is False
+
+
+def test_me_serves_the_cached_profile(auth_client, user):
+    response = auth_client.get('/api/auth/me')
+    assert response.status_code == 200
+    assert response.get_json()['user']['id'] == user
+    assert auth_client.get('/api/auth/me', headers={'If-None-Match': response.headers['ETag']}).status_code == 304
+
+
+def test_load_identity_of_missing_user(app):
+    with app.app_context():
+        assert load_identity(12345) is None
+
+
+def test_require_auth_serves_current_profile(app, auth_client, user):
+    transcript = {'transcript': 'Replace the consumer unit in a three bed semi and add two sockets'}
+    assert auth_client.post('/api/voice/test-transcript', json=transcript).get_json()['quote_data']['labour_rate'] == 50.0
+
+    # A profile change reaches request.current_identity on the next request
+    assert auth_client.put('/api/auth/update-profile', json={'hourly_rate': 65.0}).status_code == 200
+    assert auth_client.post('/api/voice/test-transcript', json=transcript).get_json()['quote_data']['labour_rate'] == 65.0
+
+    with app.app_context():
+        db.session.get(User, user).is_active = False
+        db.session.commit()
+    assert auth_client.post('/api/voice/test-transcript', json=transcript).status_code == 401
@@ -0,0 +1,81 @@
+import numpy as np
+import pytest
+
+from src.services import imaging
+from src.services.imaging import (
+    ImageDecodeError, adaptive_threshold, encode_pgm, get_decoder, prepare_image, run_ocr_pipeline
+)
+
+
+def shadowed_page(height=400, width=600):
+    """Dark word blocks on a light page, with a strong lighting gradient left to right"""
+    ink = np.zeros((height, width), dtype=bool)
+    for row in range(40, height - 40, 40):
+        for col in range(40, width - 80, 90):
+            ink[row:row + 12, col:col + 60] = True
+    gray = np.where(ink, 40.0, 230.0) * np.linspace(0.15, 1.0, width)[None, :]
+    return gray.astype(np.uint8), ink
+
+
+def test_adaptive_threshold_finds_ink_in_the_shadow():
+    gray, ink = shadowed_page()
+    binary = adaptive_threshold(gray)
+    assert binary.shape == gray.shape and binary.dtype == np.uint8
+    assert set(np.unique(binary)) <= {0, 255}
+    # No global threshold works: the shadowed background (about 35) is darker than the lit ink (40)
+    assert (binary[ink] == 0).mean() > 0.95
+    assert (binary[~ink] == 255).mean() > 0.98
+
+
+def test_adaptive_threshold_blank_page_has_no_ink():
+    assert (adaptive_threshold(np.full((200, 300), 200, dtype=np.uint8)) == 255).all()
+
+
+def test_get_decoder():
+    assert get_decoder('note.BMP') is imaging.decode_bmp
+    assert get_decoder('note.pgm') is imaging.decode_pnm
+    assert get_decoder('note.heic') is None
+    assert get_decoder('') is None and get_decoder(None) is None
+
+
+def test_prepare_image_rejects_unknown_and_corrupt_images():
+    with pytest.raises(ImageDecodeError):
+        prepare_image(b'data', 'note.heic')
+    with pytest.raises(ImageDecodeError):
+        prepare_image(b'P5\n600 400\n255\n' + bytes(10), 'note.pgm')
+
+
+def decode_raw(data, max_side=None):
+    """Test decoder: headerless 100x150 grayscale"""
+    return np.frombuffer(data, dtype=np.uint8).reshape(100, 150).copy(), 1
+
+
+def read_text(image):
+    return 'ink' if (image == 0).any() else '', 1.0
+
+
+def test_pipeline_uses_the_decoder_it_is_given():
+    gray, _ = shadowed_page(100, 150)
+    result = run_ocr_pipeline(gray.tobytes(), 'note.raw', read_text, decoder=decode_raw)
+    assert result['text'] == 'ink'
+    assert set(result['timings_ms']) == {'decode', 'orient', 'grayscale', 'downscale', 'threshold', 'deskew', 'ocr'}
+
+
+def test_runtime_registered_decoder_reaches_the_ocr_workers(monkeypatch, tmp_path):
+    from src.services.photo_intelligence_service import PhotoIntelligenceService
+
+    monkeypatch.setenv('OCR_WORKERS', '1')
+    monkeypatch.setitem(imaging._ocr_engines, 'test', read_text)
+    monkeypatch.setenv('OCR_ENGINE', 'test')
+    service = PhotoIntelligenceService()
+
+    gray, _ = shadowed_page(100, 150)
+    (tmp_path / 'note.pgm').write_bytes(encode_pgm(gray))
+    assert service.extract_text_from_image(str(tmp_path / 'note.pgm'))['success']  # workers are up
+
+    # Registered after the workers started, so only the web process knows it
+    monkeypatch.setitem(imaging._decoders, 'raw', decode_raw)
+    (tmp_path / 'note.raw').write_bytes(gray.tobytes())
+    result = service.extract_text_from_image(str(tmp_path / 'note.raw'))
+    assert result['success'], result
+    assert result['text'] == 'ink' and result['method'] == 'ocr:test'
@@ -0,0 +1,48 @@
+import json
+
+import pytest
+
+from src.services.llm_json import IncrementalFieldParser, JSONObjectScanner, extract_json_object
+
+
+def test_plain_object():
+    assert extract_json_object('{"job_title": "Rewire", "labour_hours": 6}') == {'job_title': 'Rewire', 'labour_hours': 6}
+
+
+def test_object_in_prose_and_code_fence():
+    text = 'Here is the quote:\n```json\n{"job_title": "Fit socket", "total": 120.5}\n```\nLet me know {if} anything changes.'
+    assert extract_json_object(text) == {'job_title': 'Fit socket', 'total': 120.5}
+
+
+def test_braces_inside_strings_are_ignored():
+    text = 'Note {see below}: {"notes": "use {brackets} and \\"quotes\\"", "n": 1}'
+    assert extract_json_object(text) == {'notes': 'use {brackets} and "quotes"', 'n': 1}
+
+
+def test_unclosed_prose_brace_before_object():
+    assert extract_json_object('Costs {roughly: {"a": 1}') == {'a': 1}
+
+
+@pytest.mark.parametrize('text', ['', 'no json here', '{"truncated": "repl', '[1, 2, 3]'])
+def test_no_complete_object_raises(text):
+    with pytest.raises(json.JSONDecodeError):
+        extract_json_object(text)
+
+
+def test_scanner_across_chunks():
+    scanner = JSONObjectScanner()
+    assert scanner.feed('Sure! {"a": "x}') is None
+    assert scanner.feed('y", "b": [1, 2') is None
+    assert scanner.feed(']} trailing') == {'a': 'x}y', 'b': [1, 2]}
+
+
+def test_field_parser_emits_fields_and_items_as_they_complete():
+    parser = IncrementalFieldParser(itemized=('materials',))
+    events = []
+    for chunk in ['{"job_title": "Re', 'wire", "labour_hours": 12', '.5, "materials": [{"item": "cable"}', ', {"item": "box"}]}']:
+        events.extend(parser.feed(chunk))
+    assert events[0] == ('field', {'name': 'job_title', 'value': 'Rewire'})
+    assert ('field', {'name': 'labour_hours', 'value': 12.5}) in events
+    items = [payload for kind, payload in events if kind == 'item']
+    assert [item['value'] for item in items] == [{'item': 'cable'}, {'item': 'box'}]
+    assert parser.done
@@ -0,0 +1,41 @@
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from src.services import numbering
+from src.services.numbering import NumberAllocator
+
+
+def test_allocators_never_hand_out_the_same_number(app):
+    # Several allocators stand in for worker processes sharing one counter
+    allocators = [NumberAllocator('TM', 'test', block_size=3) for _ in range(4)]
+
+    def allocate(index):
+        with app.app_context():
+            return [allocators[index % 4].allocate() for _ in range(10)]
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        numbers = [number for batch in pool.map(allocate, range(16)) for number in batch]
+
+    assert len(numbers) == len(set(numbers)) == 160
+    # Blocks of 3 over 160 numbers: at most one partly used block per allocator
+    assert max(int(number.rsplit('-', 1)[1]) for number in numbers) <= 160 + 4 * 3
+
+
+def test_numbers_restart_each_day(app, monkeypatch):
+    class Clock(datetime):
+        now = datetime(2025, 1, 27, 23, 59)
+
+        @classmethod
+        def utcnow(cls):
+            return cls.now
+
+    monkeypatch.setattr(numbering, 'datetime', Clock)
+    allocator = NumberAllocator('TM', 'test', block_size=5)
+    with app.app_context():
+        assert [allocator.allocate() for _ in range(2)] == ['TM-20250127-00001', 'TM-20250127-00002']
+        Clock.now = datetime(2025, 1, 28, 0, 0)
+        assert allocator.allocate() == 'TM-20250128-00001'
+        assert list(allocator._blocks) == ['test:20250128']
+
+        # A second worker continues after the first one's reserved block
+        assert NumberAllocator('TM', 'test', block_size=5).allocate() == 'TM-20250128-00006'
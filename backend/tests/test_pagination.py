@@ -0,0 +1,41 @@
+from datetime import datetime
+
+import pytest
+
+from src.routes.pagination import (
+    MAX_PAGE_SIZE, DEFAULT_PAGE_SIZE, PaginationError, decode_cursor, encode_cursor, parse_date, parse_limit
+)
+
+
+def test_cursor_round_trip():
+    created = datetime(2024, 3, 1, 9, 30, 15, 123456)
+    cursor = encode_cursor(created, 42)
+    assert '=' not in cursor
+    assert decode_cursor(cursor) == (created, 42)
+
+
+def test_cursor_accepts_iso_string_sort_value():
+    assert decode_cursor(encode_cursor('2024-03-01T09:30:00', 7)) == (datetime(2024, 3, 1, 9, 30), 7)
+
+
+@pytest.mark.parametrize('cursor', ['', 'not-a-cursor', '!!!!', encode_cursor('yesterday', 1), encode_cursor('2024-03-01', 'x')])
+def test_malformed_cursor_raises_pagination_error(cursor):
+    with pytest.raises(PaginationError):
+        decode_cursor(cursor)
+
+
+def test_parse_limit():
+    assert parse_limit(None) == DEFAULT_PAGE_SIZE
+    assert parse_limit('') == DEFAULT_PAGE_SIZE
+    assert parse_limit('10') == 10
+    assert parse_limit(str(MAX_PAGE_SIZE + 1)) == MAX_PAGE_SIZE
+    for value in ('0', '-3', 'ten'):
+        with pytest.raises(PaginationError):
+            parse_limit(value)
+
+
+def test_parse_date():
+    assert parse_date(None, 'since') is None
+    assert parse_date('2024-03-01', 'since') == datetime(2024, 3, 1)
+    with pytest.raises(PaginationError, match='since'):
+        parse_date('March', 'since')
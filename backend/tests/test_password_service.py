@@ -0,0 +1,44 @@
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from src.services.password_service import PasswordHasherBusy, PasswordService
+
+
+@pytest.fixture
+def service(monkeypatch):
+    monkeypatch.setenv('PASSWORD_HASH_WORKERS', '1')
+    monkeypatch.setenv('PASSWORD_HASH_QUEUE', '1')
+    service = PasswordService()
+    # A thread stands in for the process pool so tests can hold a hash open
+    service._executor = ThreadPoolExecutor(max_workers=1)
+    service._executor_pid = os.getpid()
+    yield service
+    service._executor.shutdown(wait=True)
+
+
+def test_hash_and_verify_inline(monkeypatch):
+    monkeypatch.setenv('PASSWORD_HASH_WORKERS', '0')
+    service = PasswordService()
+    password_hash = service.hash('correct horse')
+    assert service.verify(password_hash, 'correct horse')
+    assert not service.verify(password_hash, 'battery staple')
+    assert not service.needs_rehash(password_hash)
+    assert service.needs_rehash(password_hash.replace(f':{service.iterations}$', f':{service.iterations + 1}$'))
+
+
+def test_timeout_is_busy_and_holds_the_slot_until_the_hash_finishes(service):
+    release = threading.Event()
+    service.timeout = 0.05
+    with pytest.raises(PasswordHasherBusy, match='longer than'):
+        service._run(service.hash_latency, release.wait, 5)
+    # Still hashing: the slot is not free yet
+    with pytest.raises(PasswordHasherBusy, match='queue is full'):
+        service._run(service.hash_latency, len, 'x')
+    release.set()
+    service._executor.submit(lambda: None).result()  # the held hash has finished
+    service.timeout = 5
+    assert service._run(service.hash_latency, len, 'xyz') == 3
+    assert service.stats()['timed_out'] == 1 and service.stats()['rejected'] == 1
@@ -0,0 +1,83 @@
+import pytest
+
+from src.services.quote_schema import quote_schema, to_number
+
+
+@pytest.mark.parametrize('value, expected', [
+    ('£1,250.50', 1250.5),
+    ('2.5 hours', 2.5),
+    ('approx 3', 3.0),
+    ('.5', 0.5),
+    (4, 4.0),
+    (True, None),
+    (float('nan'), None),
+    ('TBC', None),
+    (None, None),
+])
+def test_to_number(value, expected):
+    assert to_number(value) == expected
+
+
+@pytest.mark.parametrize('value, expected', [('85%', 0.85), ('85', 0.85), (0.6, 0.6), (1, 1.0), (250, 1.0), ('high', 0.8)])
+def test_confidence_is_a_fraction(value, expected):
+    assert quote_schema.validate({'confidence': value}, 45)['confidence'] == pytest.approx(expected)
+
+
+def test_validate_coerces_llm_strings_and_recomputes_totals():
+    quote = quote_schema.validate({
+        'customer_name': '  Ann Smith ',
+        'customer_phone': 'N/A',
+        'urgency': 'Fairly URGENT',
+        'labour_hours': '6 hours',
+        'labour_rate': '£1,250.50',
+        'materials_cost': '£999',
+        'subtotal': 1,
+        'scheduling_suggestion': 'Next week',
+    }, 45)
+    assert quote['customer_name'] == 'Ann Smith' and quote['customer_phone'] is None
+    assert quote['urgency'] == 'urgent'
+    assert quote['labour_hours'] == 6.0 and quote['labour_rate'] == 1250.5
+    # No priced lines, so the stated materials cost stands
+    assert quote['materials_cost'] == 999.0
+    assert quote['subtotal'] == 6 * 1250.5 + 999
+    assert quote['vat_amount'] == round(quote['subtotal'] * 0.2, 2)
+    assert quote['total_amount'] == round(quote['subtotal'] * 1.2, 2)
+    assert quote['scheduling_suggestion'] == 'Next week'
+
+
+def test_missing_or_invalid_fields_get_defaults():
+    quote = quote_schema.validate({'labour_hours': -3, 'labour_rate': 'ask'}, 52)
+    assert quote['customer_name'] == 'Unknown Customer'
+    assert quote['job_type'] == 'General' and quote['urgency'] == 'normal'
+    assert quote['labour_hours'] == 2.0 and quote['labour_rate'] == 52.0
+    assert quote['materials'] == [] and quote['materials_cost'] == 0.0
+    assert quote_schema.validate(['not', 'a', 'quote'], 52)['total_amount'] == 2 * 52 * 1.2
+
+
+def test_materials_lines_are_normalized_and_priced_lines_set_the_cost():
+    quote = quote_schema.validate({
+        'materials_cost': 10,
+        'materials': [
+            'Twin and earth cable',
+            {'name': 'Double socket', 'qty': '4', 'price': '£6.25'},
+            {'description': 'Consumer unit', 'total': '£120'},
+            {'item': 'Back box', 'quantity': 0, 'unit_price': 2},
+            {'quantity': 3},
+            '   ',
+            42,
+        ],
+    }, 45)
+    assert quote['materials'] == [
+        {'item': 'Twin and earth cable', 'quantity': 1.0, 'unit_price': 0.0, 'total': 0.0},
+        {'item': 'Double socket', 'quantity': 4.0, 'unit_price': 6.25, 'total': 25.0},
+        {'item': 'Consumer unit', 'quantity': 1.0, 'unit_price': 120.0, 'total': 120.0},
+        {'item': 'Back box', 'quantity': 1.0, 'unit_price': 2.0, 'total': 2.0},
+    ]
+    assert quote['materials_cost'] == 147.0
+    assert quote['subtotal'] == 2 * 45 + 147
+
+
+def test_validate_does_not_mutate_its_input():
+    data = {'labour_hours': '3', 'materials': [{'item': 'Fuse', 'price': '2'}]}
+    quote_schema.validate(data, 45)
+    assert data == {'labour_hours': '3', 'materials': [{'item': 'Fuse', 'price': '2'}]}
@@ -0,0 +1,111 @@
+import pytest
+
+QUOTE = {'customer_name': 'Ann Smith', 'job_description': 'Replace consumer unit', 'labour_hours': 4, 'labour_rate': 50}
+
+
+def batch(client, *operations):
+    response = client.post('/api/quotes/batch', json={'operations': list(operations)})
+    return response.status_code, response.get_json()
+
+
+def create_quotes(client, count):
+    status, body = batch(client, *[{'op': 'create', 'quote': dict(QUOTE, materials_cost=index)} for index in range(count)])
+    assert status == 200 and body['success'], body
+    return [result['id'] for result in body['results']]
+
+
+def test_batch_requires_authentication(client):
+    assert batch(client, {'op': 'create', 'quote': QUOTE})[0] == 401
+
+
+@pytest.mark.parametrize('body', [{}, {'operations': []}, {'operations': 'create'}, [{'op': 'create'}], 'operations', 7])
+def test_batch_rejects_malformed_body(auth_client, body):
+    assert auth_client.post('/api/quotes/batch', json=body).status_code == 400
+
+
+@pytest.mark.parametrize('operation, error', [
+    ({'op': 'create', 'quote': 'Ann Smith'}, 'quote must be an object'),
+    ({'op': 'create', 'quote': ['Ann Smith']}, 'quote must be an object'),
+    ({'op': 'create'}, 'quote must be an object'),
+    ({'op': 'create', 'quote': {'customer_name': 'Ann Smith'}}, 'Customer name and job description are required'),
+    ({'op': 'create', 'quote': dict(QUOTE, labour_hours='four')}, 'could not convert'),
+    ({'op': 'delete', 'id': True}, 'id must be an integer'),
+    ({'op': 'delete', 'id': '1'}, 'id must be an integer'),
+    ({'op': 'update_status', 'id': 1, 'status': 'paid'}, 'status must be one of'),
+    ({'op': 'archive', 'id': 1}, 'op must be one of'),
+    ('delete 1', 'op must be one of'),
+])
+def test_invalid_operations_fail_per_item(auth_client, operation, error):
+    status, body = batch(auth_client, operation, {'op': 'create', 'quote': QUOTE})
+    assert status == 200
+    assert not body['success'] and body['succeeded'] == 1 and body['failed'] == 1
+    assert error in body['results'][0]['error']
+    assert body['results'][1]['success']
+
+
+def test_batch_update_and_delete(auth_client):
+    first, second, third = create_quotes(auth_client, 3)
+    status, body = batch(
+        auth_client,
+        {'op': 'update_status', 'id': first, 'status': 'sent'},
+        {'op': 'delete', 'id': second},
+        {'op': 'delete', 'id': second},
+        {'op': 'delete', 'id': 999999},
+    )
+    assert status == 200
+    assert [result['success'] for result in body['results']] == [True, True, False, False]
+    assert 'already targeted' in body['results'][2]['error']
+
+
+def test_stats_cover_every_quote_not_just_the_first_page(auth_client):
+    ids = create_quotes(auth_client, 30)
+    batch(auth_client, *[{'op': 'update_status', 'id': quote_id, 'status': 'accepted'} for quote_id in ids[:5]])
+
+    page = auth_client.get('/api/quotes/?limit=10').get_json()
+    assert len(page['quotes']) == 10 and page['next_cursor']
+
+    response = auth_client.get('/api/quotes/stats')
+    stats = response.get_json()
+    assert stats['total'] == 30
+    assert stats['by_status'] == {'draft': 25, 'sent': 0, 'accepted': 5, 'rejected': 0}
+    # 4 h at 50 plus materials 0..29, with 20% VAT
+    assert stats['total_value'] == pytest.approx(sum((200 + index) * 1.2 for index in range(30)))
+
+    etag = response.headers['ETag']
+    assert auth_client.get('/api/quotes/stats', headers={'If-None-Match': etag}).status_code == 304
+    batch(auth_client, {'op': 'delete', 'id': ids[0]})
+    refreshed = auth_client.get('/api/quotes/stats', headers={'If-None-Match': etag})
+    assert refreshed.status_code == 200 and refreshed.get_json()['total'] == 29
+
+
+def test_list_filters_by_status_and_search(auth_client):
+    ids = create_quotes(auth_client, 3)
+    batch(auth_client,
+          {'op': 'create', 'quote': dict(QUOTE, customer_name='Bob 100%_Jones')},
+          {'op': 'update_status', 'id': ids[0], 'status': 'sent'})
+
+    sent = auth_client.get('/api/quotes/?status=sent').get_json()['quotes']
+    assert [quote['id'] for quote in sent] == [ids[0]]
+    found = auth_client.get('/api/quotes/', query_string={'q': 'JONES'}).get_json()['quotes']
+    assert [quote['customer_name'] for quote in found] == ['Bob 100%_Jones']
+    # LIKE wildcards in the search are matched literally
+    assert len(auth_client.get('/api/quotes/', query_string={'q': '0%_J'}).get_json()['quotes']) == 1
+    assert auth_client.get('/api/quotes/', query_string={'q': '1_0'}).get_json()['quotes'] == []
+    assert len(auth_client.get('/api/quotes/', query_string={'q': 'consumer'}).get_json()['quotes']) == 4
+
+
+@pytest.mark.parametrize('body', [['Ann Smith'], 'Ann Smith', None])
+def test_create_rejects_non_object_body(auth_client, body):
+    response = auth_client.post('/api/quotes/create', json=body)
+    assert response.status_code == 400 and response.get_json()['error'] == 'Body must be a JSON object'
+
+
+def test_json_field_key_ignores_non_object_bodies(app):
+    from src.routes.ratelimit import json_field_key
+
+    key = json_field_key('email')
+    with app.test_request_context(json={'email': ' Ann@Example.com'}):
+        assert key() == 'email:ann@example.com'
+    for body in (['ann@example.com'], 'ann@example.com', 7):
+        with app.test_request_context(json=body):
+            assert key() is None
@@ -0,0 +1,220 @@
+import threading
+import time
+
+import httpx
+import openai
+import pytest
+
+from src.services.resilience import (
+    BulkheadFull, CallGuard, CircuitOpen, DeadlineExceeded, RetriesExhausted, is_retryable
+)
+
+REQUEST = httpx.Request('POST', 'https://api.openai.com/v1/chat/completions')
+
+
+def status_error(cls, code):
+    return cls('provider error', response=httpx.Response(code, request=REQUEST), body=None)
+
+
+def guard(**settings):
+    settings = {'retries': 2, 'backoff_base': 0, 'failure_threshold': 2, 'reset_timeout': 30.0, **settings}
+    return CallGuard('test', **settings)
+
+
+def flaky(*errors, result='ok'):
+    """fn that raises the given errors in turn, then returns result; records its timeouts"""
+    errors = list(errors)
+    timeouts = []
+
+    def fn(timeout):
+        timeouts.append(timeout)
+        if errors:
+            raise errors.pop(0)
+        return result
+
+    fn.timeouts = timeouts
+    return fn
+
+
+def test_is_retryable():
+    assert is_retryable(openai.APITimeoutError(request=REQUEST))
+    assert is_retryable(status_error(openai.RateLimitError, 429))
+    assert is_retryable(status_error(openai.InternalServerError, 503))
+    assert is_retryable(TimeoutError())
+    assert not is_retryable(status_error(openai.BadRequestError, 400))
+    assert not is_retryable(ValueError())
+
+
+def test_call_retries_timeouts_and_429s_then_succeeds():
+    call_guard = guard()
+    fn = flaky(openai.APITimeoutError(request=REQUEST), status_error(openai.RateLimitError, 429))
+    assert call_guard.call(fn) == 'ok'
+
+    stats = call_guard.stats()
+    assert stats['retries'] == 2 and stats['successes'] == 1 and stats['failures'] == 0
+    assert stats['state'] == 'closed' and stats['in_flight'] == 0
+    # Each attempt gets the time left before the deadline
+    assert all(0 < timeout <= call_guard.deadline for timeout in fn.timeouts)
+    assert fn.timeouts == sorted(fn.timeouts, reverse=True)
+
+
+def test_call_gives_up_after_the_retry_budget():
+    call_guard = guard(retries=1)
+    fn = flaky(*[status_error(openai.RateLimitError, 429)] * 3)
+    with pytest.raises(RetriesExhausted):
+        call_guard.call(fn)
+    assert len(fn.timeouts) == 2
+    assert call_guard.stats()['failures'] == 1
+
+
+def test_non_retryable_errors_pass_through_without_tripping_the_breaker():
+    call_guard = guard(failure_threshold=1)
+    with pytest.raises(openai.BadRequestError):
+        call_guard.call(flaky(status_error(openai.BadRequestError, 400)))
+    stats = call_guard.stats()
+    assert stats['retries'] == 0 and stats['failures'] == 0 and stats['state'] == 'closed'
+
+
+def test_breaker_opens_then_probes_half_open_and_closes():
+    call_guard = guard(retries=0, reset_timeout=0.05)
+    for _ in range(2):
+        with pytest.raises(RetriesExhausted):
+            call_guard.call(flaky(TimeoutError()))
+    assert call_guard.state == 'open'
+
+    fn = flaky()
+    with pytest.raises(CircuitOpen):
+        call_guard.call(fn)
+    assert fn.timeouts == []  # short-circuited without calling the provider
+
+    time.sleep(0.06)
+    assert call_guard.call(fn) == 'ok'
+    stats = call_guard.stats()
+    assert stats['state'] == 'closed' and stats['short_circuited'] == 1
+    assert stats['transitions'] == {'closed_to_open': 1, 'open_to_half_open': 1, 'half_open_to_closed': 1}
+
+
+def test_failed_probe_reopens_the_breaker():
+    call_guard = guard(retries=0, failure_threshold=1, reset_timeout=0.05)
+    with pytest.raises(RetriesExhausted):
+        call_guard.call(flaky(TimeoutError()))
+    time.sleep(0.06)
+    with pytest.raises(RetriesExhausted):
+        call_guard.call(flaky(TimeoutError()))
+    assert call_guard.state == 'open'
+    assert call_guard.transitions['half_open_to_open'] == 1
+
+
+def test_half_open_admits_a_single_probe():
+    call_guard = guard(retries=0, failure_threshold=1, reset_timeout=0.05)
+    with pytest.raises(RetriesExhausted):
+        call_guard.call(flaky(TimeoutError()))
+    time.sleep(0.06)
+
+    started, release = threading.Event(), threading.Event()
+
+    def probe(timeout):
+        started.set()
+        release.wait(5)
+        return 'ok'
+
+    thread = threading.Thread(target=call_guard.call, args=(probe,))
+    thread.start()
+    assert started.wait(5)
+    with pytest.raises(CircuitOpen, match='probe in flight'):
+        call_guard.call(flaky())
+    release.set()
+    thread.join()
+    assert call_guard.state == 'closed'
+
+
+def test_deadline_bounds_the_call_including_retries():
+    call_guard = guard(deadline=0.2, retries=5)
+    attempts = []
+
+    def slow(timeout):
+        attempts.append(timeout)
+        time.sleep(0.12)
+        raise TimeoutError()
+
+    with pytest.raises(DeadlineExceeded):
+        call_guard.call(slow)
+    # The second attempt only gets what is left of the first's budget
+    assert len(attempts) == 2 and attempts[1] < 0.2 - 0.12
+    stats = call_guard.stats()
+    assert stats['deadline_exceeded'] == 1 and stats['failures'] == 1 and stats['retries'] == 1
+
+
+def test_bulkhead_rejects_calls_beyond_max_concurrent():
+    call_guard = guard(max_concurrent=1, acquire_timeout=0.01)
+    started, release = threading.Event(), threading.Event()
+
+    def busy(timeout):
+        started.set()
+        release.wait(5)
+        return 'ok'
+
+    thread = threading.Thread(target=call_guard.call, args=(busy,))
+    thread.start()
+    assert started.wait(5)
+    assert call_guard.stats()['in_flight'] == 1
+    with pytest.raises(BulkheadFull):
+        call_guard.call(flaky())
+    release.set()
+    thread.join()
+
+    stats = call_guard.stats()
+    assert stats['rejected'] == 1 and stats['in_flight'] == 0
+    # A rejection is load shedding, not a provider failure
+    assert stats['failures'] == 0 and stats['state'] == 'closed'
+    assert call_guard.call(flaky()) == 'ok'
+
+
+def test_stream_passes_items_through_and_holds_the_slot_while_reading():
+    call_guard = guard(max_concurrent=1)
+    opened = flaky(status_error(openai.RateLimitError, 429), result=iter(['a', 'b', 'c']))
+    stream = call_guard.stream(opened)
+
+    assert next(stream) == 'a'
+    assert call_guard.stats()['in_flight'] == 1 and call_guard.stats()['retries'] == 1
+    assert list(stream) == ['b', 'c']
+    stats = call_guard.stats()
+    assert stats['in_flight'] == 0 and stats['successes'] == 1
+
+
+def test_closing_a_stream_early_releases_the_slot():
+    call_guard = guard(max_concurrent=1, acquire_timeout=0.01)
+    stream = call_guard.stream(flaky(result=iter(range(10))))
+    assert next(stream) == 0
+    stream.close()
+    assert call_guard.stats()['in_flight'] == 0
+    assert list(call_guard.stream(flaky(result=iter([1])))) == [1]
+
+
+def test_stream_error_while_reading_counts_as_a_failure():
+    call_guard = guard(failure_threshold=1)
+
+    def broken():
+        yield 'a'
+        raise openai.APIConnectionError(request=REQUEST)
+
+    stream = call_guard.stream(flaky(result=broken()))
+    assert next(stream) == 'a'
+    with pytest.raises(openai.APIConnectionError):
+        next(stream)
+    assert call_guard.state == 'open' and call_guard.stats()['in_flight'] == 0
+
+
+def test_stream_deadline_bounds_reading():
+    call_guard = guard(deadline=0.05)
+
+    def slow():
+        yield 'a'
+        time.sleep(0.06)
+        yield 'b'
+
+    stream = call_guard.stream(flaky(result=slow()))
+    assert next(stream) == 'a'
+    with pytest.raises(DeadlineExceeded):
+        next(stream)
+    assert call_guard.stats()['deadline_exceeded'] == 1
@@ -0,0 +1,150 @@
+import io
+import os
+import threading
+import time
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+from werkzeug.datastructures import FileStorage
+
+from src.services import voice_service
+from src.services.audio import PCMAudio
+from src.services.voice_service import VoiceService
+
+RATE = 16000
+
+
+def upload(data, filename):
+    return FileStorage(stream=io.BytesIO(data), filename=filename, content_type='audio/wav')
+
+
+def speech(seconds, seed=0):
+    rng = np.random.default_rng(seed)
+    return PCMAudio(np.clip(rng.normal(0, 6000, int(RATE * seconds)), -32768, 32767).astype(np.int16), RATE)
+
+
+def test_quality_of_decodable_wav_is_measured():
+    result = VoiceService().analyze_audio_quality(upload(speech(2).to_wav().read(), 'job.wav'))
+    assert result['method'] == 'signal'
+    assert result['duration'] == pytest.approx(2.0)
+
+
+def test_steady_tone_over_noise_is_acceptable():
+    rng = np.random.default_rng(0)
+    t = np.arange(RATE * 3) / RATE
+    signal = 0.3 * 32768 * np.sin(2 * np.pi * 440 * t) + rng.normal(0, 300, len(t))
+    recording = PCMAudio(signal.astype(np.int16), RATE).to_wav().read()
+    result = VoiceService().analyze_audio_quality(upload(recording, 'job.wav'))
+    assert result['acceptable'] and result['metrics']['snr_db'] is None
+    assert not any('noise' in recommendation for recommendation in result['recommendations'])
+
+
+def test_low_snr_only_warns():
+    service = VoiceService()
+    metrics = {'duration': 5.0, 'rms_dbfs': -20.0, 'peak_dbfs': -3.0, 'clipping_ratio': 0.0,
+               'silence_ratio': 0.1, 'snr_db': 3.0}
+    result = service._signal_quality(metrics, 160000)
+    assert result['acceptable'] and result['quality_score'] == 0.8
+    assert result['recommendations'] == ["Background noise is drowning out speech, move somewhere quieter"]
+
+
+def test_undecodable_wav_falls_back_to_size_estimate():
+    audio_file = upload(b'RIFF\x00\x00\x00\x00WAVEjunk' + bytes(40000), 'job.wav')
+    result = VoiceService().analyze_audio_quality(audio_file)
+    assert result['success'] and result['acceptable']
+    assert result['method'] == 'size_estimate'
+    assert 'decode_error' in result
+    assert audio_file.stream.tell() == 0
+
+
+def test_transcript_cache_is_keyed_per_backend(monkeypatch):
+    service = VoiceService()
+    calls = []
+
+    def transcribe_file(stream, filename, content_type, preprocess=False):
+        calls.append(os.environ['AI_TRANSCRIBE_BACKEND'])
+        return {'success': True, 'text': calls[-1]}
+
+    monkeypatch.setattr(service, '_transcribe_file', transcribe_file)
+    recording = os.urandom(2048)
+
+    monkeypatch.setenv('AI_TRANSCRIBE_BACKEND', 'local')
+    assert service._transcribe_cached(io.BytesIO(recording), 'a.wav', 'audio/wav', False)['text'] == 'local'
+    assert service._transcribe_cached(io.BytesIO(recording), 'a.wav', 'audio/wav', False)['cached']
+
+    monkeypatch.setenv('AI_TRANSCRIBE_BACKEND', 'openai')
+    result = service._transcribe_cached(io.BytesIO(recording), 'a.wav', 'audio/wav', False)
+    assert result['text'] == 'openai' and not result.get('cached')
+    assert calls == ['local', 'openai']
+
+
+def test_chunked_transcription_stitches_in_order(monkeypatch):
+    service = VoiceService()
+    service.chunk_seconds = 2
+    guards = set()
+
+    def transcribe_stream(stream, filename, content_type, guard=None):
+        guards.add(guard.name)
+        index = int(filename[6:9])
+        time.sleep(0.01 * (10 - index))  # finish out of order
+        return SimpleNamespace(text=f'part {index}', language='en',
+                               segments=[{'id': 0, 'start': 0.5, 'end': 1.0, 'text': f'part {index}'}])
+
+    monkeypatch.setattr(service, '_transcribe_stream', transcribe_stream)
+    result = service._transcribe_chunked(speech(9))
+    assert result['chunks'] >= 5
+    assert result['text'] == ' '.join(f'part {index}' for index in range(result['chunks']))
+    starts = [segment['start'] for segment in result['segments']]
+    assert starts == sorted(starts) and starts[0] == 0.5
+    # Chunks use their own slots, not the single-shot transcription guard
+    assert guards == {'openai_transcribe_chunk'}
+
+
+def test_failed_chunk_cancels_chunks_not_yet_started(monkeypatch):
+    service = VoiceService()
+    service.chunk_seconds = 2
+    service.chunk_concurrency = 2
+    started = []
+    lock = threading.Lock()
+
+    def transcribe_stream(stream, filename, content_type, guard=None):
+        with lock:
+            started.append(filename)
+        time.sleep(0.05)
+        if filename == 'chunk-001.wav':
+            raise RuntimeError('upstream error')
+        return SimpleNamespace(text='ok', segments=[])
+
+    monkeypatch.setattr(service, '_transcribe_stream', transcribe_stream)
+    with pytest.raises(RuntimeError, match='upstream error'):
+        service._transcribe_chunked(speech(20))
+    time.sleep(0.3)
+    # At least ten chunks; only those already picked up by the two workers ran
+    assert 'chunk-001.wav' in started
+    assert len(started) <= 4
+
+
+def test_chunk_pool_follows_worker_count():
+    pool = voice_service._chunk_pool(2)
+    assert voice_service._chunk_pool(2) is pool
+    resized = voice_service._chunk_pool(3)
+    assert resized is not pool and resized._max_workers == 3
+
+
+@pytest.mark.parametrize('filename, content_type, expected', [
+    ('voice note.m4a', 'audio/mp4; codecs=mp4a.40.2', ('voice_note.m4a', 'audio/mp4')),
+    ('blob', 'audio/webm;codecs=opus', ('blob.webm', 'audio/webm')),
+    ('Recording.MP3', None, ('Recording.MP3', 'audio/mpeg')),
+    ('Recording.MP3', 'application/octet-stream', ('Recording.MP3', 'audio/mpeg')),
+    ('../../uploads/job.wav', 'audio/wav', ('job.wav', 'audio/wav')),
+    ('', 'audio/ogg', ('audio.ogg', 'audio/ogg')),
+    ('clip.dat', 'application/octet-stream', ('clip.wav', 'application/octet-stream')),
+])
+def test_upload_name_and_type(filename, content_type, expected):
+    audio_file = FileStorage(stream=io.BytesIO(b''), filename=filename, content_type=content_type)
+    assert VoiceService().upload_name_and_type(audio_file) == expected
+
+
+def test_upload_name_and_type_from_path():
+    assert VoiceService().upload_name_and_type(None, '/tmp/recordings/site visit.flac') == ('site_visit.flac', 'audio/flac')
@@ -0,0 +1,66 @@
+import json
+
+import numpy as np
+
+from src.services.audio import PCMAudio
+
+TRANSCRIPT = 'Replace the consumer unit in a three bed semi and add two double sockets in the kitchen'
+
+
+def events(response):
+    """(event, data) pairs from a Server-Sent Events body, skipping comments"""
+    parsed = []
+    for message in response.get_data(as_text=True).split('\n\n'):
+        lines = dict(line.split(': ', 1) for line in message.splitlines() if not line.startswith(':'))
+        if lines:
+            parsed.append((lines['event'], json.loads(lines['data'])))
+    return parsed
+
+
+def recording(seconds=4, rate=16000):
+    """Alternating loud and quiet half-seconds, enough to pass the quality gate"""
+    rng = np.random.default_rng(0)
+    parts = [rng.normal(0, 6000 if index % 2 == 0 else 20, rate // 2) for index in range(seconds * 2)]
+    return PCMAudio(np.clip(np.concatenate(parts), -32768, 32767).astype(np.int16), rate).to_wav()
+
+
+def test_stream_from_transcript(auth_client):
+    response = auth_client.post('/api/voice/voice-to-quote/stream', json={'transcript': TRANSCRIPT})
+    assert response.status_code == 200
+    assert response.mimetype == 'text/event-stream'
+    assert response.headers['Cache-Control'] == 'no-cache'
+
+    stream = events(response)
+    names = [event for event, _ in stream]
+    assert names[-1] == 'quote' and 'error' not in names and 'transcript' not in names
+    fields = {data['name']: data['value'] for event, data in stream if event == 'field'}
+    items = [data['value'] for event, data in stream if event == 'item']
+    quote = stream[-1][1]
+    assert quote['success']
+    # Every streamed field and materials line matches the final validated quote
+    assert fields['job_description'] == quote['quote_data']['job_description']
+    assert items == quote['quote_data']['materials']
+
+
+def test_cached_quote_replays_the_same_events(auth_client):
+    transcript = 'Fit an outside socket and a security light on the garage'
+    first = events(auth_client.post('/api/voice/voice-to-quote/stream', json={'transcript': transcript}))
+    repeat = events(auth_client.post('/api/voice/voice-to-quote/stream', json={'transcript': transcript}))
+    assert repeat[-1][1].get('cached') and not first[-1][1].get('cached')
+    assert [(event, data) for event, data in repeat if event != 'quote'] == \
+        [(event, data) for event, data in first if event != 'quote']
+
+
+def test_stream_from_audio_sends_transcript_first(auth_client):
+    response = auth_client.post('/api/voice/voice-to-quote/stream', data={'audio': (recording(), 'job.wav')},
+                           content_type='multipart/form-data')
+    assert response.status_code == 200
+    stream = events(response)
+    assert stream[0][0] == 'transcript' and stream[0][1]['transcript']
+    assert stream[-1][0] == 'quote'
+
+
+def test_stream_rejects_missing_input_before_streaming(auth_client):
+    response = auth_client.post('/api/voice/voice-to-quote/stream', json={})
+    assert response.status_code == 400
+    assert response.mimetype == 'application/json'
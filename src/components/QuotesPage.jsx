@@ -25,11 +25,14 @@ import QuoteForm from './QuoteForm';
 
 const QuotesPage = ({ onCreateQuote }) => {
   const [quotes, setQuotes] = useState([]);
+  const [serverStats, setServerStats] = useState(null);
   const [filteredQuotes, setFilteredQuotes] = useState([]);
   const [searchTerm, setSearchTerm] = useState('');
   const [statusFilter, setStatusFilter] = useState('all');
   const [sortBy, setSortBy] = useState('date_desc');
   const [isLoading, setIsLoading] = useState(true);
+  const [nextCursor, setNextCursor] = useState(null);
+  const [isLoadingMore, setIsLoadingMore] = useState(false);
   const [selectedQuote, setSelectedQuote] = useState(null);
   const [showQuoteModal, setShowQuoteModal] = useState(false);
   const [showQuoteForm, setShowQuoteForm] = useState(false);
@@ -126,42 +129,52 @@ const QuotesPage = ({ onCreateQuote }) => {
   ];
 
   useEffect(() => {
-    fetchQuotes();
     fetchStats();
   }, []);
 
-  const fetchQuotes = async () => {
+  // Search and status filter run on the server; refetch the first page when they change
+  useEffect(() => {
+    const timer = setTimeout(() => fetchQuotes(), searchTerm ? 300 : 0);
+    return () => clearTimeout(timer);
+  }, [searchTerm, statusFilter]);
+
+  const fetchQuotes = async (cursor = null) => {
     try {
-      setIsLoading(true);
-      const response = await fetch('/api/quotes/');
+      if (cursor) setIsLoadingMore(true);
+      const params = new URLSearchParams({ fields: 'summary', limit: '50' });
+      if (cursor) params.set('cursor', cursor);
+      if (statusFilter !== 'all') params.set('status', statusFilter);
+      if (searchTerm.trim()) params.set('q', searchTerm.trim());
+      const response = await fetch(`/api/quotes/?${params}`);
       const data = await response.json();
+      if (!data.quotes) return; // e.g. not signed in: keep the current list
       
-      if (data.quotes) {
-        // Transform backend data to frontend format
-        const transformedQuotes = data.quotes.map(quote => ({
-          ...quote,
-          customer_name: quote.customer_name,
-          customer_email: quote.customer_email || '',
-          customer_phone: quote.customer_phone || '',
-          job_description: quote.job_description,
-          address: quote.customer_address || '',
-          total_amount: quote.total_amount,
-          status: quote.status,
-          created_date: quote.created_at ? quote.created_at.split('T')[0] : '',
-          valid_until: quote.valid_until ? quote.valid_until.split('T')[0] : '',
-          items: [
-            { description: 'Labour', quantity: quote.labour_hours || 0, rate: quote.labour_rate || 0, amount: (quote.labour_hours || 0) * (quote.labour_rate || 0) },
-            { description: 'Materials', quantity: 1, rate: quote.materials_cost || 0, amount: quote.materials_cost || 0 }
-          ].filter(item => item.amount > 0)
-        }));
-        setQuotes(transformedQuotes);
-      }
+      // Transform backend data to frontend format
+      const transformedQuotes = data.quotes.map(quote => ({
+        ...quote,
+        customer_name: quote.customer_name,
+        customer_email: quote.customer_email || '',
+        customer_phone: quote.customer_phone || '',
+        job_description: quote.job_description,
+        address: quote.customer_address || '',
+        total_amount: quote.total_amount,
+        status: quote.status,
+        created_date: quote.created_at ? quote.created_at.split('T')[0] : '',
+        valid_until: quote.valid_until ? quote.valid_until.split('T')[0] : '',
+        items: [
+          { description: 'Labour', quantity: quote.labour_hours || 0, rate: quote.labour_rate || 0, amount: (quote.labour_hours || 0) * (quote.labour_rate || 0) },
+          { description: 'Materials', quantity: 1, rate: quote.materials_cost || 0, amount: quote.materials_cost || 0 }
+        ].filter(item => item.amount > 0)
+      }));
+      setQuotes(previous => cursor ? previous.concat(transformedQuotes) : transformedQuotes);
+      setNextCursor(data.has_more ? data.next_cursor : null);
     } catch (error) {
       console.error('Error fetching quotes:', error);
       // Fallback to mock data if API fails
-      setQuotes(mockQuotes);
+      if (!cursor) setQuotes(mockQuotes);
     } finally {
       setIsLoading(false);
+      setIsLoadingMore(false);
     }
   };
 
@@ -169,8 +182,7 @@ const QuotesPage = ({ onCreateQuote }) => {
     try {
       const response = await fetch('/api/quotes/stats');
       if (response.ok) {
-        const statsData = await response.json();
-        // Stats will be used in the component
+        setServerStats(await response.json());
       }
     } catch (error) {
       console.error('Error fetching stats:', error);
@@ -178,27 +190,13 @@ const QuotesPage = ({ onCreateQuote }) => {
   };
 
   useEffect(() => {
-    filterAndSortQuotes();
-  }, [quotes, searchTerm, statusFilter, sortBy]);
+    sortQuotes();
+  }, [quotes, sortBy]);
 
-  const filterAndSortQuotes = () => {
+  const sortQuotes = () => {
+    // Rows are already filtered by the server; sorting applies to the pages loaded so far
     let filtered = [...quotes];
 
-    // Apply search filter
-    if (searchTerm) {
-      filtered = filtered.filter(quote => 
-        quote.customer_name.toLowerCase().includes(searchTerm.toLowerCase()) ||
-        quote.job_description.toLowerCase().includes(searchTerm.toLowerCase()) ||
-        quote.customer_email.toLowerCase().includes(searchTerm.toLowerCase())
-      );
-    }
-
-    // Apply status filter
-    if (statusFilter !== 'all') {
-      filtered = filtered.filter(quote => quote.status === statusFilter);
-    }
-
-    // Apply sorting
     filtered.sort((a, b) => {
       switch (sortBy) {
         case 'date_desc':
@@ -256,6 +254,17 @@ const QuotesPage = ({ onCreateQuote }) => {
     }).format(amount);
   };
 
+  // Single-quote mutations go through the batch endpoint; resolves to that operation's result
+  const runQuoteOperation = async (operation) => {
+    const response = await fetch('/api/quotes/batch', {
+      method: 'POST',
+      headers: { 'Content-Type': 'application/json' },
+      body: JSON.stringify({ operations: [operation] })
+    });
+    const data = await response.json();
+    return data.results ? data.results[0] : { success: false, error: data.error };
+  };
+
   const handleQuoteAction = async (action, quote) => {
     // Handle quote action
     
@@ -273,48 +282,56 @@ const QuotesPage = ({ onCreateQuote }) => {
           break;
           
         case 'duplicate':
-          const duplicateResponse = await fetch(`/api/quotes/${quote.id}/duplicate`, {
-            method: 'POST',
-            headers: { 'Content-Type': 'application/json' }
+          const duplicateResult = await runQuoteOperation({
+            op: 'create',
+            quote: {
+              customer_name: quote.customer_name,
+              customer_email: quote.customer_email,
+              customer_phone: quote.customer_phone,
+              customer_address: quote.customer_address,
+              job_description: quote.job_description,
+              job_type: quote.job_type,
+              urgency: quote.urgency,
+              labour_hours: quote.labour_hours,
+              labour_rate: quote.labour_rate,
+              materials_cost: quote.materials_cost
+            }
           });
           
-          if (duplicateResponse.ok) {
-            const result = await duplicateResponse.json();
+          if (duplicateResult.success) {
             alert('Quote duplicated successfully!');
             fetchQuotes(); // Refresh the list
+            fetchStats();
           } else {
-            alert('Failed to duplicate quote');
+            alert(duplicateResult.error || 'Failed to duplicate quote');
           }
           break;
           
         case 'send':
-          const sendResponse = await fetch(`/api/quotes/${quote.id}/send`, {
-            method: 'POST',
-            headers: { 'Content-Type': 'application/json' }
-          });
+          const sendResult = await runQuoteOperation({ op: 'update_status', id: quote.id, status: 'sent' });
           
-          if (sendResponse.ok) {
+          if (sendResult.success) {
             alert(`Quote sent to ${quote.customer_name}!`);
             // Update local state
             setQuotes(quotes.map(q => 
               q.id === quote.id ? {...q, status: 'sent'} : q
             ));
+            fetchStats();
           } else {
-            alert('Failed to send quote');
+            alert(sendResult.error || 'Failed to send quote');
           }
           break;
           
         case 'delete':
           if (confirm(`Are you sure you want to delete the quote for ${quote.customer_name}?`)) {
-            const deleteResponse = await fetch(`/api/quotes/${quote.id}`, {
-              method: 'DELETE'
-            });
+            const deleteResult = await runQuoteOperation({ op: 'delete', id: quote.id });
             
-            if (deleteResponse.ok) {
+            if (deleteResult.success) {
               setQuotes(quotes.filter(q => q.id !== quote.id));
+              fetchStats();
               alert('Quote deleted successfully');
             } else {
-              alert('Failed to delete quote');
+              alert(deleteResult.error || 'Failed to delete quote');
             }
           }
           break;
@@ -328,7 +345,14 @@ const QuotesPage = ({ onCreateQuote }) => {
     }
   };
 
-  const stats = {
+  // Totals come from the server-side aggregate; the local count is only a fallback (e.g. demo data)
+  const stats = serverStats ? {
+    total: serverStats.total,
+    draft: serverStats.by_status.draft || 0,
+    sent: serverStats.by_status.sent || 0,
+    accepted: serverStats.by_status.accepted || 0,
+    totalValue: serverStats.total_value
+  } : {
     total: quotes.length,
     draft: quotes.filter(q => q.status === 'draft').length,
     sent: quotes.filter(q => q.status === 'sent').length,
@@ -544,6 +568,18 @@ const QuotesPage = ({ onCreateQuote }) => {
                 <p className="text-gray-500 text-sm mt-2">Try adjusting your search or filters</p>
               </div>
             )}
+
+            {nextCursor && (
+              <div className="p-4 border-t border-gray-200 text-center">
+                <button
+                  onClick={() => fetchQuotes(nextCursor)}
+                  disabled={isLoadingMore}
+                  className="px-6 py-2 bg-gray-100 hover:bg-gray-200 border border-gray-300 rounded-lg text-gray-700 transition-all disabled:opacity-50"
+                >
+                  {isLoadingMore ? 'Loading...' : 'Load more'}
+                </button>
+              </div>
+            )}
           </div>
         </section>
       </main>
@@ -668,6 +704,7 @@ const QuotesPage = ({ onCreateQuote }) => {
           onSave={(savedQuote) => {
             // Refresh quotes list
             fetchQuotes();
+            fetchStats();
             setShowQuoteForm(false);
             setEditingQuote(null);
           }}